@@ -1,26 +1,31 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime
+import atexit
+import collections
+import hashlib
 import os
 import json
-import base64
+import shutil
+import sys
+import tempfile
+import threading
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict
 from io import BytesIO
 
 # Import our core modules
-from src.data_generator import FinancialDataGenerator
 from src.analyzer import FinancialAnalyzer
 from src.simulator import FinancialSimulator
 
 # Import enhancement modules
-from src.investment_simulator import InvestmentSimulator
-from src.tax_calculator import TaxCalculator
-from src.pdf_generator import FinancialReportGenerator
+# (plotly, the data generator, investment simulator, tax calculator and PDF
+# generator are imported inside the pages that use them to keep reruns cheap)
 from src.user_accounts import UserDatabase
 from src.gamification import AchievementSystem
+from src.utils import APP_DIR
 
 # Set up Streamlit configuration
 st.set_page_config(
@@ -30,6 +35,103 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Size the persisted scenario projections are trimmed to, oldest first
+SCENARIO_CACHE_BYTES = 64 * 1024 * 1024
+
+# Static display data, allocated once at import rather than on every rerun
+HEALTH_COLOR = {
+    "Excellent": "green",
+    "Good": "lightgreen",
+    "Fair": "orange",
+    "Poor": "red"
+}
+HEALTH_STYLE = "<style>" + "".join(
+    f".health-{score}{{color:{color}}}" for score, color in HEALTH_COLOR.items()
+) + "</style>"
+BASE_PAGES = ("Home", "Data Input", "Analysis", "Future Simulation",
+              "Investment Planner", "Tax Analysis")
+EXTRA_PAGES = ("Achievements", "Reports")
+# Investment Planner factor messages, selected by np.searchsorted over the bins
+AGE_BINS = np.array([30, 45, 60])
+AGE_FACTORS = (
+    "You're young and have time to weather market volatility",
+    "You're in your prime earning years with time to grow investments",
+    "You're approaching retirement planning stage",
+    "You're near or in retirement, requiring more capital preservation"
+)
+MONTHS_SAVED_BINS = np.array([3, 6])
+MONTHS_SAVED_FACTORS = (
+    "Your emergency fund is below the recommended 3-6 months",
+    "Your emergency fund is adequate (3-6 months)",
+    "You have a solid emergency fund (6+ months)"
+)
+DEBT_APR_BINS = np.array([8])
+DEBT_APR_FACTORS = (
+    "You have manageable low-interest debt ({}% APR)",
+    "You have high-interest debt ({}% APR) that should be prioritized"
+)
+RISK_PROFILE_NAMES = {
+    "very_conservative": "Very Conservative",
+    "conservative": "Conservative",
+    "moderate": "Moderate",
+    "aggressive": "Aggressive",
+    "very_aggressive": "Very Aggressive"
+}
+RISK_PROFILE_ORDER = tuple(RISK_PROFILE_NAMES)
+RISK_PROFILE_INDEX = {name: i for i, name in enumerate(RISK_PROFILE_ORDER)}
+# Investment Planner tips per risk profile, with a fallback for unknown profiles
+INVESTMENT_TIPS = {
+    "very_conservative": (
+        "Focus on high-yield savings accounts and CDs for stability",
+        "Consider short-term government bonds for slightly higher yields with minimal risk",
+        "Maintain adequate liquidity for emergency expenses",
+        "Review your allocation annually to ensure it still matches your goals"
+    ),
+    "conservative": (
+        "Consider a mix of bond funds (government and high-quality corporate)",
+        "Add a small allocation to broad market index funds for growth",
+        "Implement dollar-cost averaging to reduce timing risk",
+        "Rebalance your portfolio annually to maintain target allocation"
+    ),
+    "moderate": (
+        "Use index funds for cost-effective diversification",
+        "Balance between growth (stocks) and income (bonds) investments",
+        "Consider target-date funds if you prefer a hands-off approach",
+        "Rebalance your portfolio 1-2 times per year"
+    ),
+    "aggressive": (
+        "Emphasize stock index funds for long-term growth",
+        "Consider international exposure for diversification",
+        "Don't panic sell during market downturns - stick to your strategy",
+        "Maintain a small bond allocation to reduce overall volatility"
+    ),
+    "very_aggressive": (
+        "Focus on high-growth sectors and small-cap stocks for maximum growth potential",
+        "Consider a small allocation to alternative investments like REITs",
+        "Only use this strategy for long-term goals (10+ years)",
+        "Don't invest money you might need in the near future"
+    )
+}
+DEFAULT_INVESTMENT_TIPS = ("Diversify your investments", "Invest regularly", "Focus on low-fee options")
+# Tax Analysis optimization tips, rendered as markdown
+TAX_TIPS = (
+    "**Maximize tax-advantaged accounts** like 401(k)s, IRAs, and HSAs to reduce taxable income.",
+    "**Consider Roth vs. Traditional** retirement accounts based on your current and expected future tax brackets.",
+    "**Tax-loss harvesting** can offset capital gains with losses in taxable investment accounts.",
+    "**Hold tax-efficient investments** like index funds and ETFs in taxable accounts.",
+    "**Consider municipal bonds** for tax-free income if you're in a high tax bracket.",
+    "**Bunching itemized deductions** in alternate years may help exceed the standard deduction threshold.",
+    "**Review your W-4 withholding** to ensure you're not over or under-withholding."
+)
+# Sections every generated report contains; optional ones are appended per request
+REPORT_SECTIONS = (
+    "Financial Health Overview",
+    "Current Financial Metrics",
+    "5-Year Financial Projections",
+    "Recommended Action Plan"
+)
+HERO_URL = "https://images.unsplash.com/photo-1579621970588-a35d0e7ab9b6?auto=format&fit=crop&w=800&q=80"
+
 # Create data directory if it doesn't exist
 os.makedirs("data", exist_ok=True)
 
@@ -47,36 +149,331 @@ def initialize_achievement_system():
 
 achievement_system = initialize_achievement_system()
 
-# Initialize Tax Calculator
+# Achievement definitions are static, so count the possible ones per level once
+@st.cache_resource
+def _achievement_definitions_summary():
+    definitions = achievement_system.get_all_achievement_definitions()
+    level_totals = collections.Counter(a.level for a in definitions.values())
+    return definitions, level_totals
+
+# Shared Tax Calculator per state rate (default rate when None), imported on first use
+@st.cache_resource
+def initialize_tax_calculator(state_tax_rate=None):
+    from src.tax_calculator import TaxCalculator
+    tax_calc = TaxCalculator()
+    if state_tax_rate is not None:
+        tax_calc.set_state_tax_rate(state_tax_rate)
+    return tax_calc
+
+# Shared PDF report generator; its stylesheet is built once per process
+@st.cache_resource
+def initialize_report_generator():
+    from src.pdf_generator import FinancialReportGenerator
+    return FinancialReportGenerator()
+
+# Investment simulator per profile, for recommendations and allocations
+@st.cache_resource(max_entries=32)
+def _investment_simulator(profile_key: tuple):
+    from src.investment_simulator import InvestmentSimulator
+    return InvestmentSimulator(dict(profile_key))
+
+# Compile, or load from the numba cache, the projection and tax kernels once
+# per process on a background thread, so the first simulation doesn't wait on
+# the JIT. The investment kernel is left to first use since warming it would
+# draw from the global random state.
+@st.cache_resource
+def _warm_kernels():
+    def warm():
+        from src.tax_calculator import TaxCalculator
+        warmup_profile = {"monthly_income": 1000.0, "current_savings": 0.0, "total_debt": 100.0}
+        FinancialSimulator(warmup_profile, simulation_years=1).compare_scenarios()
+        TaxCalculator().simulate_tax_impact_on_financial_path(12000.0, years=1)
+    thread = threading.Thread(target=warm, daemon=True)
+    thread.start()
+    return thread
+
+_warm_kernels()
+
+# Initialize Financial Analyzer
+@st.cache_resource
+def get_analyzer():
+    return FinancialAnalyzer()
+
+# Cache analysis results per profile so reruns don't recompute them
+@st.cache_data(show_spinner=False)
+def cached_analyze(profile_items: tuple):
+    return get_analyzer().analyze_profile(dict(profile_items))
+
+def _compare_scenarios(profile, month):
+    simulator = FinancialSimulator(profile)
+    simulator.current_month = datetime.strptime(month, "%Y-%m")
+    return simulator.compare_scenarios()
+
+# Hash of the simulator's source; joblib only keys on the wrapper's code, so
+# projections are stored per simulator version
+def _simulator_version():
+    with open(sys.modules[FinancialSimulator.__module__].__file__, "rb") as source:
+        return hashlib.blake2b(source.read(), digest_size=8).hexdigest()
+
+# Persist scenario projections on disk by profile content and start month so
+# they survive restarts; without joblib they are only cached in memory
+@st.cache_resource
+def _scenario_store():
+    try:
+        import joblib
+    except ImportError:
+        return None
+    
+    # Projections of other simulator versions are stale, so drop them
+    root = os.path.join(APP_DIR, ".cache", "sim")
+    version = _simulator_version()
+    if os.path.isdir(root):
+        for entry in os.listdir(root):
+            if entry != version:
+                shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+    return joblib.Memory(location=os.path.join(root, version), verbose=0)
+
+# Cache scenario simulations per profile so reruns reuse the projections
+@st.cache_data(show_spinner=False)
+def _run_scenarios(profile_key: tuple, month: str):
+    memory = _scenario_store()
+    if memory is None:
+        return _compare_scenarios(dict(profile_key), month)
+    results = memory.cache(_compare_scenarios)(dict(profile_key), month)
+    memory.reduce_size(bytes_limit=SCENARIO_CACHE_BYTES)
+    return results
+
+# Simulation results as plain lists for the database, and back again
+def _simulation_payload(results):
+    return {
+        name: value.to_dict(orient="list") if isinstance(value, pd.DataFrame) else value
+        for name, value in results.items()
+    }
+
+def _simulation_from_payload(data):
+    results = dict(data)
+    for name in ("current", "improved"):
+        frame = pd.DataFrame(results[name])
+        frame["date"] = pd.to_datetime(frame["date"])
+        results[name] = frame
+    
+    comparison = results["comparison"]
+    comparison["end_date"] = pd.Timestamp(comparison["end_date"])
+    for path in ("current_path", "improved_path"):
+        if "debt_free_date" in comparison[path]:
+            comparison[path]["debt_free_date"] = pd.Timestamp(comparison[path]["debt_free_date"])
+    return results
+
+# Tax results depend only on their inputs, so cache them per input set
+@st.cache_data(show_spinner=False)
+def _take_home(annual_income: float, retirement_contribution: float,
+               other_pretax_deductions: float, state_tax_rate: float):
+    return initialize_tax_calculator(state_tax_rate).calculate_monthly_take_home_pay(
+        annual_income,
+        retirement_contribution=retirement_contribution,
+        other_pretax_deductions=other_pretax_deductions
+    )
+
+@st.cache_data(show_spinner=False)
+def _simulate_tax_impact(annual_income: float, income_growth: float, retirement_contribution_percent: float,
+                         years: int, initial_investment: float, state_tax_rate: float):
+    return initialize_tax_calculator(state_tax_rate).simulate_tax_impact_on_financial_path(
+        annual_income=annual_income,
+        yearly_income_growth=income_growth,
+        retirement_contribution_percent=retirement_contribution_percent,
+        years=years,
+        investment_return_rate=0.07,
+        initial_investment=initial_investment
+    )
+
+# Cache risk-profile comparisons so repeat runs with the same inputs are instant
+@st.cache_data(show_spinner=False)
+def _compare_risk_profiles(profile_key: tuple, monthly_contribution: float, initial_investment: float, years: int):
+    from src.investment_simulator import InvestmentSimulator
+    simulator = InvestmentSimulator(dict(profile_key), simulation_years=years)
+    return simulator.compare_risk_profiles(
+        monthly_contribution=monthly_contribution,
+        initial_investment=initial_investment
+    )
+
+# Short content hash of a profile, used to detect edits between reruns
+def _profile_hash(profile):
+    payload = json.dumps(profile, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+# Process-wide version of each user's stored data, by (kind, user_id). Writes
+# bump it so the cached reads below miss for every session of that user,
+# including new tabs and later logins whose session state starts over
 @st.cache_resource
-def initialize_tax_calculator():
-    return TaxCalculator()
+def _data_versions():
+    return collections.Counter(), threading.Lock()
+
+def _data_version(kind, user_id):
+    versions, lock = _data_versions()
+    with lock:
+        return versions[(kind, user_id)]
+
+def _bump_data_version(kind, user_id):
+    versions, lock = _data_versions()
+    with lock:
+        versions[(kind, user_id)] += 1
+
+# Cache the user's saved profiles until the next profile save
+@st.cache_data(ttl=60)
+def _load_profiles(user_id: str, version: int):
+    return user_db.get_financial_profiles(user_id)
+
+def _profiles_for(user_id):
+    return _load_profiles(user_id, _data_version("profiles", user_id))
+
+# Cache the user's earned achievements until the next award
+@st.cache_data(ttl=300)
+def _load_achievements(user_id: str, version: int):
+    return user_db.get_user_achievements(user_id)
+
+def _achievements_for(user_id):
+    return _load_achievements(user_id, _data_version("achievements", user_id))
+
+# Run an achievement check only for inputs it hasn't seen this session, so
+# reruns with unchanged inputs don't hit the database again
+def _check_once(kind, profile, data, check):
+    seen = st.session_state.setdefault("_achievement_checks_seen", set())
+    key = (kind, st.session_state.user_id, _profile_hash([profile, data]))
+    if key in seen:
+        return []
+    seen.add(key)
+    return check(profile, data, st.session_state.user_id)
 
-tax_calculator = initialize_tax_calculator()
+# Prepend newly earned achievement IDs to the session list in the database's
+# record shape instead of refetching it, and invalidate the cached read
+def _add_earned_achievements(achievement_ids):
+    definitions, _ = _achievement_definitions_summary()
+    held = {a["type"] for a in st.session_state.user_achievements or []}
+    achieved_at = datetime.now().isoformat()
+    added = [
+        {"id": None, "type": achievement_id, "data": asdict(definitions[achievement_id]), "achieved_at": achieved_at}
+        for achievement_id in dict.fromkeys(achievement_ids)
+        if achievement_id not in held and achievement_id in definitions
+    ]
+    _bump_data_version("achievements", st.session_state.user_id)
+    st.session_state.user_achievements = added + list(st.session_state.user_achievements or [])
+
+# Default session state; built per call so mutable values are never shared
+def _session_defaults():
+    return {
+        "is_guest": False,
+        "user_profile": None,
+        "analysis_results": None,
+        "simulation_results": None,
+        "investment_results": None,
+        "tax_analysis": None,
+        "user_id": None,
+        "user_achievements": [],
+        "simulation_count": 0,
+        "profile_history": collections.deque(maxlen=12),  # Keep last 12 months
+        "login_history": [],
+        "user_profile_version": 0,
+        "current_profile_id": None
+    }
 
 # Initialize session state
-if 'is_guest' not in st.session_state:
-    st.session_state.is_guest = False
-if 'user_profile' not in st.session_state:
-    st.session_state.user_profile = None
-if 'analysis_results' not in st.session_state:
-    st.session_state.analysis_results = None
-if 'simulation_results' not in st.session_state:
-    st.session_state.simulation_results = None
-if 'investment_results' not in st.session_state:
-    st.session_state.investment_results = None
-if 'tax_analysis' not in st.session_state:
-    st.session_state.tax_analysis = None
-if 'user_id' not in st.session_state:
-    st.session_state.user_id = None
-if 'user_achievements' not in st.session_state:
-    st.session_state.user_achievements = []
-if 'simulation_count' not in st.session_state:
-    st.session_state.simulation_count = 0
-if 'profile_history' not in st.session_state:
-    st.session_state.profile_history = []
-if 'login_history' not in st.session_state:
-    st.session_state.login_history = []
+for key, value in _session_defaults().items():
+    st.session_state.setdefault(key, value)
+
+# Replace the active profile; bumping the version invalidates per-profile derived data
+def _set_user_profile(profile):
+    st.session_state.user_profile = profile
+    st.session_state.user_profile_version += 1
+
+# Expense column names and amounts of the active profile as parallel arrays,
+# computed once per profile version
+def _expense_array():
+    cached = st.session_state.get("_expense_array")
+    version = st.session_state.user_profile_version
+    if cached is None or cached[0] != version:
+        profile = st.session_state.user_profile
+        names = [k for k in profile if k.startswith('expense_')]
+        values = np.fromiter((profile[k] for k in names), dtype=np.float64, count=len(names))
+        cached = (version, names, values)
+        st.session_state["_expense_array"] = cached
+    return cached[1], cached[2]
+
+# Annualized totals of the active profile, computed once per profile version
+def _profile_totals():
+    cached = st.session_state.get("_profile_totals")
+    version = st.session_state.user_profile_version
+    if cached is None or cached["version"] != version:
+        monthly_income = st.session_state.user_profile.get('monthly_income', 0)
+        monthly_expenses = float(_expense_array()[1].sum())
+        cached = {
+            "version": version,
+            "annual_income": monthly_income * 12,
+            "monthly_expenses": monthly_expenses,
+            "monthly_savings": monthly_income - monthly_expenses
+        }
+        st.session_state["_profile_totals"] = cached
+    return cached
+
+# Formatted Future Simulation figures, built once per simulation result
+# rather than on every rerun of the page
+def _simulation_fmt():
+    results = st.session_state.simulation_results
+    version = st.session_state.user_profile_version
+    cached = st.session_state.get("simulation_results_fmt")
+    if cached is not None and cached["source"] is results and cached["version"] == version:
+        return cached
+    
+    profile = st.session_state.user_profile
+    comparison = results["comparison"]
+    current_path = comparison['current_path']
+    improved_path = comparison['improved_path']
+    starting_net_worth = profile['current_savings'] - profile.get('total_debt', 0)
+    
+    cached = {"source": results, "version": version}
+    for name, path in (("current", current_path), ("improved", improved_path)):
+        cached[name] = {
+            "net_worth": f"${path['final_net_worth']:,.2f}",
+            "savings": f"${path['final_savings']:,.2f}",
+            "debt": f"${path['final_debt']:,.2f}",
+            "debt_free": path['debt_free_date'].strftime('%B %Y') if 'debt_free_date' in path else None
+        }
+    cached["current"]["net_worth_change"] = f"${current_path['final_net_worth'] - starting_net_worth:,.2f}"
+    cached["improved"]["net_worth_change"] = f"+${comparison['difference']['net_worth_diff']:,.2f} compared to current path"
+    st.session_state["simulation_results_fmt"] = cached
+    return cached
+
+# ID of the user's most recently updated profile, looked up once and then
+# kept current by the save handlers
+def _current_profile_id():
+    profile_id = st.session_state.current_profile_id
+    if profile_id is None:
+        profile_id = user_db.get_latest_profile_id(st.session_state.user_id)
+        st.session_state.current_profile_id = profile_id
+    return profile_id
+
+# Run the app usage achievement check only when its inputs have changed
+def check_usage_achievements(profile_saved=False, simulation_run=False):
+    key = (
+        st.session_state.user_id,
+        bool(profile_saved),
+        bool(simulation_run),
+        st.session_state.simulation_count,
+        len(st.session_state.login_history)
+    )
+    if st.session_state.get("_last_usage_check_key") == key:
+        return []
+    st.session_state["_last_usage_check_key"] = key
+    
+    earned = achievement_system.check_app_usage_achievements(
+        st.session_state.user_id,
+        profile_saved=profile_saved,
+        simulation_run=simulation_run,
+        login_history=st.session_state.login_history
+    )
+    if earned:
+        _bump_data_version("achievements", st.session_state.user_id)
+        st.session_state.user_achievements = _achievements_for(st.session_state.user_id)
+    return earned
 
 def login_page():
     st.title("💰 Financial Future Simulator - Login")
@@ -117,21 +514,21 @@ def login_page():
                     st.session_state.login_history.append(datetime.now().isoformat())
                     
                     # Load user's saved profiles
-                    profiles = user_db.get_financial_profiles(user_id)
+                    profiles = _profiles_for(user_id)
                     if profiles:
-                        st.session_state.user_profile = profiles[0]["data"]
+                        _set_user_profile(profiles[0]["data"])
                         st.session_state.profile_history.append(profiles[0]["data"])
                     
                     # Load achievements
-                    st.session_state.user_achievements = user_db.get_user_achievements(user_id)
+                    st.session_state.user_achievements = _achievements_for(user_id)
                     
-                    # Check for app usage achievements
-                    achievement_system.check_app_usage_achievements(
-                        user_id=user_id,
-                        profile_saved=bool(profiles),
-                        simulation_run=st.session_state.simulation_count > 0,
-                        login_history=st.session_state.login_history
-                    )
+                    # Check for app usage achievements once per session
+                    if not st.session_state.get("usage_checked"):
+                        check_usage_achievements(
+                            profile_saved=bool(profiles),
+                            simulation_run=st.session_state.simulation_count > 0
+                        )
+                        st.session_state.usage_checked = True
                     
                     st.success(f"Welcome back, {username}!")
                     st.rerun()
@@ -179,1720 +576,1772 @@ def login_page():
         st.markdown("### 🏆 Achievement System")
         st.write("Track your progress and earn rewards for good financial habits.")
 
-# Sidebar with navigation and user info
-def sidebar_navigation():
-    with st.sidebar:
-        if st.session_state.user_id:
-            st.title("Navigation")
-            
-            # Display user info
-            if st.session_state.get('is_guest', False):
-                st.info("Using as guest (data won't be saved)")
-                if st.button("Sign in / Register"):
-                    # Clear session state except for certain keys
-                    for key in list(st.session_state.keys()):
-                        if key not in ['user_profile', 'analysis_results', 'simulation_results']:
-                            del st.session_state[key]
-                    st.rerun()
-            else:
-                st.info(f"Logged in as user")
-                if st.button("Log Out"):
-                    # Clear session state
-                    for key in list(st.session_state.keys()):
+# Sidebar with navigation and user info; a fragment so profile selector
+# interactions rerun only the sidebar, not the page content
+@st.fragment
+def _sidebar():
+    if st.session_state.user_id:
+        st.title("Navigation")
+        
+        # Display user info
+        if st.session_state.get('is_guest', False):
+            st.info("Using as guest (data won't be saved)")
+            if st.button("Sign in / Register"):
+                # Clear session state except for certain keys
+                for key in list(st.session_state.keys()):
+                    if key not in ['user_profile', 'analysis_results', 'simulation_results']:
                         del st.session_state[key]
-                    st.rerun()
-            
-            # Show achievement count if not guest
-            if not st.session_state.get('is_guest', False) and st.session_state.user_achievements:
-                st.success(f"Achievements: {len(st.session_state.user_achievements)}")
-            
-            # Navigation options
-            pages = ["Home", "Data Input", "Analysis", "Future Simulation", 
-                     "Investment Planner", "Tax Analysis"]
-            
-            # Add achievements and reports only for registered users
-            if not st.session_state.get('is_guest', False):
-                pages.extend(["Achievements", "Reports"])
-                
-            page = st.radio("Go to", pages)
-            
-            # Show profile selector if user has saved profiles and is not a guest
-            if not st.session_state.get('is_guest', False):
-                profiles = user_db.get_financial_profiles(st.session_state.user_id)
-                if profiles:
-                    st.subheader("Your Profiles")
-                    profile_names = [p["name"] for p in profiles]
-                    selected_profile = st.selectbox("Load Profile", profile_names)
-                    
-                    if st.button("Load Selected Profile"):
-                        for profile in profiles:
-                            if profile["name"] == selected_profile:
-                                st.session_state.user_profile = profile["data"]
-                                
-                                # Add to profile history
-                                st.session_state.profile_history.append(profile["data"])
-                                if len(st.session_state.profile_history) > 12:  # Keep last 12 months
-                                    st.session_state.profile_history.pop(0)
-                                
-                                st.success(f"Loaded profile: {selected_profile}")
-                                
-                                # Check for achievements
-                                if not st.session_state.get('is_guest', False):
-                                    achievement_system.check_emergency_fund_achievements(
-                                        profile["data"], st.session_state.user_id)
-                                
-                                # Load associated analysis and simulation results
-                                analysis = user_db.get_analysis_results(profile["id"])
-                                if analysis:
-                                    st.session_state.analysis_results = analysis["data"]
-                                
-                                simulation = user_db.get_simulation_results(profile["id"])
-                                if simulation:
-                                    st.session_state.simulation_results = simulation["data"]
-                                
-                                st.rerun()
-            else:
-                st.warning("Create an account to save your profiles and track achievements!")
+                st.rerun()
         else:
-            st.title("Financial Simulator")
-            st.write("Please log in to use all features.")
-            page = "Login"
+            st.info(f"Logged in as user")
+            if st.button("Log Out"):
+                # Clear session state
+                for key in list(st.session_state.keys()):
+                    del st.session_state[key]
+                st.rerun()
+        
+        # Show achievement count if not guest
+        if not st.session_state.get('is_guest', False) and st.session_state.user_achievements:
+            st.success(f"Achievements: {len(st.session_state.user_achievements)}")
         
-        return page
+        # Navigation options; achievements and reports only for registered users
+        pages = BASE_PAGES if st.session_state.get('is_guest', False) else BASE_PAGES + EXTRA_PAGES
+        
+        page = st.radio("Go to", pages)
+        
+        # A page change during a sidebar-only rerun needs a full app rerun to render it
+        if page != st.session_state.get("_sidebar_page"):
+            st.session_state["_sidebar_page"] = page
+            if not st.session_state.get("_routing"):
+                st.rerun()
+        
+        # Show profile selector if user has saved profiles and is not a guest
+        if not st.session_state.get('is_guest', False):
+            profiles = _profiles_for(st.session_state.user_id)
+            if profiles:
+                st.subheader("Your Profiles")
+                profile_names = [p["name"] for p in profiles]
+                selected_profile = st.selectbox("Load Profile", profile_names)
+                
+                if st.button("Load Selected Profile"):
+                    # Index by name once; reversed so the first match wins on duplicate names
+                    by_name = {p["name"]: p for p in reversed(profiles)}
+                    profile = by_name[selected_profile]
+                    _set_user_profile(profile["data"])
+                    
+                    # Add to profile history
+                    st.session_state.profile_history.append(profile["data"])
+                    
+                    st.success(f"Loaded profile: {selected_profile}")
+                    
+                    # Check for achievements
+                    if not st.session_state.get('is_guest', False):
+                        if achievement_system.check_emergency_fund_achievements(
+                                profile["data"], st.session_state.user_id):
+                            _bump_data_version("achievements", st.session_state.user_id)
+                            st.session_state.user_achievements = _achievements_for(st.session_state.user_id)
+                    
+                    # Load associated analysis and simulation results
+                    analysis = user_db.get_analysis_results(profile["id"])
+                    if analysis:
+                        st.session_state.analysis_results = analysis["data"]
+                    
+                    simulation = user_db.get_simulation_results(profile["id"])
+                    if simulation:
+                        st.session_state.simulation_results = _simulation_from_payload(simulation["data"])
+                    
+                    st.rerun()
+        else:
+            st.warning("Create an account to save your profiles and track achievements!")
+    else:
+        st.title("Financial Simulator")
+        st.write("Please log in to use all features.")
+        page = "Login"
+    
+    return page
 
-# Download link for PDF reports
-def get_pdf_download_link(pdf_path, filename="financial_report.pdf"):
+def sidebar_navigation():
+    with st.sidebar:
+        st.session_state["_routing"] = True
+        page = _sidebar()
+        st.session_state["_routing"] = False
+    return page
+
+# Cache PDF bytes per file version so reruns don't re-read the report;
+# bounded so memory doesn't grow with every generated report
+@st.cache_data(show_spinner=False, max_entries=8)
+def _pdf_bytes(pdf_path: str, mtime: float) -> bytes:
     with open(pdf_path, "rb") as file:
-        encoded_file = base64.b64encode(file.read()).decode()
-    
-    href = f'<a href="data:application/pdf;base64,{encoded_file}" download="{filename}">Download PDF Report</a>'
-    return href
+        return file.read()
 
-# Main application
-def main():
-    if 'user_id' not in st.session_state or st.session_state.user_id is None:
-        page = "Login"
-    else:
-        page = sidebar_navigation()
+# Cache the expense pie per breakdown so navigating back doesn't rebuild it
+@st.cache_data(show_spinner=False, max_entries=16)
+def _expense_pie(names: tuple, values: tuple):
+    import plotly.express as px
+    return px.pie(
+        values=list(values),
+        names=list(names),
+        title="Monthly Expenses Breakdown",
+        hole=0.4,
+        color_discrete_sequence=px.colors.qualitative.Pastel
+    )
+
+# Render the risk-profile comparison table once per set of results
+@st.cache_data(show_spinner=False, max_entries=16)
+def _styled_comparison_html(rows: tuple) -> str:
+    comparison_df = pd.DataFrame(list(rows), columns=["Risk Profile", "Final Value", "CAGR", "Max Drawdown"])
+    return comparison_df.style.format({
+        "Final Value": "${:,.2f}",
+        "CAGR": "{:.2f}%",
+        "Max Drawdown": "{:.2f}%"
+    }).hide(axis="index").to_html()
+
+# Current vs. improved path line chart, cached per series so reruns reuse it
+@st.cache_data(show_spinner=False, max_entries=32)
+def _two_line_chart(title: str, yaxis_title: str, dates: np.ndarray,
+                    current_values: np.ndarray, improved_values: np.ndarray):
+    import plotly.graph_objects as go
+    return go.Figure(
+        data=[
+            go.Scatter(x=dates, y=current_values, mode='lines', name='Current Path',
+                       line=dict(color='#1f77b4', width=2)),
+            go.Scatter(x=dates, y=improved_values, mode='lines', name='Improved Path',
+                       line=dict(color='#2ca02c', width=2))
+        ],
+        layout=dict(
+            title=title,
+            xaxis_title="Date",
+            xaxis_tickformat="%b %Y",
+            yaxis_title=yaxis_title,
+            legend_title="Scenario",
+            hovermode="x unified"
+        )
+    )
+
+# Encode a DataFrame as CSV once per content instead of on every rerun
+@st.cache_data(show_spinner=False, max_entries=8)
+def _csv_bytes(df: pd.DataFrame) -> bytes:
+    buffer = BytesIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+# Generate PDF reports off the script thread; a single worker because
+# matplotlib's pyplot state isn't thread-safe
+@st.cache_resource
+def _pdf_executor():
+    return ThreadPoolExecutor(max_workers=1)
+
+# JSON fallback for report inputs; frames and arrays are spelled out in full
+# because their str() form elides rows
+def _report_json_default(value):
+    if isinstance(value, pd.DataFrame):
+        return value.to_dict(orient="list")
+    if isinstance(value, (pd.Series, np.ndarray)):
+        return value.tolist()
+    return str(value)
+
+# Private (mode 0700) directory for this process's reports, removed on exit
+@st.cache_resource
+def _report_dir():
+    path = tempfile.mkdtemp(prefix="financial_reports_")
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+# Name reports by a hash of their inputs so an identical report is reused from disk;
+# the date is part of the key because the report is stamped with it
+def _report_path(*inputs):
+    payload = json.dumps([datetime.now().strftime("%Y-%m-%d"), *inputs],
+                         sort_keys=True, default=_report_json_default).encode()
+    key = hashlib.blake2b(payload, digest_size=16).hexdigest()
+    return os.path.join(_report_dir(), f"financial_report_{key}.pdf")
+
+# Render under a temporary name and move the finished file into place, so a
+# report path only exists once its PDF is complete
+def _render_report(report_generator, output_path, *inputs):
+    partial_path = f"{output_path}.{uuid.uuid4().hex}.part"
+    try:
+        report_generator.generate_financial_report(*inputs, output_path=partial_path)
+        os.replace(partial_path, output_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    return output_path
+
+# Queue a PDF report, or hand back the existing file if these inputs were rendered before
+def submit_pdf_report(report_generator, *inputs):
+    output_path = _report_path(*inputs)
+    if os.path.exists(output_path):
+        future = Future()
+        future.set_result(output_path)
+        return future
+    return _pdf_executor().submit(_render_report, report_generator, output_path, *inputs)
+
+# Poll a pending PDF job and rerun the app once it has finished
+@st.fragment(run_every=1)
+def _pdf_progress(future):
+    if future.done():
+        st.rerun()
+    st.info("Generating PDF report...")
+
+# Show progress for, or the download button of, the PDF job stored under key
+def pdf_report_status(key):
+    future = st.session_state.get(key)
+    if future is None:
+        return False
+    if not future.done():
+        _pdf_progress(future)
+        return False
+    try:
+        output_file = future.result()
+    except Exception as e:
+        st.error(f"Error generating report: {e}")
+        return False
+    pdf_download_button(output_file)
+    return True
+
+# Fetch the Home page image once a day instead of on every rerun
+@st.cache_data(ttl=86400, show_spinner=False)
+def _hero_bytes(url: str) -> bytes:
+    import requests
+    response = requests.get(url, timeout=5)
+    response.raise_for_status()
+    return response.content
+
+# st.cache_data doesn't keep exceptions, so remember a failed download here
+# for a few minutes rather than waiting on the network again every rerun
+@st.cache_data(ttl=300, show_spinner=False)
+def hero_image():
+    try:
+        return _hero_bytes(HERO_URL)
+    except Exception:
+        # Let the browser load it directly if the server can't reach it
+        return HERO_URL
+
+# Download button for PDF reports
+def pdf_download_button(pdf_path, filename="financial_report.pdf"):
+    data = _pdf_bytes(pdf_path, os.path.getmtime(pdf_path))
+    st.download_button(
+        "Download PDF Report",
+        data=data,
+        file_name=filename,
+        mime="application/pdf"
+    )
+    st.caption(f"Report generated: {filename}")
+
+# Rerun the whole app after a save made inside the data input fragment so the
+# sidebar lists the new profile, carrying the page's messages across the rerun
+def _rerun_after_save(*notices):
+    st.session_state["_saved_notices"] = notices
+    st.rerun(scope="app")
+
+# Data input page; a fragment so its widgets rerun only this section
+@st.fragment
+def data_input_page():
+    st.title("Step 1: Financial Data Input")
     
-    # Page routing
-    if page == "Login":
-        login_page()
+    for kind, notice in st.session_state.pop("_saved_notices", ()):
+        getattr(st, kind)(notice)
     
-    elif page == "Home":
-        st.title("💰 AI-Powered Financial Future Simulator")
+    input_method = st.radio(
+        "Choose an input method:",
+        ["Generate Sample Profile", "Enter My Own Data", "Upload CSV"]
+    )
+    
+    if st.button("Generate Random Profile"):
+        from src.data_generator import FinancialDataGenerator
+        generator = FinancialDataGenerator()
+        profile = generator.generate_user()
+        debts = np.asarray(profile["debt_amounts"], dtype=np.float64)
         
-        # Show guest mode notice
-        if st.session_state.get('is_guest', False):
-            st.warning("You are using guest mode. Your data won't be saved between sessions. Create an account to save your progress and unlock achievements!")
+        # Convert to flat dictionary for session state
+        flat_profile = {
+            "monthly_income": profile["monthly_income"],
+            "current_savings": profile["current_savings"],
+            "total_debt": float(debts.sum()) if debts.size else 0
+        }
         
-        st.write("""
-        Welcome to the enhanced Financial Future Simulator! This tool helps you visualize your financial future
-        based on your current habits and shows how small changes can lead to significant improvements.
-        
-        ### Key Features:
-        1. **Financial Analysis**: Get AI-powered assessment of your financial health
-        2. **Future Simulation**: See two possible financial futures based on your decisions
-        3. **Investment Planning**: Optimize your investment strategy based on your risk profile
-        4. **Tax Analysis**: Understand tax implications on your financial growth
-        """)
+        # Add expenses
+        flat_profile.update(zip(generator.expense_col_names, profile["expenses"].values()))
         
-        # Only show achievements for registered users
-        if not st.session_state.get('is_guest', False):
-            st.write("""
-            5. **Achievement System**: Track your financial progress with badges and milestones
-            6. **PDF Reports**: Generate comprehensive financial reports to save or share
-            """)
+        # Calculate and add monthly_savings
+        total_expenses = float(np.fromiter(profile["expenses"].values(), dtype=np.float64).sum())
+        flat_profile["monthly_savings"] = flat_profile["monthly_income"] - total_expenses
         
-        st.write("""
-        ### Get started:
-        Choose "Data Input" from the sidebar to begin your financial journey!
-        """)
+        # Add debt info
+        if debts.size:
+            max_debt_idx = int(debts.argmax())
+            flat_profile["primary_debt_type"] = profile["debt_types"][max_debt_idx]
+            flat_profile["primary_debt_apr"] = profile["debt_aprs"][max_debt_idx]
+        else:
+            flat_profile["primary_debt_type"] = "None"
+            flat_profile["primary_debt_apr"] = 0.0
         
-        st.image("https://images.unsplash.com/photo-1579621970588-a35d0e7ab9b6?auto=format&fit=crop&w=800&q=80", 
-                 caption="Plan your financial future today")
+        # Add age and risk tolerance
+        flat_profile["age"] = profile["age"]
+        flat_profile["risk_tolerance"] = profile["risk_tolerance"]
         
-        # Display recent achievements if any and not guest
-        if st.session_state.user_achievements and not st.session_state.get('is_guest', False):
-            st.subheader("Your Recent Achievements")
-            
-            # Show the most recent 3 achievements
-            recent_achievements = st.session_state.user_achievements[:3]
-            
-            cols = st.columns(min(3, len(recent_achievements)))
-            for i, achievement in enumerate(recent_achievements):
-                with cols[i]:
-                    st.markdown(f"### 🏆 {achievement['data']['title']}")
-                    st.write(achievement['data']['description'])
-                    st.info(f"Achieved: {achievement['achieved_at'][:10]}")
-    
-    elif page == "Data Input":
-        st.title("Step 1: Financial Data Input")
+        _set_user_profile(flat_profile)
         
-        input_method = st.radio(
-            "Choose an input method:",
-            ["Generate Sample Profile", "Enter My Own Data", "Upload CSV"]
-        )
+        # Add to profile history
+        st.session_state.profile_history.append(flat_profile)
         
-        if st.button("Generate Random Profile"):
-            generator = FinancialDataGenerator()
-            profile = generator.generate_user()
-            
-            # Convert to flat dictionary for session state
-            flat_profile = {
-                "monthly_income": profile["monthly_income"],
-                "current_savings": profile["current_savings"],
-                "total_debt": sum(profile["debt_amounts"]) if profile["debt_amounts"] else 0
-            }
-            
-            # Add expenses
-            for category, amount in profile["expenses"].items():
-                flat_profile[f"expense_{category.lower().replace('/', '_')}"] = amount
+        st.success("Sample profile generated! Go to Analysis to see results.")
+        
+        # Display profile summary
+        col1, col2 = st.columns(2)
+        # ... (display code remains the same)
+        
+        # Save to database if logged in AND not a guest
+        if st.session_state.user_id and not st.session_state.get('is_guest', False):
+            success, message, profile_id = user_db.save_financial_profile(
+                st.session_state.user_id,
+                "Generated Profile",
+                flat_profile
+            )
+            if success:
+                _bump_data_version("profiles", st.session_state.user_id)
+                st.session_state.current_profile_id = profile_id
+                
+                # Check for achievement
+                check_usage_achievements(
+                    profile_saved=True,
+                    simulation_run=st.session_state.simulation_count > 0
+                )
+                _rerun_after_save(
+                    ("success", "Sample profile generated! Go to Analysis to see results."),
+                    ("info", "Profile saved to your account"))
+        elif st.session_state.get('is_guest', False):
+            st.info("Create an account to save this profile!")
+    
+    elif input_method == "Enter My Own Data":
+        st.info("Enter your financial information below.")
+        
+        with st.form("financial_form"):
+            st.subheader("Basic Information")
+            col1, col2 = st.columns(2)
             
-            # Calculate and add monthly_savings
-            total_expenses = sum(flat_profile[k] for k in flat_profile if k.startswith('expense_'))
-            flat_profile["monthly_savings"] = flat_profile["monthly_income"] - total_expenses
+            with col1:
+                age = st.number_input("Age", min_value=18, max_value=100, value=35)
+                risk_tolerance = st.selectbox("Risk Tolerance", ["Low", "Medium", "High"])
             
-            # Add debt info
-            if profile["debt_amounts"]:
-                max_debt_idx = np.argmax(profile["debt_amounts"])
-                flat_profile["primary_debt_type"] = profile["debt_types"][max_debt_idx]
-                flat_profile["primary_debt_apr"] = profile["debt_aprs"][max_debt_idx]
-            else:
-                flat_profile["primary_debt_type"] = "None"
-                flat_profile["primary_debt_apr"] = 0.0
+            with col2:
+                monthly_income = st.number_input("Monthly Income ($)", min_value=0.0, value=4000.0, step=100.0)
+                current_savings = st.number_input("Current Savings ($)", min_value=0.0, value=10000.0, step=100.0)
             
-            # Add age and risk tolerance
-            flat_profile["age"] = profile["age"]
-            flat_profile["risk_tolerance"] = profile["risk_tolerance"]
+            st.subheader("Monthly Expenses")
+            col1, col2 = st.columns(2)
             
-            st.session_state.user_profile = flat_profile
+            with col1:
+                expense_rent = st.number_input("Rent/Mortgage ($)", min_value=0.0, value=1200.0, step=50.0)
+                expense_utilities = st.number_input("Utilities ($)", min_value=0.0, value=200.0, step=10.0)
+                expense_groceries = st.number_input("Groceries ($)", min_value=0.0, value=400.0, step=50.0)
+                expense_dining = st.number_input("Dining Out ($)", min_value=0.0, value=300.0, step=50.0)
             
-            # Add to profile history
-            st.session_state.profile_history.append(flat_profile)
-            if len(st.session_state.profile_history) > 12:  # Keep last 12 months
-                st.session_state.profile_history.pop(0)
+            with col2:
+                expense_transport = st.number_input("Transportation ($)", min_value=0.0, value=150.0, step=50.0)
+                expense_healthcare = st.number_input("Healthcare ($)", min_value=0.0, value=100.0, step=50.0)
+                expense_entertainment = st.number_input("Entertainment ($)", min_value=0.0, value=200.0, step=50.0)
+                expense_other = st.number_input("Other Expenses ($)", min_value=0.0, value=500.0, step=50.0)
             
-            st.success("Sample profile generated! Go to Analysis to see results.")
+            st.subheader("Debt Information")
+            has_debt = st.checkbox("I have debt")
             
-            # Display profile summary
-            col1, col2 = st.columns(2)
-            # ... (display code remains the same)
-            
-            # Save to database if logged in AND not a guest
-            if st.session_state.user_id and not st.session_state.get('is_guest', False):
-                success, message, profile_id = user_db.save_financial_profile(
-                    st.session_state.user_id,
-                    "Generated Profile",
-                    flat_profile
-                )
-                if success:
-                    st.info("Profile saved to your account")
-                    
-                    # Check for achievement
-                    achievement_system.check_app_usage_achievements(
-                        st.session_state.user_id,
-                        profile_saved=True,
-                        simulation_run=st.session_state.simulation_count > 0,
-                        login_history=st.session_state.login_history
-                    )
-            elif st.session_state.get('is_guest', False):
-                st.info("Create an account to save this profile!")
-        
-        elif input_method == "Enter My Own Data":
-            st.info("Enter your financial information below.")
+            total_debt = 0.0
+            primary_debt_type = "None"
+            primary_debt_apr = 0.0
+            expense_debt = 0.0
             
-            with st.form("financial_form"):
-                st.subheader("Basic Information")
+            if has_debt:
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    age = st.number_input("Age", min_value=18, max_value=100, value=35)
-                    risk_tolerance = st.selectbox("Risk Tolerance", ["Low", "Medium", "High"])
+                    total_debt = st.number_input("Total Debt Amount ($)", min_value=0.0, value=5000.0, step=100.0)
+                    primary_debt_type = st.selectbox(
+                        "Primary Debt Type", 
+                        ["Credit Card", "Student Loan", "Car Loan", "Personal Loan", "Mortgage", "Other"]
+                    )
                 
                 with col2:
-                    monthly_income = st.number_input("Monthly Income ($)", min_value=0.0, value=4000.0, step=100.0)
-                    current_savings = st.number_input("Current Savings ($)", min_value=0.0, value=10000.0, step=100.0)
-                
-                st.subheader("Monthly Expenses")
+                    primary_debt_apr = st.number_input("Interest Rate (APR %)", min_value=0.0, value=15.0, step=0.1)
+                    expense_debt = st.number_input("Monthly Debt Payments ($)", min_value=0.0, value=200.0, step=50.0)
+            
+            # Optional investment information
+            st.subheader("Investment Information (Optional)")
+            has_investments = st.checkbox("I have investments")
+            
+            current_investments = 0.0
+            monthly_contributions = 0.0
+            retirement_contributions = 0.0
+            
+            if has_investments:
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    expense_rent = st.number_input("Rent/Mortgage ($)", min_value=0.0, value=1200.0, step=50.0)
-                    expense_utilities = st.number_input("Utilities ($)", min_value=0.0, value=200.0, step=10.0)
-                    expense_groceries = st.number_input("Groceries ($)", min_value=0.0, value=400.0, step=50.0)
-                    expense_dining = st.number_input("Dining Out ($)", min_value=0.0, value=300.0, step=50.0)
+                    current_investments = st.number_input("Current Investment Value ($)", min_value=0.0, value=0.0, step=1000.0)
+                    monthly_contributions = st.number_input("Monthly Investment Contribution ($)", min_value=0.0, value=0.0, step=50.0)
                 
                 with col2:
-                    expense_transport = st.number_input("Transportation ($)", min_value=0.0, value=150.0, step=50.0)
-                    expense_healthcare = st.number_input("Healthcare ($)", min_value=0.0, value=100.0, step=50.0)
-                    expense_entertainment = st.number_input("Entertainment ($)", min_value=0.0, value=200.0, step=50.0)
-                    expense_other = st.number_input("Other Expenses ($)", min_value=0.0, value=500.0, step=50.0)
+                    retirement_contributions = st.number_input("Annual Retirement Contributions ($)", min_value=0.0, value=0.0, step=500.0)
+                    investment_strategy = st.selectbox(
+                        "Current Investment Strategy", 
+                        ["Conservative", "Moderate", "Aggressive", "Not Sure"]
+                    )
+            
+            # Profile name
+            profile_name = st.text_input("Profile Name", "My Financial Profile")
+            
+            submit = st.form_submit_button("Save Financial Data")
+            
+            if submit:
+                profile = {
+                    "age": age,
+                    "risk_tolerance": risk_tolerance,
+                    "monthly_income": monthly_income,
+                    "current_savings": current_savings,
+                    "expense_rent_mortgage": expense_rent,
+                    "expense_utilities": expense_utilities,
+                    "expense_groceries": expense_groceries,
+                    "expense_dining_out": expense_dining,
+                    "expense_transportation": expense_transport,
+                    "expense_healthcare": expense_healthcare,
+                    "expense_entertainment": expense_entertainment,
+                    "expense_other": expense_other,
+                    "expense_debt_payments": expense_debt,
+                    "total_debt": total_debt,
+                    "primary_debt_type": primary_debt_type,
+                    "primary_debt_apr": primary_debt_apr
+                }
                 
-                st.subheader("Debt Information")
-                has_debt = st.checkbox("I have debt")
+                # Add investment data if provided
+                if has_investments:
+                    profile["current_investments"] = current_investments
+                    profile["monthly_investment_contribution"] = monthly_contributions
+                    profile["annual_retirement_contribution"] = retirement_contributions
+                    profile["investment_strategy"] = investment_strategy
                 
-                total_debt = 0.0
-                primary_debt_type = "None"
-                primary_debt_apr = 0.0
-                expense_debt = 0.0
+                # Calculate monthly savings
+                total_expenses = float(np.add.reduce(np.array([
+                    expense_rent, expense_utilities, expense_groceries, expense_dining,
+                    expense_transport, expense_healthcare, expense_entertainment, 
+                    expense_other, expense_debt
+                ], dtype=np.float64)))
+                profile["monthly_savings"] = monthly_income - total_expenses
                 
-                if has_debt:
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        total_debt = st.number_input("Total Debt Amount ($)", min_value=0.0, value=5000.0, step=100.0)
-                        primary_debt_type = st.selectbox(
-                            "Primary Debt Type", 
-                            ["Credit Card", "Student Loan", "Car Loan", "Personal Loan", "Mortgage", "Other"]
-                        )
-                    
-                    with col2:
-                        primary_debt_apr = st.number_input("Interest Rate (APR %)", min_value=0.0, value=15.0, step=0.1)
-                        expense_debt = st.number_input("Monthly Debt Payments ($)", min_value=0.0, value=200.0, step=50.0)
+                _set_user_profile(profile)
                 
-                # Optional investment information
-                st.subheader("Investment Information (Optional)")
-                has_investments = st.checkbox("I have investments")
+                # Add to profile history
+                st.session_state.profile_history.append(profile)
                 
-                current_investments = 0.0
-                monthly_contributions = 0.0
-                retirement_contributions = 0.0
+                st.success("Your financial data has been saved! Go to Analysis to see results.")
                 
-                if has_investments:
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        current_investments = st.number_input("Current Investment Value ($)", min_value=0.0, value=0.0, step=1000.0)
-                        monthly_contributions = st.number_input("Monthly Investment Contribution ($)", min_value=0.0, value=0.0, step=50.0)
-                    
-                    with col2:
-                        retirement_contributions = st.number_input("Annual Retirement Contributions ($)", min_value=0.0, value=0.0, step=500.0)
-                        investment_strategy = st.selectbox(
-                            "Current Investment Strategy", 
-                            ["Conservative", "Moderate", "Aggressive", "Not Sure"]
+                # Save to database if logged in
+                if st.session_state.user_id:
+                    success, message, profile_id = user_db.save_financial_profile(
+                        st.session_state.user_id,
+                        profile_name,
+                        profile
+                    )
+                    if success:
+                        _bump_data_version("profiles", st.session_state.user_id)
+                        st.session_state.current_profile_id = profile_id
+                        
+                        # Check for achievement
+                        check_usage_achievements(
+                            profile_saved=True,
+                            simulation_run=st.session_state.simulation_count > 0
                         )
-                
-                # Profile name
-                profile_name = st.text_input("Profile Name", "My Financial Profile")
-                
-                submit = st.form_submit_button("Save Financial Data")
-                
-                if submit:
-                    profile = {
-                        "age": age,
-                        "risk_tolerance": risk_tolerance,
-                        "monthly_income": monthly_income,
-                        "current_savings": current_savings,
-                        "expense_rent_mortgage": expense_rent,
-                        "expense_utilities": expense_utilities,
-                        "expense_groceries": expense_groceries,
-                        "expense_dining_out": expense_dining,
-                        "expense_transportation": expense_transport,
-                        "expense_healthcare": expense_healthcare,
-                        "expense_entertainment": expense_entertainment,
-                        "expense_other": expense_other,
-                        "expense_debt_payments": expense_debt,
-                        "total_debt": total_debt,
-                        "primary_debt_type": primary_debt_type,
-                        "primary_debt_apr": primary_debt_apr
-                    }
-                    
-                    # Add investment data if provided
-                    if has_investments:
-                        profile["current_investments"] = current_investments
-                        profile["monthly_investment_contribution"] = monthly_contributions
-                        profile["annual_retirement_contribution"] = retirement_contributions
-                        profile["investment_strategy"] = investment_strategy
+                        _rerun_after_save(
+                            ("success", "Your financial data has been saved! Go to Analysis to see results."),
+                            ("info", f"Profile '{profile_name}' saved to your account"))
+    
+    elif input_method == "Upload CSV":
+        st.info("""
+        Upload a CSV file with your financial data. The file should have the following columns:
+        - monthly_income
+        - current_savings
+        - expense_* (for each expense category)
+        - total_debt
+        - primary_debt_type
+        - primary_debt_apr
+        """)
+        
+        uploaded_file = st.file_uploader("Upload your financial data CSV", type="csv")
+        
+        if uploaded_file is not None:
+            try:
+                # Only the first row is used, so don't parse the rest of the file
+                df = pd.read_csv(
+                    uploaded_file,
+                    nrows=1,
+                    dtype={'primary_debt_type': str, 'risk_tolerance': str},
+                    engine='c'
+                )
+                if len(df) > 0:
+                    profile = df.iloc[0].to_dict()
                     
-                    # Calculate monthly savings
-                    total_expenses = sum([
-                        expense_rent, expense_utilities, expense_groceries, expense_dining,
-                        expense_transport, expense_healthcare, expense_entertainment, 
-                        expense_other, expense_debt
-                    ])
-                    profile["monthly_savings"] = monthly_income - total_expenses
+                    # Ensure monthly_savings is calculated
+                    if 'monthly_savings' not in profile:
+                        monthly_income = profile.get('monthly_income', 0)
+                        expense_cols = df.columns.str.startswith('expense_')
+                        expenses = float(df.loc[:, expense_cols].iloc[0].sum())
+                        profile['monthly_savings'] = monthly_income - expenses
                     
-                    st.session_state.user_profile = profile
+                    _set_user_profile(profile)
                     
                     # Add to profile history
                     st.session_state.profile_history.append(profile)
-                    if len(st.session_state.profile_history) > 12:  # Keep last 12 months
-                        st.session_state.profile_history.pop(0)
                     
-                    st.success("Your financial data has been saved! Go to Analysis to see results.")
+                    st.success("CSV data loaded successfully! Go to Analysis to see results.")
+                    
+                    # Show sample of loaded data
+                    st.subheader("Loaded Data Preview")
+                    st.write(pd.DataFrame([profile]).T)
                     
                     # Save to database if logged in
                     if st.session_state.user_id:
-                        success, message, profile_id = user_db.save_financial_profile(
-                            st.session_state.user_id,
-                            profile_name,
-                            profile
-                        )
-                        if success:
-                            st.info(f"Profile '{profile_name}' saved to your account")
-                            
-                            # Check for achievement
-                            achievement_system.check_app_usage_achievements(
+                        profile_name = st.text_input("Profile Name", "Imported Profile")
+                        if st.button("Save to My Account"):
+                            success, message, profile_id = user_db.save_financial_profile(
                                 st.session_state.user_id,
-                                profile_saved=True,
-                                simulation_run=st.session_state.simulation_count > 0,
-                                login_history=st.session_state.login_history
+                                profile_name,
+                                profile
                             )
+                            if success:
+                                _bump_data_version("profiles", st.session_state.user_id)
+                                st.session_state.current_profile_id = profile_id
+                                _rerun_after_save(("info", f"Profile '{profile_name}' saved to your account"))
+                else:
+                    st.error("Uploaded CSV appears to be empty.")
+            except Exception as e:
+                st.error(f"Error loading CSV: {e}")
+                st.write("Please make sure your CSV is properly formatted.")
+
+# Main application
+# Home page
+def home_page():
+    st.title("💰 AI-Powered Financial Future Simulator")
+    
+    # Show guest mode notice
+    if st.session_state.get('is_guest', False):
+        st.warning("You are using guest mode. Your data won't be saved between sessions. Create an account to save your progress and unlock achievements!")
+    
+    st.write("""
+    Welcome to the enhanced Financial Future Simulator! This tool helps you visualize your financial future
+    based on your current habits and shows how small changes can lead to significant improvements.
+    
+    ### Key Features:
+    1. **Financial Analysis**: Get AI-powered assessment of your financial health
+    2. **Future Simulation**: See two possible financial futures based on your decisions
+    3. **Investment Planning**: Optimize your investment strategy based on your risk profile
+    4. **Tax Analysis**: Understand tax implications on your financial growth
+    """)
+    
+    # Only show achievements for registered users
+    if not st.session_state.get('is_guest', False):
+        st.write("""
+        5. **Achievement System**: Track your financial progress with badges and milestones
+        6. **PDF Reports**: Generate comprehensive financial reports to save or share
+        """)
+    
+    st.write("""
+    ### Get started:
+    Choose "Data Input" from the sidebar to begin your financial journey!
+    """)
+    
+    st.image(hero_image(), caption="Plan your financial future today")
+    
+    # Display recent achievements if any and not guest
+    if st.session_state.user_achievements and not st.session_state.get('is_guest', False):
+        st.subheader("Your Recent Achievements")
         
-        elif input_method == "Upload CSV":
-            st.info("""
-            Upload a CSV file with your financial data. The file should have the following columns:
-            - monthly_income
-            - current_savings
-            - expense_* (for each expense category)
-            - total_debt
-            - primary_debt_type
-            - primary_debt_apr
-            """)
-            
-            uploaded_file = st.file_uploader("Upload your financial data CSV", type="csv")
-            
-            if uploaded_file is not None:
-                try:
-                    df = pd.read_csv(uploaded_file)
-                    if len(df) > 0:
-                        profile = df.iloc[0].to_dict()
-                        
-                        # Ensure monthly_savings is calculated
-                        if 'monthly_savings' not in profile:
-                            monthly_income = profile.get('monthly_income', 0)
-                            expenses = sum([v for k, v in profile.items() if k.startswith('expense_')])
-                            profile['monthly_savings'] = monthly_income - expenses
-                        
-                        st.session_state.user_profile = profile
-                        
-                        # Add to profile history
-                        st.session_state.profile_history.append(profile)
-                        if len(st.session_state.profile_history) > 12:  # Keep last 12 months
-                            st.session_state.profile_history.pop(0)
-                        
-                        st.success("CSV data loaded successfully! Go to Analysis to see results.")
-                        
-                        # Show sample of loaded data
-                        st.subheader("Loaded Data Preview")
-                        st.write(pd.DataFrame([profile]).T)
-                        
-                        # Save to database if logged in
-                        if st.session_state.user_id:
-                            profile_name = st.text_input("Profile Name", "Imported Profile")
-                            if st.button("Save to My Account"):
-                                success, message, profile_id = user_db.save_financial_profile(
-                                    st.session_state.user_id,
-                                    profile_name,
-                                    profile
-                                )
-                                if success:
-                                    st.info(f"Profile '{profile_name}' saved to your account")
-                    else:
-                        st.error("Uploaded CSV appears to be empty.")
-                except Exception as e:
-                    st.error(f"Error loading CSV: {e}")
-                    st.write("Please make sure your CSV is properly formatted.")
+        # Show the most recent 3 achievements
+        recent_achievements = st.session_state.user_achievements[:3]
+        
+        cols = st.columns(min(3, len(recent_achievements)))
+        for i, achievement in enumerate(recent_achievements):
+            with cols[i]:
+                st.markdown(f"### 🏆 {achievement['data']['title']}")
+                st.write(achievement['data']['description'])
+                st.info(f"Achieved: {achievement['achieved_at'][:10]}")
+
+# The interactive pages below are fragments, like data_input_page, so their
+# widgets rerun only the page and not the sidebar
+
+# Analysis page
+@st.fragment
+def analysis_page():
+    st.title("Step 2: Financial Health Analysis")
     
-    elif page == "Analysis":
-        st.title("Step 2: Financial Health Analysis")
+    if st.session_state.user_profile is None:
+        st.warning("No financial data available. Please go to Data Input first.")
+    else:
+        # Run analysis if not already done or the profile has changed since
+        profile_hash = _profile_hash(st.session_state.user_profile)
+        if (st.session_state.analysis_results is None
+                or st.session_state.get("_analysis_hash") != profile_hash):
+            st.session_state.analysis_results = cached_analyze(tuple(sorted(st.session_state.user_profile.items())))
+            st.session_state["_analysis_hash"] = profile_hash
+            
+            # Save analysis to the most recently updated profile if logged in
+            if st.session_state.user_id:
+                success, _, profile_id = user_db.save_analysis_for_current_profile(
+                    st.session_state.user_id, st.session_state.analysis_results)
+                if success:
+                    st.session_state.current_profile_id = profile_id
         
-        if st.session_state.user_profile is None:
-            st.warning("No financial data available. Please go to Data Input first.")
-        else:
-            # Run analysis if not already done
-            if st.session_state.analysis_results is None:
-                analyzer = FinancialAnalyzer()
-                st.session_state.analysis_results = analyzer.analyze_profile(st.session_state.user_profile)
-                
-                # Save analysis to database if logged in
-                if st.session_state.user_id:
-                    profiles = user_db.get_financial_profiles(st.session_state.user_id)
-                    if profiles:
-                        # Find the most recently updated profile
-                        current_profile = max(profiles, key=lambda p: p["updated_at"])
-                        user_db.save_analysis_results(current_profile["id"], st.session_state.analysis_results)
-            
-            results = st.session_state.analysis_results
-            
-            # Display financial health overview
-            st.subheader("Financial Health Overview")
-            
-            health_color = {
-                "Excellent": "green",
-                "Good": "lightgreen",
-                "Fair": "orange",
-                "Poor": "red"
-            }
-            
-            health_score = results["financial_health"]
-            st.markdown(f"<h1 style='color: {health_color[health_score]};'>{health_score}</h1>", unsafe_allow_html=True)
+        results = st.session_state.analysis_results
+        
+        # Display financial health overview
+        st.subheader("Financial Health Overview")
+        
+        health_score = results["financial_health"]
+        st.markdown(HEALTH_STYLE, unsafe_allow_html=True)
+        st.markdown(f"<h1 class='health-{health_score}'>{health_score}</h1>", unsafe_allow_html=True)
+        
+        # Display issues
+        if results["issues"]:
+            st.subheader("Identified Issues")
             
-            # Display issues
-            if results["issues"]:
-                st.subheader("Identified Issues")
-                
-                for issue in results["issues"]:
-                    severity_color = "red" if issue["severity"] == "high" else "orange"
-                    
-                    with st.expander(f"🔍 {issue['issue']} ({issue['severity'].upper()})"):
-                        st.write(issue["details"])
-                        st.markdown(f"**Recommendation:** {issue['recommendation']}")
-            else:
-                st.success("No financial issues detected. Great job managing your finances!")
-            
-            # Display action plan
-            if results["action_plan"]:
-                st.subheader("Recommended Action Plan")
-                
-                for i, action in enumerate(results["action_plan"], 1):
-                    st.write(f"{i}. {action}")
+            for issue in results["issues"]:
+                severity_color = "red" if issue["severity"] == "high" else "orange"
                 
-                # Button to simulate with recommendations
-                if st.button("Simulate with Recommendations"):
-                    simulator = FinancialSimulator(st.session_state.user_profile)
-                    current, improved, comparison = simulator.compare_scenarios()
-                    
-                    st.session_state.simulation_results = {
-                        "current": current,
-                        "improved": improved,
-                        "comparison": comparison
-                    }
-                    
-                    # Increment simulation count
-                    st.session_state.simulation_count += 1
-                    
-                    # Check for simulation achievement
-                    if st.session_state.user_id:
-                        achievement_system.check_app_usage_achievements(
-                            st.session_state.user_id,
-                            profile_saved=True,
-                            simulation_run=True,
-                            login_history=st.session_state.login_history
-                        )
-                    
-                    # Save simulation to database if logged in
-                    if st.session_state.user_id:
-                        profiles = user_db.get_financial_profiles(st.session_state.user_id)
-                        if profiles:
-                            # Find the most recently updated profile
-                            current_profile = max(profiles, key=lambda p: p["updated_at"])
-                            user_db.save_simulation_results(current_profile["id"], st.session_state.simulation_results)
-                    
-                    st.success("Simulation complete! Go to Future Simulation to see results.")
-            
-            # Financial metrics
-            st.subheader("Key Financial Metrics")
-            
-            # Extract metrics from profile
-            profile = st.session_state.user_profile
-            income = profile["monthly_income"]
-            expenses = sum([v for k, v in profile.items() if k.startswith('expense_')])
-            savings = income - expenses
-            savings_rate = (savings / income) * 100 if income > 0 else 0
-            debt = profile.get("total_debt", 0)
-            
-            # Create metrics visualization
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.metric("Monthly Savings", f"${savings:.2f}", f"{savings_rate:.1f}% of income")
+                with st.expander(f"🔍 {issue['issue']} ({issue['severity'].upper()})"):
+                    st.write(issue["details"])
+                    st.markdown(f"**Recommendation:** {issue['recommendation']}")
+        else:
+            st.success("No financial issues detected. Great job managing your finances!")
+        
+        # Display action plan
+        if results["action_plan"]:
+            st.subheader("Recommended Action Plan")
             
-            with col2:
-                debt_to_income = (debt / (income * 12)) * 100 if income > 0 else 0
-                st.metric("Debt-to-Annual-Income Ratio", f"{debt_to_income:.1f}%", 
-                          "Good" if debt_to_income < 36 else "High")
-            
-            with col3:
-                expense_ratio = (expenses / income) * 100 if income > 0 else 0
-                st.metric("Expense-to-Income Ratio", f"{expense_ratio:.1f}%", 
-                         "Low" if expense_ratio < 70 else "High")
-            
-            # Create a pie chart of expenses
-            expense_dict = {k.replace('expense_', '').replace('_', ' ').title(): v 
-                          for k, v in profile.items() if k.startswith('expense_') and v > 0}
-            
-            if expense_dict:
-                fig = px.pie(
-                    values=list(expense_dict.values()),
-                    names=list(expense_dict.keys()),
-                    title="Monthly Expenses Breakdown",
-                    hole=0.4,
-                    color_discrete_sequence=px.colors.qualitative.Pastel
-                )
-                st.plotly_chart(fig)
+            for i, action in enumerate(results["action_plan"], 1):
+                st.write(f"{i}. {action}")
             
-            # Check for achievements if logged in
-            if st.session_state.user_id:
-                # Check emergency fund achievements
-                emergency_achievements = achievement_system.check_emergency_fund_achievements(
-                    profile, st.session_state.user_id)
+            # Button to simulate with recommendations
+            if st.button("Simulate with Recommendations"):
+                profile_key = tuple(sorted(st.session_state.user_profile.items()))
+                current, improved, comparison = _run_scenarios(profile_key, datetime.now().strftime("%Y-%m"))
                 
-                # Check savings rate achievements
-                savings_achievements = achievement_system.check_savings_rate_achievements(
-                    profile, st.session_state.profile_history, st.session_state.user_id)
-                
-                # Check debt achievements
-                debt_achievements = achievement_system.check_debt_achievements(
-                    profile, st.session_state.profile_history, st.session_state.user_id)
-                
-                # If any new achievements were earned, show a notification
-                new_achievements = emergency_achievements + savings_achievements + debt_achievements
-                if new_achievements:
-                    # Update achievements in session state
-                    st.session_state.user_achievements = user_db.get_user_achievements(st.session_state.user_id)
-                    
-                    st.success(f"You've earned {len(new_achievements)} new achievement(s)! Check the Achievements page.")
-    
-    elif page == "Future Simulation":
-        st.title("Step 3: Financial Future Simulation")
-        
-        if st.session_state.user_profile is None:
-            st.warning("No financial data available. Please go to Data Input first.")
-        else:
-            # Check if we already have simulation results
-            if st.session_state.simulation_results is None:
-                simulator = FinancialSimulator(st.session_state.user_profile)
-                current, improved, comparison = simulator.compare_scenarios()
-                
-                st.session_state.simulation_results = {
-                    "current": current,
-                    "improved": improved,
-                    "comparison": comparison
-                }
+                st.session_state.simulation_results = {
+                    "current": current,
+                    "improved": improved,
+                    "comparison": comparison
+                }
                 
                 # Increment simulation count
                 st.session_state.simulation_count += 1
                 
                 # Check for simulation achievement
                 if st.session_state.user_id:
-                    achievement_system.check_app_usage_achievements(
-                        st.session_state.user_id,
+                    check_usage_achievements(
                         profile_saved=True,
-                        simulation_run=True,
-                        login_history=st.session_state.login_history
+                        simulation_run=True
                     )
                 
-                # Save simulation to database if logged in
-                if st.session_state.user_id:
-                    profiles = user_db.get_financial_profiles(st.session_state.user_id)
-                    if profiles:
-                        # Find the most recently updated profile
-                        current_profile = max(profiles, key=lambda p: p["updated_at"])
-                        user_db.save_simulation_results(current_profile["id"], st.session_state.simulation_results)
-            
-            results = st.session_state.simulation_results
-            current = results["current"]
-            improved = results["improved"]
-            comparison = results["comparison"]
-            
-            # Display comparison summary
-            st.subheader("5-Year Financial Outlook")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("### Current Path")
-                st.metric(
-                    "Net Worth in 5 Years", 
-                    f"${comparison['current_path']['final_net_worth']:,.2f}",
-                    f"${comparison['current_path']['final_net_worth'] - (st.session_state.user_profile['current_savings'] - st.session_state.user_profile.get('total_debt', 0)):,.2f}"
-                )
-                st.metric("Final Savings", f"${comparison['current_path']['final_savings']:,.2f}")
-                st.metric("Final Debt", f"${comparison['current_path']['final_debt']:,.2f}")
-                
-                if 'debt_free_date' in comparison['current_path']:
-                    debt_free = comparison['current_path']['debt_free_date'].strftime('%B %Y')
-                    st.success(f"Debt-free by {debt_free}")
-            
-            with col2:
-                st.markdown("### Improved Path")
-                st.metric(
-                    "Net Worth in 5 Years", 
-                    f"${comparison['improved_path']['final_net_worth']:,.2f}",
-                    f"+${comparison['difference']['net_worth_diff']:,.2f} compared to current path"
-                )
-                st.metric("Final Savings", f"${comparison['improved_path']['final_savings']:,.2f}")
-                st.metric("Final Debt", f"${comparison['improved_path']['final_debt']:,.2f}")
-                
-                if 'debt_free_date' in comparison['improved_path']:
-                    debt_free = comparison['improved_path']['debt_free_date'].strftime('%B %Y')
-                    st.success(f"Debt-free by {debt_free}")
-            
-            # Visualization of net worth over time
-            st.subheader("Net Worth Projection")
-            
-            # Format dates for display
-            current_dates = [d.strftime('%b %Y') for d in current['date']]
-            
-            # Create net worth chart
-            fig = go.Figure()
-            
-            fig.add_trace(go.Scatter(
-                x=current_dates,
-                y=current['net_worth'],
-                mode='lines',
-                name='Current Path',
-                line=dict(color='#1f77b4', width=2)
-            ))
-            
-            fig.add_trace(go.Scatter(
-                x=current_dates,
-                y=improved['net_worth'],
-                mode='lines',
-                name='Improved Path',
-                line=dict(color='#2ca02c', width=2)
-            ))
-            
-            fig.update_layout(
-                title="Net Worth Over Time",
-                xaxis_title="Date",
-                yaxis_title="Net Worth ($)",
-                legend_title="Scenario",
-                hovermode="x unified"
-            )
-            
+                st.success("Simulation complete! Go to Future Simulation to see results.")
+        
+        # Financial metrics
+        st.subheader("Key Financial Metrics")
+        
+        # Extract metrics from profile
+        profile = st.session_state.user_profile
+        income = profile["monthly_income"]
+        expense_names, expense_values = _expense_array()
+        totals = _profile_totals()
+        expenses = totals["monthly_expenses"]
+        savings = totals["monthly_savings"]
+        savings_rate = (savings / income) * 100 if income > 0 else 0
+        debt = profile.get("total_debt", 0)
+        
+        # Create metrics visualization
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric("Monthly Savings", f"${savings:.2f}", f"{savings_rate:.1f}% of income")
+        
+        with col2:
+            debt_to_income = (debt / (income * 12)) * 100 if income > 0 else 0
+            st.metric("Debt-to-Annual-Income Ratio", f"{debt_to_income:.1f}%", 
+                      "Good" if debt_to_income < 36 else "High")
+        
+        with col3:
+            expense_ratio = (expenses / income) * 100 if income > 0 else 0
+            st.metric("Expense-to-Income Ratio", f"{expense_ratio:.1f}%", 
+                     "Low" if expense_ratio < 70 else "High")
+        
+        # Create a pie chart of expenses
+        expense_dict = {k.replace('expense_', '').replace('_', ' ').title(): v 
+                      for k, v in zip(expense_names, expense_values) if v > 0}
+        
+        if expense_dict:
+            fig = _expense_pie(tuple(expense_dict.keys()), tuple(expense_dict.values()))
             st.plotly_chart(fig)
+        
+        # Check for achievements if logged in and the profile changed; every
+        # history append comes with a profile version bump
+        achievement_key = (profile_hash, st.session_state.user_profile_version)
+        if (st.session_state.user_id
+                and st.session_state.get("last_achievement_profile_hash") != achievement_key):
+            st.session_state["last_achievement_profile_hash"] = achievement_key
+            
+            # Check emergency fund, savings rate and debt achievements in one pass
+            new_achievements = achievement_system.check_all_achievements(
+                profile, st.session_state.user_id, history=list(st.session_state.profile_history))
+            
+            # If any new achievements were earned, show a notification
+            if new_achievements:
+                # Update achievements in session state
+                _bump_data_version("achievements", st.session_state.user_id)
+                st.session_state.user_achievements = _achievements_for(st.session_state.user_id)
+                
+                st.success(f"You've earned {len(new_achievements)} new achievement(s)! Check the Achievements page.")
+
+# Future Simulation page
+@st.fragment
+def future_simulation_page():
+    st.title("Step 3: Financial Future Simulation")
+    
+    if st.session_state.user_profile is None:
+        st.warning("No financial data available. Please go to Data Input first.")
+    else:
+        import plotly.graph_objects as go
+        import plotly.express as px
+        
+        # Check if we already have simulation results
+        if st.session_state.simulation_results is None:
+            profile_key = tuple(sorted(st.session_state.user_profile.items()))
+            current, improved, comparison = _run_scenarios(profile_key, datetime.now().strftime("%Y-%m"))
+            
+            st.session_state.simulation_results = {
+                "current": current,
+                "improved": improved,
+                "comparison": comparison
+            }
             
-            # Show savings vs. debt charts
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Savings chart
-                fig_savings = go.Figure()
-                
-                fig_savings.add_trace(go.Scatter(
-                    x=current_dates,
-                    y=current['savings'],
-                    mode='lines',
-                    name='Current Path',
-                    line=dict(color='#1f77b4', width=2)
-                ))
-                
-                fig_savings.add_trace(go.Scatter(
-                    x=current_dates,
-                    y=improved['savings'],
-                    mode='lines',
-                    name='Improved Path',
-                    line=dict(color='#2ca02c', width=2)
-                ))
-                
-                fig_savings.update_layout(
-                    title="Savings Growth",
-                    xaxis_title="Date",
-                    yaxis_title="Savings ($)",
-                    legend_title="Scenario",
-                    hovermode="x unified"
-                )
-                
-                st.plotly_chart(fig_savings)
+            # Increment simulation count
+            st.session_state.simulation_count += 1
             
-            with col2:
-                # Debt chart
-                fig_debt = go.Figure()
-                
-                fig_debt.add_trace(go.Scatter(
-                    x=current_dates,
-                    y=current['debt'],
-                    mode='lines',
-                    name='Current Path',
-                    line=dict(color='#1f77b4', width=2)
-                ))
-                
-                fig_debt.add_trace(go.Scatter(
-                    x=current_dates,
-                    y=improved['debt'],
-                    mode='lines',
-                    name='Improved Path',
-                    line=dict(color='#2ca02c', width=2)
-                ))
-                
-                fig_debt.update_layout(
-                    title="Debt Reduction",
-                    xaxis_title="Date",
-                    yaxis_title="Debt ($)",
-                    legend_title="Scenario",
-                    hovermode="x unified"
+            # Check for simulation achievement
+            if st.session_state.user_id:
+                check_usage_achievements(
+                    profile_saved=True,
+                    simulation_run=True
                 )
-                
-                st.plotly_chart(fig_debt)
-            
-            # Impact of changes
-            st.subheader("Impact of Recommended Changes")
-            
-            impact_data = {
-                "Metric": ["Net Worth", "Savings", "Debt Reduction"],
-                "Improvement": [
-                    comparison['difference']['net_worth_diff'],
-                    comparison['difference']['savings_diff'],
-                    comparison['difference']['debt_diff']
-                ]
-            }
+        
+        results = st.session_state.simulation_results
+        current = results["current"]
+        improved = results["improved"]
+        comparison = results["comparison"]
+        
+        # Display comparison summary
+        st.subheader("5-Year Financial Outlook")
+        
+        col1, col2 = st.columns(2)
+        
+        fmt = _simulation_fmt()
+        
+        with col1:
+            st.markdown("### Current Path")
+            st.metric("Net Worth in 5 Years", fmt["current"]["net_worth"], fmt["current"]["net_worth_change"])
+            st.metric("Final Savings", fmt["current"]["savings"])
+            st.metric("Final Debt", fmt["current"]["debt"])
+            
+            if fmt["current"]["debt_free"]:
+                st.success(f"Debt-free by {fmt['current']['debt_free']}")
+        
+        with col2:
+            st.markdown("### Improved Path")
+            st.metric("Net Worth in 5 Years", fmt["improved"]["net_worth"], fmt["improved"]["net_worth_change"])
+            st.metric("Final Savings", fmt["improved"]["savings"])
+            st.metric("Final Debt", fmt["improved"]["debt"])
+            
+            if fmt["improved"]["debt_free"]:
+                st.success(f"Debt-free by {fmt['improved']['debt_free']}")
+        
+        # Visualization of net worth over time
+        st.subheader("Net Worth Projection")
+        
+        # Share one datetime array across all traces; Plotly formats the axis labels
+        current_dates = current['date'].values.astype('datetime64[D]')
+        
+        # Create net worth chart
+        fig = _two_line_chart("Net Worth Over Time", "Net Worth ($)", current_dates,
+                              current['net_worth'].values, improved['net_worth'].values)
+        
+        st.plotly_chart(fig)
+        
+        # Show savings vs. debt charts
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Savings chart
+            fig_savings = _two_line_chart("Savings Growth", "Savings ($)", current_dates,
+                                          current['savings'].values, improved['savings'].values)
             
-            impact_df = pd.DataFrame(impact_data)
+            st.plotly_chart(fig_savings)
+        
+        with col2:
+            # Debt chart
+            fig_debt = _two_line_chart("Debt Reduction", "Debt ($)", current_dates,
+                                       current['debt'].values, improved['debt'].values)
             
-            fig_impact = px.bar(
-                impact_df,
-                x="Metric",
-                y="Improvement",
+            st.plotly_chart(fig_debt)
+        
+        # Impact of changes
+        st.subheader("Impact of Recommended Changes")
+        
+        impact_data = {
+            "Metric": ["Net Worth", "Savings", "Debt Reduction"],
+            "Improvement": [
+                comparison['difference']['net_worth_diff'],
+                comparison['difference']['savings_diff'],
+                comparison['difference']['debt_diff']
+            ]
+        }
+        
+        fig_impact = go.Figure(
+            data=[
+                go.Bar(
+                    x=impact_data["Metric"],
+                    y=impact_data["Improvement"],
+                    marker_color=px.colors.qualitative.Plotly[:len(impact_data["Metric"])],
+                    texttemplate='%{y:.2s}'
+                )
+            ],
+            layout=dict(
                 title="5-Year Financial Improvement ($)",
-                color="Metric",
-                text_auto='.2s'
-            )
-            
-            fig_impact.update_layout(
                 xaxis_title="",
                 yaxis_title="Improvement ($)",
                 showlegend=False
             )
-            
-            st.plotly_chart(fig_impact)
-            
-            # Show specific tips
-            if st.session_state.analysis_results and st.session_state.analysis_results["action_plan"]:
-                st.subheader("Key Actions for Improvement")
-                
-                for i, action in enumerate(st.session_state.analysis_results["action_plan"], 1):
-                    st.write(f"{i}. {action}")
-            
-            # Export options
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.download_button(
-                    label="Download Simulation Results (CSV)",
-                    data=current.to_csv(index=False),
-                    file_name="financial_simulation.csv",
-                    mime="text/csv"
-                )
-            
-            with col2:
-                if st.button("Generate PDF Report"):
-                    # Generate PDF report
-                    report_generator = FinancialReportGenerator()
-                    
-                    # Set up tax analysis if not already done
-                    if st.session_state.tax_analysis is None:
-                        # Calculate tax impact
-                        annual_income = st.session_state.user_profile.get('monthly_income', 0) * 12
-                        tax_calculator = TaxCalculator()
-                        tax_analysis = tax_calculator.calculate_monthly_take_home_pay(annual_income)
-                        st.session_state.tax_analysis = tax_analysis
-                    
-                    # Set up investment profile if not already done
-                    investment_profile = None
-                    if st.session_state.investment_results is None:
-                        # Create basic investment profile
-                        investment_simulator = InvestmentSimulator(st.session_state.user_profile)
-                        recommended_profile = investment_simulator.recommend_risk_profile(st.session_state.user_profile)
-                        
-                        investment_profile = {
-                            "recommended_profile": recommended_profile,
-                            "profile_description": "This investment profile is based on your age, risk tolerance, and financial situation."
-                        }
-                    else:
-                        investment_profile = st.session_state.investment_results
-                    
-                    # Generate the report
-                    output_file = report_generator.generate_financial_report(
-                        st.session_state.user_profile,
-                        st.session_state.analysis_results,
-                        st.session_state.simulation_results,
-                        investment_profile,
-                        st.session_state.tax_analysis
-                    )
-                    
-                    # Create download link
-                    st.markdown(get_pdf_download_link(output_file), unsafe_allow_html=True)
-    
-    elif page == "Investment Planner":
-        st.title("Investment Strategy Planner")
+        )
         
-        if st.session_state.user_profile is None:
-            st.warning("No financial data available. Please go to Data Input first.")
-        else:
-            profile = st.session_state.user_profile
-            
-            # Initialize investment simulator
-            investment_simulator = InvestmentSimulator(profile)
-            
-            # Get recommended risk profile
-            recommended_profile = investment_simulator.recommend_risk_profile(profile)
-            
-            st.subheader("Investment Recommendation")
-            
-            # Display recommended risk profile
-            risk_profile_names = {
-                "very_conservative": "Very Conservative",
-                "conservative": "Conservative",
-                "moderate": "Moderate",
-                "aggressive": "Aggressive",
-                "very_aggressive": "Very Aggressive"
-            }
-            
-            recommended_name = risk_profile_names.get(recommended_profile, recommended_profile.replace("_", " ").title())
-
-            st.markdown(f"### Based on your profile, we recommend a **{recommended_name}** investment strategy.")
+        st.plotly_chart(fig_impact)
+        
+        # Show specific tips
+        if st.session_state.analysis_results and st.session_state.analysis_results["action_plan"]:
+            st.subheader("Key Actions for Improvement")
             
-            # Risk profile descriptions
-            risk_descriptions = {
-                "very_conservative": "This strategy prioritizes capital preservation with minimal risk. It's suitable for those close to retirement or with a very low risk tolerance.",
-                "conservative": "This strategy focuses on stability with some growth potential. It's suitable for those who want to protect their capital but also achieve modest growth.",
-                "moderate": "This balanced strategy aims for growth while managing volatility. It's suitable for those with a medium-term investment horizon (5-10 years).",
-                "aggressive": "This strategy prioritizes growth with higher volatility. It's suitable for those with a long-term investment horizon who can tolerate market fluctuations.",
-                "very_aggressive": "This strategy maximizes growth potential with significant volatility. It's suitable for young investors with a very long-term horizon who can tolerate substantial market fluctuations."
-            }
+            for i, action in enumerate(st.session_state.analysis_results["action_plan"], 1):
+                st.write(f"{i}. {action}")
+        
+        # Export options
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.download_button(
+                label="Download Simulation Results (CSV)",
+                data=_csv_bytes(current),
+                file_name="financial_simulation.csv",
+                mime="text/csv"
+            )
             
-            st.write(risk_descriptions.get(recommended_profile, ""))
-            
-            # Show why this recommendation was made
-            st.subheader("Factors Influencing This Recommendation")
-            
-            factors = []
-            
-            # Age factor
-            age = profile.get('age', 35)
-            if age < 30:
-                factors.append("You're young and have time to weather market volatility")
-            elif age < 45:
-                factors.append("You're in your prime earning years with time to grow investments")
-            elif age < 60:
-                factors.append("You're approaching retirement planning stage")
-            else:
-                factors.append("You're near or in retirement, requiring more capital preservation")
-            
-            # Risk tolerance factor
-            risk_tolerance = profile.get('risk_tolerance', 'Medium')
-            factors.append(f"You've indicated a {risk_tolerance} risk tolerance")
-            
-            # Emergency fund factor
-            monthly_expenses = sum([v for k, v in profile.items() if k.startswith('expense_')])
-            current_savings = profile.get('current_savings', 0)
-            if monthly_expenses > 0:
-                months_saved = current_savings / monthly_expenses
-                if months_saved < 3:
-                    factors.append("Your emergency fund is below the recommended 3-6 months")
-                elif months_saved >= 6:
-                    factors.append("You have a solid emergency fund (6+ months)")
+            # Save to the database only when asked, not on every simulation run
+            if not st.session_state.get('is_guest', False) and st.button("Save Simulation to My Account"):
+                profile_id = _current_profile_id()
+                if profile_id:
+                    success, message, _ = user_db.save_simulation_results(
+                        profile_id, _simulation_payload(results))
+                    if success:
+                        st.success(message)
+                    else:
+                        st.error(message)
                 else:
-                    factors.append("Your emergency fund is adequate (3-6 months)")
-            
-            # Debt factor
-            total_debt = profile.get('total_debt', 0)
-            if total_debt > 0:
-                debt_apr = profile.get('primary_debt_apr', 0)
-                if debt_apr > 8:
-                    factors.append(f"You have high-interest debt ({debt_apr}% APR) that should be prioritized")
+                    st.warning("Save your financial profile first to store simulations with it.")
+        
+        with col2:
+            if st.button("Generate PDF Report"):
+                # Generate PDF report
+                report_generator = initialize_report_generator()
+                
+                # Set up tax analysis if not already done
+                if st.session_state.tax_analysis is None:
+                    # Calculate tax impact
+                    tax_analysis = initialize_tax_calculator().calculate_monthly_take_home_pay(
+                        _profile_totals()["annual_income"])
+                    st.session_state.tax_analysis = tax_analysis
+                
+                # Set up investment profile if not already done
+                investment_profile = None
+                if st.session_state.investment_results is None:
+                    # Create basic investment profile
+                    investment_simulator = _investment_simulator(tuple(sorted(st.session_state.user_profile.items())))
+                    recommended_profile = investment_simulator.recommend_risk_profile(st.session_state.user_profile)
+                    
+                    investment_profile = {
+                        "recommended_profile": recommended_profile,
+                        "profile_description": "This investment profile is based on your age, risk tolerance, and financial situation."
+                    }
                 else:
-                    factors.append(f"You have manageable low-interest debt ({debt_apr}% APR)")
-            else:
-                factors.append("You're debt-free, which allows for more aggressive investing")
-            
-            # Display factors
-            for factor in factors:
-                st.write(f"• {factor}")
-            
-            # Show asset allocation
-            st.subheader("Recommended Asset Allocation")
-            
-            # Get allocation for the recommended profile
-            asset_classes = {
-                "savings_account": "Savings Account",
-                "bonds": "Bonds",
-                "index_funds": "Index Funds",
-                "stocks": "Stocks",
-                "crypto": "Crypto"
-            }
-            
-            allocation = investment_simulator.risk_profiles.get(recommended_profile, {})
-            
-            # Create allocation chart
-            allocation_data = []
-            for asset_code, percentage in allocation.items():
-                if percentage > 0:
-                    allocation_data.append({
-                        "Asset": asset_classes.get(asset_code, asset_code),
-                        "Percentage": percentage * 100
-                    })
-            
-            if allocation_data:
-                allocation_df = pd.DataFrame(allocation_data)
-                fig = px.pie(
-                    allocation_df,
-                    values="Percentage",
-                    names="Asset",
-                    title=f"Asset Allocation - {recommended_name} Profile",
-                    hole=0.4
-                )
-                st.plotly_chart(fig)
-            
-            # Simulation options
-            st.subheader("Investment Growth Simulation")
-            
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                selected_profile = st.selectbox(
-                    "Select Risk Profile", 
-                    list(risk_profile_names.keys()),
-                    index=list(risk_profile_names.keys()).index(recommended_profile) if recommended_profile in risk_profile_names else 2
-                )
-            
-            with col2:
-                monthly_contribution = st.number_input(
-                    "Monthly Contribution ($)",
-                    min_value=0.0,
-                    value=max(profile.get('monthly_savings', 0) * 0.5, 100),
-                    step=25.0
+                    investment_profile = st.session_state.investment_results
+                
+                # Generate the report in the background unless it's already on disk
+                st.session_state.pdf_future = submit_pdf_report(
+                    report_generator,
+                    st.session_state.user_profile,
+                    st.session_state.analysis_results,
+                    st.session_state.simulation_results,
+                    investment_profile,
+                    st.session_state.tax_analysis
                 )
             
-            with col3:
-                initial_investment = st.number_input(
-                    "Initial Investment ($)",
-                    min_value=0.0,
-                    value=float(profile.get('current_investments', 0.0)),  # Convert to float
-                    step=1000.0
-                )
+            # Create download button once the report is ready
+            pdf_report_status("pdf_future")
 
+# Investment Planner page
+@st.fragment
+def investment_planner_page():
+    st.title("Investment Strategy Planner")
+    
+    if st.session_state.user_profile is None:
+        st.warning("No financial data available. Please go to Data Input first.")
+    else:
+        import plotly.graph_objects as go
+        import plotly.express as px
+        
+        profile = st.session_state.user_profile
+        profile_key = tuple(sorted(profile.items()))
+        
+        # Shared investment simulator for this profile
+        investment_simulator = _investment_simulator(profile_key)
+        
+        # Get recommended risk profile
+        recommended_profile = investment_simulator.recommend_risk_profile(profile)
+        
+        st.subheader("Investment Recommendation")
+        
+        # Display recommended risk profile
+        recommended_name = RISK_PROFILE_NAMES.get(recommended_profile, recommended_profile.replace("_", " ").title())
+        
+        st.markdown(f"### Based on your profile, we recommend a **{recommended_name}** investment strategy.")
+        
+        # Risk profile descriptions
+        risk_descriptions = {
+            "very_conservative": "This strategy prioritizes capital preservation with minimal risk. It's suitable for those close to retirement or with a very low risk tolerance.",
+            "conservative": "This strategy focuses on stability with some growth potential. It's suitable for those who want to protect their capital but also achieve modest growth.",
+            "moderate": "This balanced strategy aims for growth while managing volatility. It's suitable for those with a medium-term investment horizon (5-10 years).",
+            "aggressive": "This strategy prioritizes growth with higher volatility. It's suitable for those with a long-term investment horizon who can tolerate market fluctuations.",
+            "very_aggressive": "This strategy maximizes growth potential with significant volatility. It's suitable for young investors with a very long-term horizon who can tolerate substantial market fluctuations."
+        }
+        
+        st.write(risk_descriptions.get(recommended_profile, ""))
+        
+        # Show why this recommendation was made
+        st.subheader("Factors Influencing This Recommendation")
+        
+        factors = []
+        
+        # Age factor
+        age = profile.get('age', 35)
+        factors.append(AGE_FACTORS[np.searchsorted(AGE_BINS, age, side='right')])
+        
+        # Risk tolerance factor
+        risk_tolerance = profile.get('risk_tolerance', 'Medium')
+        factors.append(f"You've indicated a {risk_tolerance} risk tolerance")
+        
+        # Emergency fund factor
+        monthly_expenses = _profile_totals()["monthly_expenses"]
+        current_savings = profile.get('current_savings', 0)
+        if monthly_expenses > 0:
+            months_saved = current_savings / monthly_expenses
+            factors.append(MONTHS_SAVED_FACTORS[np.searchsorted(MONTHS_SAVED_BINS, months_saved, side='right')])
+        
+        # Debt factor
+        total_debt = profile.get('total_debt', 0)
+        if total_debt > 0:
+            debt_apr = profile.get('primary_debt_apr', 0)
+            factors.append(DEBT_APR_FACTORS[np.searchsorted(DEBT_APR_BINS, debt_apr)].format(debt_apr))
+        else:
+            factors.append("You're debt-free, which allows for more aggressive investing")
+        
+        # Display factors
+        for factor in factors:
+            st.write(f"• {factor}")
+        
+        # Show asset allocation
+        st.subheader("Recommended Asset Allocation")
+        
+        # Get allocation for the recommended profile
+        asset_classes = {
+            "savings_account": "Savings Account",
+            "bonds": "Bonds",
+            "index_funds": "Index Funds",
+            "stocks": "Stocks",
+            "crypto": "Crypto"
+        }
+        
+        allocation = investment_simulator.risk_profiles.get(recommended_profile, {})
+        
+        # Create allocation chart
+        allocation_data = []
+        for asset_code, percentage in allocation.items():
+            if percentage > 0:
+                allocation_data.append({
+                    "Asset": asset_classes.get(asset_code, asset_code),
+                    "Percentage": percentage * 100
+                })
+        
+        if allocation_data:
+            allocation_df = pd.DataFrame(allocation_data)
+            fig = px.pie(
+                allocation_df,
+                values="Percentage",
+                names="Asset",
+                title=f"Asset Allocation - {recommended_name} Profile",
+                hole=0.4
+            )
+            st.plotly_chart(fig)
+        
+        # Simulation options
+        st.subheader("Investment Growth Simulation")
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            selected_profile = st.selectbox(
+                "Select Risk Profile", 
+                RISK_PROFILE_ORDER,
+                index=RISK_PROFILE_INDEX.get(recommended_profile, 2)
+            )
+        
+        with col2:
+            monthly_contribution = st.number_input(
+                "Monthly Contribution ($)",
+                min_value=0.0,
+                value=max(profile.get('monthly_savings', 0) * 0.5, 100),
+                step=25.0
+            )
+        
+        with col3:
+            initial_investment = st.number_input(
+                "Initial Investment ($)",
+                min_value=0.0,
+                value=float(profile.get('current_investments', 0.0)),  # Convert to float
+                step=1000.0
+            )
+        
+        
+        simulation_years = st.slider("Simulation Years", 1, 30, 10)
+        
+        if st.button("Run Investment Simulation"):
+            # Run simulations for different risk profiles
+            profile_results, summary = _compare_risk_profiles(
+                profile_key,
+                monthly_contribution,
+                initial_investment,
+                simulation_years
+            )
             
-            simulation_years = st.slider("Simulation Years", 1, 30, 10)
-            
-            if st.button("Run Investment Simulation"):
-                # Run simulations for different risk profiles
-                profile_results, summary = investment_simulator.compare_risk_profiles(
-                    monthly_contribution=monthly_contribution,
-                    initial_investment=initial_investment
-                )
-                
-                # Store selected profile simulation in session state
-                selected_data = profile_results.get(selected_profile)
+            # Store selected profile simulation in session state
+            selected_data = profile_results.get(selected_profile)
+            
+            if selected_data is not None:
+                # Store investment results
+                st.session_state.investment_results = {
+                    "recommended_profile": recommended_profile,
+                    "selected_profile": selected_profile,
+                    "monthly_contribution": monthly_contribution,
+                    "initial_investment": initial_investment,
+                    "simulation_years": simulation_years,
+                    "final_value": summary[selected_profile]["final_value"],
+                    "total_growth": summary[selected_profile]["total_growth"],
+                    "cagr": summary[selected_profile]["cagr"],
+                    "max_drawdown": summary[selected_profile]["max_drawdown"],
+                    "allocation": investment_simulator.risk_profiles.get(selected_profile, {})
+                }
                 
-                if selected_data is not None:
-                    # Store investment results
-                    st.session_state.investment_results = {
-                        "recommended_profile": recommended_profile,
-                        "selected_profile": selected_profile,
-                        "monthly_contribution": monthly_contribution,
-                        "initial_investment": initial_investment,
-                        "simulation_years": simulation_years,
-                        "final_value": summary[selected_profile]["final_value"],
-                        "total_growth": summary[selected_profile]["total_growth"],
-                        "cagr": summary[selected_profile]["cagr"],
-                        "max_drawdown": summary[selected_profile]["max_drawdown"],
-                        "allocation": investment_simulator.risk_profiles.get(selected_profile, {})
-                    }
-                    
-                    # Display results
-                    st.subheader(f"Projected Investment Growth ({risk_profile_names[selected_profile]} Profile)")
-                    
-                    # Create growth chart
-                    fig = go.Figure()
-                    
-                    dates = [d.strftime('%Y-%m') for d in selected_data['date']]
-                    
-                    fig.add_trace(go.Scatter(
-                        x=dates,
-                        y=selected_data['total_value'],
-                        mode='lines',
-                        name='Portfolio Value',
-                        line=dict(color='#1f77b4', width=2)
-                    ))
-                    
-                    # Add contribution line (cumulative)
-                    contributions = [initial_investment + monthly_contribution * i for i in range(len(dates))]
-                    
-                    fig.add_trace(go.Scatter(
-                        x=dates,
-                        y=contributions,
-                        mode='lines',
-                        name='Total Contributions',
-                        line=dict(color='#7f7f7f', width=2, dash='dash')
-                    ))
-                    
-                    fig.update_layout(
+                # Display results
+                st.subheader(f"Projected Investment Growth ({RISK_PROFILE_NAMES[selected_profile]} Profile)")
+                
+                # Create growth chart
+                dates = selected_data['date'].values.astype('datetime64[D]')
+                
+                # Add contribution line (cumulative)
+                contributions = initial_investment + monthly_contribution * np.arange(len(dates), dtype=np.float64)
+                
+                fig = go.Figure(
+                    data=[
+                        go.Scatter(
+                            x=dates,
+                            y=selected_data['total_value'].to_numpy(),
+                            mode='lines',
+                            name='Portfolio Value',
+                            line=dict(color='#1f77b4', width=2)
+                        ),
+                        go.Scatter(
+                            x=dates,
+                            y=contributions,
+                            mode='lines',
+                            name='Total Contributions',
+                            line=dict(color='#7f7f7f', width=2, dash='dash')
+                        )
+                    ],
+                    layout=dict(
                         title=f"Investment Growth Over {simulation_years} Years",
                         xaxis_title="Date",
+                        xaxis_tickformat="%Y-%m",
                         yaxis_title="Value ($)",
                         legend_title="",
                         hovermode="x unified"
                     )
-                    
-                    st.plotly_chart(fig)
-                    
-                    # Display summary statistics
-                    st.subheader("Investment Summary")
-                    
-                    stats = summary[selected_profile]
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.metric(
-                            "Final Portfolio Value", 
-                            f"${stats['final_value']:,.2f}",
-                            f"+${stats['total_growth']:,.2f}"
-                        )
-                        st.metric(
-                            "Total Contributions", 
-                            f"${stats['total_contributions'] + stats['initial_investment']:,.2f}"
-                        )
-                    
-                    with col2:
-                        st.metric(
-                            "Compound Annual Growth Rate", 
-                            f"{stats['cagr']:.2f}%"
-                        )
-                        st.metric(
-                            "Maximum Drawdown", 
-                            f"{abs(stats['max_drawdown']):.2f}%"
-                        )
-                    
-                    # Compare different risk profiles
-                    st.subheader("Risk Profile Comparison")
-                    
-                    comparison_data = []
-                    for profile_name, profile_stats in summary.items():
-                        comparison_data.append({
-                            "Risk Profile": risk_profile_names[profile_name],
-                            "Final Value": profile_stats["final_value"],
-                            "CAGR": profile_stats["cagr"],
-                            "Max Drawdown": abs(profile_stats["max_drawdown"])
-                        })
-                    
-                    comparison_df = pd.DataFrame(comparison_data)
-                    
-                    # Display comparison bar chart
-                    fig = px.bar(
-                        comparison_df,
-                        x="Risk Profile",
-                        y="Final Value",
-                        color="Risk Profile",
-                        title="Final Value by Risk Profile",
-                        text_auto='.2s'
-                    )
-                    
-                    fig.update_layout(
-                        xaxis_title="",
-                        yaxis_title="Final Value ($)",
-                        showlegend=False
-                    )
-                    
-                    st.plotly_chart(fig)
-                    
-                    # Display comparison table
-                    st.write(comparison_df.style.format({
-                        "Final Value": "${:,.2f}",
-                        "CAGR": "{:.2f}%",
-                        "Max Drawdown": "{:.2f}%"
-                    }))
-                    
-                    # Investment tips based on selected profile
-                    st.subheader("Investment Tips")
-                    
-                    tips = {
-                        "very_conservative": [
-                            "Focus on high-yield savings accounts and CDs for stability",
-                            "Consider short-term government bonds for slightly higher yields with minimal risk",
-                            "Maintain adequate liquidity for emergency expenses",
-                            "Review your allocation annually to ensure it still matches your goals"
-                        ],
-                        "conservative": [
-                            "Consider a mix of bond funds (government and high-quality corporate)",
-                            "Add a small allocation to broad market index funds for growth",
-                            "Implement dollar-cost averaging to reduce timing risk",
-                            "Rebalance your portfolio annually to maintain target allocation"
-                        ],
-                        "moderate": [
-                            "Use index funds for cost-effective diversification",
-                            "Balance between growth (stocks) and income (bonds) investments",
-                            "Consider target-date funds if you prefer a hands-off approach",
-                            "Rebalance your portfolio 1-2 times per year"
-                        ],
-                        "aggressive": [
-                            "Emphasize stock index funds for long-term growth",
-                            "Consider international exposure for diversification",
-                            "Don't panic sell during market downturns - stick to your strategy",
-                            "Maintain a small bond allocation to reduce overall volatility"
-                        ],
-                        "very_aggressive": [
-                            "Focus on high-growth sectors and small-cap stocks for maximum growth potential",
-                            "Consider a small allocation to alternative investments like REITs",
-                            "Only use this strategy for long-term goals (10+ years)",
-                            "Don't invest money you might need in the near future"
-                        ]
-                    }
-                    
-                    selected_tips = tips.get(selected_profile, ["Diversify your investments", "Invest regularly", "Focus on low-fee options"])
-                    
-                    for tip in selected_tips:
-                        st.write(f"• {tip}")
-                    
-                    # Check for investment achievements
-                    if st.session_state.user_id:
-                        investment_data = {
-                            "total_invested": initial_investment + monthly_contribution * 12 * simulation_years,
-                            "asset_allocation": investment_simulator.risk_profiles.get(selected_profile, {}),
-                            "retirement_investing_years": profile.get("retirement_investing_years", 0)
-                        }
-                        
-                        investment_achievements = achievement_system.check_investment_achievements(
-                            profile, investment_data, st.session_state.user_id)
-                        
-                        if investment_achievements:
-                            st.success(f"You've earned {len(investment_achievements)} investment achievement(s)! Check the Achievements page.")
-                            
-                            # Update achievements in session state
-                            st.session_state.user_achievements = user_db.get_user_achievements(st.session_state.user_id)
-    
-    elif page == "Tax Analysis":
-        st.title("Tax Impact Analysis")
-        
-        if st.session_state.user_profile is None:
-            st.warning("No financial data available. Please go to Data Input first.")
-        else:
-            profile = st.session_state.user_profile
-            
-            # Extract income information
-            monthly_income = profile.get('monthly_income', 0)
-            annual_income = monthly_income * 12
-            
-            st.subheader("Income and Tax Settings")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                annual_income_input = st.number_input(
-                    "Annual Gross Income ($)",
-                    min_value=0.0,
-                    value=float(annual_income),
-                    step=1000.0
-                )
-                
-                filing_status = st.selectbox(
-                    "Filing Status",
-                    ["Single", "Married Filing Jointly", "Married Filing Separately", "Head of Household"]
-                )
-            
-            with col2:
-                state_tax_rate = st.slider(
-                    "State Income Tax Rate (%)",
-                    min_value=0.0,
-                    max_value=13.0,
-                    value=5.0,
-                    step=0.1
-                )
-                
-                retirement_contribution_pct = st.slider(
-                    "Retirement Contribution (% of income)",
-                    min_value=0.0,
-                    max_value=20.0,
-                    value=5.0,
-                    step=0.5
                 )
-            
-            # Advanced options
-            with st.expander("Advanced Tax Options"):
-                col1, col2 = st.columns(2)
                 
-                with col1:
-                    other_pretax_deductions = st.number_input(
-                        "Other Pre-tax Deductions ($)",
-                        min_value=0.0,
-                        value=0.0,
-                        step=100.0,
-                        help="Examples: Health insurance premiums, HSA contributions, FSA contributions"
-                    )
-                    
-                    itemized_deductions = st.number_input(
-                        "Itemized Deductions ($)",
-                        min_value=0.0,
-                        value=0.0,
-                        step=500.0,
-                        help="Leave at 0 to use standard deduction"
-                    )
-                
-                with col2:
-                    has_investments = st.checkbox("I have investment income")
-                    
-                    investment_income = 0.0
-                    capital_gains = 0.0
-                    
-                    if has_investments:
-                        investment_income = st.number_input(
-                            "Dividend Income ($)",
-                            min_value=0.0,
-                            value=0.0,
-                            step=100.0
-                        )
-                        
-                        capital_gains = st.number_input(
-                            "Capital Gains ($)",
-                            min_value=0.0,
-                            value=0.0,
-                            step=100.0
-                        )
-            
-            # Calculate taxes when button is pressed
-            if st.button("Calculate Tax Impact"):
-                # Configure tax calculator
-                tax_calc = TaxCalculator()
-                tax_calc.set_state_tax_rate(state_tax_rate / 100)
-                
-                # Calculate retirement contribution
-                retirement_contribution = annual_income_input * (retirement_contribution_pct / 100)
-                
-                # Calculate take-home pay
-                take_home_results = tax_calc.calculate_monthly_take_home_pay(
-                    annual_income_input,
-                    retirement_contribution=retirement_contribution,
-                    other_pretax_deductions=other_pretax_deductions
-                )
+                st.plotly_chart(fig)
                 
-                # Store in session state
-                st.session_state.tax_analysis = take_home_results
+                # Display summary statistics
+                st.subheader("Investment Summary")
                 
-                # Display results
-                st.subheader("Tax Breakdown")
+                stats = summary[selected_profile]
                 
                 col1, col2 = st.columns(2)
                 
                 with col1:
                     st.metric(
-                        "Annual Gross Income", 
-                        f"${annual_income_input:,.2f}"
-                    )
-                    st.metric(
-                        "Federal Income Tax", 
-                        f"${take_home_results['federal_income_tax']:,.2f}",
-                        f"{take_home_results['federal_income_tax'] / annual_income_input * 100:.1f}% of income"
+                        "Final Portfolio Value", 
+                        f"${stats['final_value']:,.2f}",
+                        f"+${stats['total_growth']:,.2f}"
                     )
                     st.metric(
-                        "Social Security", 
-                        f"${take_home_results['social_security_tax']:,.2f}",
-                        f"{take_home_results['social_security_tax'] / annual_income_input * 100:.1f}% of income"
-                    )
-                    st.metric(
-                        "Medicare", 
-                        f"${take_home_results['medicare_tax']:,.2f}",
-                        f"{take_home_results['medicare_tax'] / annual_income_input * 100:.1f}% of income"
+                        "Total Contributions", 
+                        f"${stats['total_contributions'] + stats['initial_investment']:,.2f}"
                     )
                 
                 with col2:
                     st.metric(
-                        "State Income Tax", 
-                        f"${take_home_results['state_income_tax']:,.2f}",
-                        f"{take_home_results['state_income_tax'] / annual_income_input * 100:.1f}% of income"
-                    )
-                    st.metric(
-                        "Retirement Contribution", 
-                        f"${retirement_contribution:,.2f}",
-                        f"{retirement_contribution_pct:.1f}% of income"
+                        "Compound Annual Growth Rate", 
+                        f"{stats['cagr']:.2f}%"
                     )
                     st.metric(
-                        "Total Tax Burden", 
-                        f"${take_home_results['total_tax']:,.2f}",
-                        f"{take_home_results['effective_tax_rate'] * 100:.1f}% effective rate"
+                        "Maximum Drawdown", 
+                        f"{abs(stats['max_drawdown']):.2f}%"
                     )
-                    st.metric(
-                        "Monthly Take-Home Pay", 
-                        f"${take_home_results['monthly_take_home']:,.2f}"
-                    )
-                
-                # Create pie chart of income distribution
-                income_distribution = [
-                    {"Category": "Take-Home Pay", "Amount": take_home_results['annual_take_home']},
-                    {"Category": "Federal Tax", "Amount": take_home_results['federal_income_tax']},
-                    {"Category": "FICA Taxes", "Amount": take_home_results['social_security_tax'] + take_home_results['medicare_tax']},
-                    {"Category": "State Tax", "Amount": take_home_results['state_income_tax']},
-                    {"Category": "Retirement", "Amount": retirement_contribution}
-                ]
-                
-                income_df = pd.DataFrame(income_distribution)
-                
-                fig = px.pie(
-                    income_df,
-                    values="Amount",
-                    names="Category",
-                    title="Annual Income Distribution",
-                    hole=0.4
-                )
-                
-                st.plotly_chart(fig)
-                
-                # Tax saving opportunities
-                st.subheader("Tax Saving Opportunities")
-                
-                # Calculate traditional retirement account savings
-                retirement_tax_savings = tax_calc.calculate_retirement_contribution_tax_savings(
-                    annual_income_input, retirement_contribution)
-                
-                st.write(f"By contributing ${retirement_contribution:,.2f} to a traditional retirement account, you save ${retirement_tax_savings['current_year_tax_savings']:,.2f} in taxes this year.")
-                
-                # Calculate long-term impact
-                st.subheader("Long-Term Tax Impact")
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    projection_years = st.slider("Projection Years", 1, 30, 10)
-                
-                with col2:
-                    income_growth = st.slider("Annual Income Growth (%)", 0.0, 10.0, 3.0, 0.1)
-                
-                # Run tax impact simulation
-                tax_simulation = tax_calc.simulate_tax_impact_on_financial_path(
-                    annual_income=annual_income_input,
-                    yearly_income_growth=income_growth / 100,
-                    retirement_contribution_percent=retirement_contribution_pct / 100,
-                    years=projection_years,
-                    investment_return_rate=0.07,
-                    initial_investment=profile.get('current_investments', 0)
-                )
-                
-                # Display tax impact over time
-                fig = go.Figure()
                 
-                fig.add_trace(go.Scatter(
-                    x=tax_simulation['year'],
-                    y=tax_simulation['federal_tax'],
-                    mode='lines+markers',
-                    name='Federal Tax',
-                    line=dict(color='#ef553b', width=2)
-                ))
+                # Compare different risk profiles
+                st.subheader("Risk Profile Comparison")
                 
-                fig.add_trace(go.Scatter(
-                    x=tax_simulation['year'],
-                    y=tax_simulation['state_tax'],
-                    mode='lines+markers',
-                    name='State Tax',
-                    line=dict(color='#636efa', width=2)
-                ))
+                comparison_data = []
+                for profile_name, profile_stats in summary.items():
+                    comparison_data.append({
+                        "Risk Profile": RISK_PROFILE_NAMES[profile_name],
+                        "Final Value": profile_stats["final_value"],
+                        "CAGR": profile_stats["cagr"],
+                        "Max Drawdown": abs(profile_stats["max_drawdown"])
+                    })
                 
-                fig.add_trace(go.Scatter(
-                    x=tax_simulation['year'],
-                    y=tax_simulation['fica_tax'],
-                    mode='lines+markers',
-                    name='FICA Taxes',
-                    line=dict(color='#00cc96', width=2)
-                ))
+                comparison_df = pd.DataFrame(comparison_data)
                 
-                fig.update_layout(
-                    title="Tax Projection Over Time",
-                    xaxis_title="Year",
-                    yaxis_title="Annual Tax Amount ($)",
-                    legend_title="Tax Type",
-                    hovermode="x unified"
+                # Display comparison bar chart
+                fig = go.Figure(
+                    data=[
+                        go.Bar(
+                            x=comparison_df["Risk Profile"],
+                            y=comparison_df["Final Value"],
+                            marker_color=px.colors.qualitative.Plotly[:len(comparison_df)],
+                            texttemplate='%{y:.2s}'
+                        )
+                    ],
+                    layout=dict(
+                        title="Final Value by Risk Profile",
+                        xaxis_title="",
+                        yaxis_title="Final Value ($)",
+                        showlegend=False
+                    )
                 )
                 
                 st.plotly_chart(fig)
                 
-                # Show investment growth with tax implications
-                fig = go.Figure()
-                
-                fig.add_trace(go.Scatter(
-                    x=tax_simulation['year'],
-                    y=tax_simulation['tax_advantaged_value'],
-                    mode='lines',
-                    name='Tax-Advantaged Investments',
-                    line=dict(color='#2ca02c', width=2)
-                ))
-                
-                fig.add_trace(go.Scatter(
-                    x=tax_simulation['year'],
-                    y=tax_simulation['taxable_investment_value'],
-                    mode='lines',
-                    name='Taxable Investments',
-                    line=dict(color='#1f77b4', width=2)
-                ))
-                
-                fig.update_layout(
-                    title="Investment Growth With Tax Implications",
-                    xaxis_title="Year",
-                    yaxis_title="Value ($)",
-                    legend_title="",
-                    hovermode="x unified"
+                # Display comparison table
+                st.markdown(
+                    _styled_comparison_html(tuple(tuple(row.values()) for row in comparison_data)),
+                    unsafe_allow_html=True
                 )
                 
-                st.plotly_chart(fig)
-                
-                # Tax optimization tips
-                st.subheader("Tax Optimization Tips")
+                # Investment tips based on selected profile
+                st.subheader("Investment Tips")
                 
-                tax_tips = [
-                    "**Maximize tax-advantaged accounts** like 401(k)s, IRAs, and HSAs to reduce taxable income.",
-                    "**Consider Roth vs. Traditional** retirement accounts based on your current and expected future tax brackets.",
-                    "**Tax-loss harvesting** can offset capital gains with losses in taxable investment accounts.",
-                    "**Hold tax-efficient investments** like index funds and ETFs in taxable accounts.",
-                    "**Consider municipal bonds** for tax-free income if you're in a high tax bracket.",
-                    "**Bunching itemized deductions** in alternate years may help exceed the standard deduction threshold.",
-                    "**Review your W-4 withholding** to ensure you're not over or under-withholding."
-                ]
+                selected_tips = INVESTMENT_TIPS.get(selected_profile, DEFAULT_INVESTMENT_TIPS)
                 
-                for tip in tax_tips:
-                    st.markdown(f"• {tip}")
+                for tip in selected_tips:
+                    st.write(f"• {tip}")
                 
-                # Check for tax achievements
+                # Check for investment achievements
                 if st.session_state.user_id:
-                    tax_data = {
-                        "tax_advantaged_contributions": retirement_contribution,
-                        "tax_loss_harvesting": False,
-                        "backdoor_roth": False,
-                        "mega_backdoor_roth": False,
-                        "hsa_contributions": 0
+                    investment_data = {
+                        "total_invested": initial_investment + monthly_contribution * 12 * simulation_years,
+                        "asset_allocation": investment_simulator.risk_profiles.get(selected_profile, {}),
+                        "retirement_investing_years": profile.get("retirement_investing_years", 0)
                     }
                     
-                    tax_achievements = achievement_system.check_tax_achievements(
-                        profile, tax_data, st.session_state.user_id)
+                    investment_achievements = _check_once(
+                        "investment", profile, investment_data, achievement_system.check_investment_achievements)
                     
-                    if tax_achievements:
-                        st.success(f"You've earned {len(tax_achievements)} tax optimization achievement(s)! Check the Achievements page.")
+                    if investment_achievements:
+                        st.success(f"You've earned {len(investment_achievements)} investment achievement(s)! Check the Achievements page.")
                         
-                        # Update achievements in session state
-                        st.session_state.user_achievements = user_db.get_user_achievements(st.session_state.user_id)
+                        # Add the new ones to session state; the Achievements page refetches
+                        _add_earned_achievements(investment_achievements)
+
+# Long-term tax projection with its own sliders, rerun on its own when they change
+@st.fragment
+def _tax_projection(annual_income_input, retirement_contribution_pct, state_tax_rate, initial_investment):
+    import plotly.graph_objects as go
     
-    elif page == "Achievements":
-        st.title("Financial Achievements")
+    st.subheader("Long-Term Tax Impact")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        projection_years = st.slider("Projection Years", 1, 30, 10)
+    
+    with col2:
+        income_growth = st.slider("Annual Income Growth (%)", 0.0, 10.0, 3.0, 0.1)
+    
+    # Run tax impact simulation
+    tax_simulation = _simulate_tax_impact(
+        annual_income_input,
+        income_growth / 100,
+        retirement_contribution_pct / 100,
+        projection_years,
+        initial_investment,
+        state_tax_rate / 100
+    )
+    
+    # Pull each column out once as a numpy array for the traces below
+    years = tax_simulation['year'].to_numpy()
+    
+    # Display tax impact over time
+    fig = go.Figure(
+        data=[
+            go.Scatter(
+                x=years,
+                y=tax_simulation['federal_tax'].to_numpy(),
+                mode='lines+markers',
+                name='Federal Tax',
+                line=dict(color='#ef553b', width=2)
+            ),
+            go.Scatter(
+                x=years,
+                y=tax_simulation['state_tax'].to_numpy(),
+                mode='lines+markers',
+                name='State Tax',
+                line=dict(color='#636efa', width=2)
+            ),
+            go.Scatter(
+                x=years,
+                y=tax_simulation['fica_tax'].to_numpy(),
+                mode='lines+markers',
+                name='FICA Taxes',
+                line=dict(color='#00cc96', width=2)
+            )
+        ],
+        layout=dict(
+            title="Tax Projection Over Time",
+            xaxis_title="Year",
+            yaxis_title="Annual Tax Amount ($)",
+            legend_title="Tax Type",
+            hovermode="x unified",
+            uirevision="tax_projection"
+        )
+    )
+    
+    st.plotly_chart(fig)
+    
+    # Show investment growth with tax implications
+    fig = go.Figure(
+        data=[
+            go.Scatter(
+                x=years,
+                y=tax_simulation['tax_advantaged_value'].to_numpy(),
+                mode='lines',
+                name='Tax-Advantaged Investments',
+                line=dict(color='#2ca02c', width=2)
+            ),
+            go.Scatter(
+                x=years,
+                y=tax_simulation['taxable_investment_value'].to_numpy(),
+                mode='lines',
+                name='Taxable Investments',
+                line=dict(color='#1f77b4', width=2)
+            )
+        ],
+        layout=dict(
+            title="Investment Growth With Tax Implications",
+            xaxis_title="Year",
+            yaxis_title="Value ($)",
+            legend_title="",
+            hovermode="x unified",
+            uirevision="tax_projection"
+        )
+    )
+    
+    st.plotly_chart(fig)
+
+# Tax Analysis page
+@st.fragment
+def tax_analysis_page():
+    st.title("Tax Impact Analysis")
+    
+    if st.session_state.user_profile is None:
+        st.warning("No financial data available. Please go to Data Input first.")
+    else:
+        import plotly.express as px
         
-        if not st.session_state.user_id:
-            st.warning("Please log in to track achievements.")
-        else:
-            # Get latest achievements
-            achievements = user_db.get_user_achievements(st.session_state.user_id)
-            st.session_state.user_achievements = achievements
-            
-            # Group achievements by level
-            achievement_levels = {
-                "bronze": [],
-                "silver": [],
-                "gold": [],
-                "platinum": []
-            }
+        profile = st.session_state.user_profile
+        
+        # Extract income information
+        annual_income = _profile_totals()["annual_income"]
+        
+        st.subheader("Income and Tax Settings")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            annual_income_input = st.number_input(
+                "Annual Gross Income ($)",
+                min_value=0.0,
+                value=float(annual_income),
+                step=1000.0
+            )
+            
+            filing_status = st.selectbox(
+                "Filing Status",
+                ["Single", "Married Filing Jointly", "Married Filing Separately", "Head of Household"]
+            )
+        
+        with col2:
+            state_tax_rate = st.slider(
+                "State Income Tax Rate (%)",
+                min_value=0.0,
+                max_value=13.0,
+                value=5.0,
+                step=0.1
+            )
             
-            for achievement in achievements:
-                level = achievement["data"].get("level", "bronze")
-                achievement_levels[level].append(achievement)
+            retirement_contribution_pct = st.slider(
+                "Retirement Contribution (% of income)",
+                min_value=0.0,
+                max_value=20.0,
+                value=5.0,
+                step=0.5
+            )
+        
+        # Advanced options
+        with st.expander("Advanced Tax Options"):
+            col1, col2 = st.columns(2)
             
-            # Count achievements by level
-            level_counts = {level: len(achievements) for level, achievements in achievement_levels.items()}
-            total_achievements = sum(level_counts.values())
+            with col1:
+                other_pretax_deductions = st.number_input(
+                    "Other Pre-tax Deductions ($)",
+                    min_value=0.0,
+                    value=0.0,
+                    step=100.0,
+                    help="Examples: Health insurance premiums, HSA contributions, FSA contributions"
+                )
+                
+                itemized_deductions = st.number_input(
+                    "Itemized Deductions ($)",
+                    min_value=0.0,
+                    value=0.0,
+                    step=500.0,
+                    help="Leave at 0 to use standard deduction"
+                )
             
-            # Show achievement progress
-            st.subheader("Achievement Progress")
+            with col2:
+                has_investments = st.checkbox("I have investment income")
+                
+                investment_income = 0.0
+                capital_gains = 0.0
+                
+                if has_investments:
+                    investment_income = st.number_input(
+                        "Dividend Income ($)",
+                        min_value=0.0,
+                        value=0.0,
+                        step=100.0
+                    )
+                    
+                    capital_gains = st.number_input(
+                        "Capital Gains ($)",
+                        min_value=0.0,
+                        value=0.0,
+                        step=100.0
+                    )
+        
+        # Calculate taxes when button is pressed
+        if st.button("Calculate Tax Impact"):
+            # Calculate retirement contribution
+            retirement_contribution = annual_income_input * (retirement_contribution_pct / 100)
+            
+            # Calculate take-home pay
+            take_home_results = _take_home(
+                annual_income_input,
+                retirement_contribution,
+                other_pretax_deductions,
+                state_tax_rate / 100
+            )
             
-            # Get all possible achievements
-            all_achievement_defs = achievement_system.get_all_achievement_definitions()
-            total_possible = len(all_achievement_defs)
+            # Store in session state
+            st.session_state.tax_analysis = take_home_results
+            
+            # Display results
+            st.subheader("Tax Breakdown")
+            
+            # Share of gross income for each line; guards against a zero income
+            gross_income = annual_income_input or 1.0
+            
+            def share_of_income(amount):
+                return f"{amount / gross_income * 100:.1f}% of income"
+            
+            # One table instead of eight metric widgets
+            tax_rows = [
+                ("Annual Gross Income", f"${annual_income_input:,.2f}", ""),
+                ("Federal Income Tax", f"${take_home_results['federal_income_tax']:,.2f}",
+                 share_of_income(take_home_results['federal_income_tax'])),
+                ("Social Security", f"${take_home_results['social_security_tax']:,.2f}",
+                 share_of_income(take_home_results['social_security_tax'])),
+                ("Medicare", f"${take_home_results['medicare_tax']:,.2f}",
+                 share_of_income(take_home_results['medicare_tax'])),
+                ("State Income Tax", f"${take_home_results['state_income_tax']:,.2f}",
+                 share_of_income(take_home_results['state_income_tax'])),
+                ("Retirement Contribution", f"${retirement_contribution:,.2f}",
+                 f"{retirement_contribution_pct:.1f}% of income"),
+                ("Total Tax Burden", f"${take_home_results['total_tax']:,.2f}",
+                 f"{take_home_results['effective_tax_rate'] * 100:.1f}% effective rate"),
+                ("Monthly Take-Home Pay", f"${take_home_results['monthly_take_home']:,.2f}", "")
+            ]
+            st.dataframe(
+                pd.DataFrame(tax_rows, columns=["Item", "Amount", "Share"]),
+                hide_index=True,
+                use_container_width=True
+            )
             
-            # Get counts by level
-            bronze_possible = len([a for a in all_achievement_defs.values() if a.get("level") == "bronze"])
-            silver_possible = len([a for a in all_achievement_defs.values() if a.get("level") == "silver"])
-            gold_possible = len([a for a in all_achievement_defs.values() if a.get("level") == "gold"])
-            platinum_possible = len([a for a in all_achievement_defs.values() if a.get("level") == "platinum"])
+            # Create pie chart of income distribution
+            fig = px.pie(
+                values=[
+                    take_home_results['annual_take_home'],
+                    take_home_results['federal_income_tax'],
+                    take_home_results['social_security_tax'] + take_home_results['medicare_tax'],
+                    take_home_results['state_income_tax'],
+                    retirement_contribution
+                ],
+                names=["Take-Home Pay", "Federal Tax", "FICA Taxes", "State Tax", "Retirement"],
+                title="Annual Income Distribution",
+                hole=0.4
+            )
             
-            # Create progress bars
-            col1, col2, col3, col4 = st.columns(4)
+            # A static summary, so skip the interactive plotly.js scene
+            st.plotly_chart(fig, config={"staticPlot": True, "displayModeBar": False})
             
-            with col1:
-                st.metric("Bronze", f"{level_counts['bronze']}/{bronze_possible}")
-                st.progress(level_counts['bronze'] / bronze_possible if bronze_possible > 0 else 0)
+            # Tax saving opportunities
+            st.subheader("Tax Saving Opportunities")
             
-            with col2:
-                st.metric("Silver", f"{level_counts['silver']}/{silver_possible}")
-                st.progress(level_counts['silver'] / silver_possible if silver_possible > 0 else 0)
+            # Calculate traditional retirement account savings (federal only,
+            # so the shared default-rate calculator gives the same result)
+            retirement_tax_savings = initialize_tax_calculator().calculate_retirement_contribution_tax_savings(
+                annual_income_input, retirement_contribution)
             
-            with col3:
-                st.metric("Gold", f"{level_counts['gold']}/{gold_possible}")
-                st.progress(level_counts['gold'] / gold_possible if gold_possible > 0 else 0)
+            st.write(f"By contributing ${retirement_contribution:,.2f} to a traditional retirement account, you save ${retirement_tax_savings['current_year_tax_savings']:,.2f} in taxes this year.")
             
-            with col4:
-                st.metric("Platinum", f"{level_counts['platinum']}/{platinum_possible}")
-                st.progress(level_counts['platinum'] / platinum_possible if platinum_possible > 0 else 0)
+            # Calculate long-term impact; the projection sliders rerun only this section
+            _tax_projection(
+                annual_income_input,
+                retirement_contribution_pct,
+                state_tax_rate,
+                profile.get('current_investments', 0)
+            )
             
-            # Overall progress
-            st.metric("Overall Achievement Progress", f"{total_achievements}/{total_possible}")
-            st.progress(total_achievements / total_possible if total_possible > 0 else 0)
+            # Tax optimization tips
+            st.subheader("Tax Optimization Tips")
             
-            # Achievement display by level
-            st.subheader("Your Achievements")
+            for tip in TAX_TIPS:
+                st.markdown(f"• {tip}")
             
-            # Display platinum achievements first (if any)
-            if achievement_levels["platinum"]:
-                st.markdown("### 🏆 Platinum Achievements")
-                
-                for achievement in achievement_levels["platinum"]:
-                    with st.expander(f"🏆 {achievement['data']['title']}"):
-                        st.write(achievement["data"]["description"])
-                        st.info(f"Achieved on: {achievement['achieved_at'][:10]}")
-            
-            # Display gold achievements
-            if achievement_levels["gold"]:
-                st.markdown("### 🥇 Gold Achievements")
+            # Check for tax achievements
+            if st.session_state.user_id:
+                tax_data = {
+                    "tax_advantaged_contributions": retirement_contribution,
+                    "tax_loss_harvesting": False,
+                    "backdoor_roth": False,
+                    "mega_backdoor_roth": False,
+                    "hsa_contributions": 0
+                }
                 
-                achievement_cols = st.columns(3)
-                col_idx = 0
+                tax_achievements = _check_once(
+                    "tax", profile, tax_data, achievement_system.check_tax_achievements)
                 
-                for achievement in achievement_levels["gold"]:
-                    with achievement_cols[col_idx]:
-                        st.markdown(f"#### 🥇 {achievement['data']['title']}")
-                        st.write(achievement["data"]["description"])
-                        st.info(f"Achieved on: {achievement['achieved_at'][:10]}")
+                if tax_achievements:
+                    st.success(f"You've earned {len(tax_achievements)} tax optimization achievement(s)! Check the Achievements page.")
                     
-                    col_idx = (col_idx + 1) % 3
+                    # Add the new ones to session state; the Achievements page refetches
+                    _add_earned_achievements(tax_achievements)
+
+# Achievements page
+@st.fragment
+def achievements_page():
+    st.title("Financial Achievements")
+    
+    if not st.session_state.user_id:
+        st.warning("Please log in to track achievements.")
+    else:
+        # Get latest achievements
+        achievements = _achievements_for(st.session_state.user_id)
+        st.session_state.user_achievements = achievements
+        
+        # Group achievements by level in one pass and count them
+        achievement_levels = collections.defaultdict(list)
+        for achievement in achievements:
+            achievement_levels[achievement["data"].get("level", "bronze")].append(achievement)
+        
+        level_counts = {level: len(achievement_levels[level]) for level in ("bronze", "silver", "gold", "platinum")}
+        total_achievements = len(achievements)
+        
+        # Show achievement progress
+        st.subheader("Achievement Progress")
+        
+        # Get all possible achievements and their counts by level
+        _, possible_by_level = _achievement_definitions_summary()
+        total_possible = sum(possible_by_level.values())
+        bronze_possible = possible_by_level["bronze"]
+        silver_possible = possible_by_level["silver"]
+        gold_possible = possible_by_level["gold"]
+        platinum_possible = possible_by_level["platinum"]
+        
+        # Create progress bars
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Bronze", f"{level_counts['bronze']}/{bronze_possible}")
+            st.progress(level_counts['bronze'] / bronze_possible if bronze_possible > 0 else 0)
+        
+        with col2:
+            st.metric("Silver", f"{level_counts['silver']}/{silver_possible}")
+            st.progress(level_counts['silver'] / silver_possible if silver_possible > 0 else 0)
+        
+        with col3:
+            st.metric("Gold", f"{level_counts['gold']}/{gold_possible}")
+            st.progress(level_counts['gold'] / gold_possible if gold_possible > 0 else 0)
+        
+        with col4:
+            st.metric("Platinum", f"{level_counts['platinum']}/{platinum_possible}")
+            st.progress(level_counts['platinum'] / platinum_possible if platinum_possible > 0 else 0)
+        
+        # Overall progress
+        st.metric("Overall Achievement Progress", f"{total_achievements}/{total_possible}")
+        st.progress(total_achievements / total_possible if total_possible > 0 else 0)
+        
+        # Achievement display by level
+        st.subheader("Your Achievements")
+        
+        # Display platinum achievements first (if any)
+        if achievement_levels["platinum"]:
+            st.markdown("### 🏆 Platinum Achievements")
+            
+            for achievement in achievement_levels["platinum"]:
+                with st.expander(f"🏆 {achievement['data']['title']}"):
+                    st.write(achievement["data"]["description"])
+                    st.info(f"Achieved on: {achievement['achieved_at'][:10]}")
+        
+        # Display gold achievements
+        if achievement_levels["gold"]:
+            st.markdown("### 🥇 Gold Achievements")
             
-            # Display silver achievements
-            if achievement_levels["silver"]:
-                st.markdown("### 🥈 Silver Achievements")
-                
-                achievement_cols = st.columns(3)
-                col_idx = 0
-                
-                for achievement in achievement_levels["silver"]:
-                    with achievement_cols[col_idx]:
-                        st.markdown(f"#### 🥈 {achievement['data']['title']}")
-                        st.write(achievement["data"]["description"])
-                        st.info(f"Achieved on: {achievement['achieved_at'][:10]}")
-                    
-                    col_idx = (col_idx + 1) % 3
+            achievement_cols = st.columns(3)
+            col_idx = 0
             
-            # Display bronze achievements
-            if achievement_levels["bronze"]:
-                st.markdown("### 🥉 Bronze Achievements")
+            for achievement in achievement_levels["gold"]:
+                with achievement_cols[col_idx]:
+                    st.markdown(f"#### 🥇 {achievement['data']['title']}")
+                    st.write(achievement["data"]["description"])
+                    st.info(f"Achieved on: {achievement['achieved_at'][:10]}")
                 
-                achievement_cols = st.columns(3)
-                col_idx = 0
-                
-                for achievement in achievement_levels["bronze"]:
-                    with achievement_cols[col_idx]:
-                        st.markdown(f"#### 🥉 {achievement['data']['title']}")
-                        st.write(achievement["data"]["description"])
-                        st.info(f"Achieved on: {achievement['achieved_at'][:10]}")
-                    
-                    col_idx = (col_idx + 1) % 3
+                col_idx = (col_idx + 1) % 3
+        
+        # Display silver achievements
+        if achievement_levels["silver"]:
+            st.markdown("### 🥈 Silver Achievements")
+            
+            achievement_cols = st.columns(3)
+            col_idx = 0
             
-            # Available achievements
-            with st.expander("Available Achievements"):
-                st.write("Complete these financial milestones to earn more achievements:")
+            for achievement in achievement_levels["silver"]:
+                with achievement_cols[col_idx]:
+                    st.markdown(f"#### 🥈 {achievement['data']['title']}")
+                    st.write(achievement["data"]["description"])
+                    st.info(f"Achieved on: {achievement['achieved_at'][:10]}")
                 
-                # Get earned achievement IDs
-                earned_ids = [a["type"] for a in achievements]
+                col_idx = (col_idx + 1) % 3
+        
+        # Display bronze achievements
+        if achievement_levels["bronze"]:
+            st.markdown("### 🥉 Bronze Achievements")
+            
+            achievement_cols = st.columns(3)
+            col_idx = 0
+            
+            for achievement in achievement_levels["bronze"]:
+                with achievement_cols[col_idx]:
+                    st.markdown(f"#### 🥉 {achievement['data']['title']}")
+                    st.write(achievement["data"]["description"])
+                    st.info(f"Achieved on: {achievement['achieved_at'][:10]}")
                 
-                # Show unearned achievements grouped by category
-                categories = {
-                    "Emergency Fund": ["emergency_starter", "emergency_builder", "emergency_master"],
-                    "Debt Reduction": ["debt_tackler", "debt_crusher", "debt_eliminator"],
-                    "Savings Rate": ["savings_starter", "savings_builder", "super_saver"],
-                    "Financial Planning": ["planner_novice", "planner_adept", "master_planner"],
-                    "Investing": ["investor_starter", "investor_builder", "investor_master"],
-                    "Tax Optimization": ["tax_aware", "tax_optimizer", "tax_master"],
-                    "App Usage": ["first_simulation", "profile_creator", "consistent_user"],
-                    "Master Achievement": ["financial_master"]
-                }
+                col_idx = (col_idx + 1) % 3
+        
+        # Available achievements
+        with st.expander("Available Achievements"):
+            st.write("Complete these financial milestones to earn more achievements:")
+            
+            # Get earned achievement IDs
+            earned_ids = {a["type"] for a in achievements}
+            
+            # Show unearned achievements grouped by category
+            categories = {
+                "Emergency Fund": ["emergency_starter", "emergency_builder", "emergency_master"],
+                "Debt Reduction": ["debt_tackler", "debt_crusher", "debt_eliminator"],
+                "Savings Rate": ["savings_starter", "savings_builder", "super_saver"],
+                "Financial Planning": ["planner_novice", "planner_adept", "master_planner"],
+                "Investing": ["investor_starter", "investor_builder", "investor_master"],
+                "Tax Optimization": ["tax_aware", "tax_optimizer", "tax_master"],
+                "App Usage": ["first_simulation", "profile_creator", "consistent_user"],
+                "Master Achievement": ["financial_master"]
+            }
+            
+            for category, achievement_ids in categories.items():
+                # Filter to unearned achievements
+                unearned = [a_id for a_id in achievement_ids if a_id not in earned_ids]
                 
-                for category, achievement_ids in categories.items():
-                    # Filter to unearned achievements
-                    unearned = [a_id for a_id in achievement_ids if a_id not in earned_ids]
+                if unearned:
+                    st.markdown(f"**{category}**")
                     
-                    if unearned:
-                        st.markdown(f"**{category}**")
-                        
-                        for a_id in unearned:
-                            definition = achievement_system.get_achievement_definition(a_id)
-                            if definition:
-                                level_emoji = "🥉" if definition["level"] == "bronze" else "🥈" if definition["level"] == "silver" else "🥇" if definition["level"] == "gold" else "🏆"
-                                st.write(f"{level_emoji} **{definition['title']}**: {definition['description']}")
+                    for a_id in unearned:
+                        definition = achievement_system.get_achievement_definition(a_id)
+                        if definition:
+                            level_emoji = "🥉" if definition.level == "bronze" else "🥈" if definition.level == "silver" else "🥇" if definition.level == "gold" else "🏆"
+                            st.write(f"{level_emoji} **{definition.title}**: {definition.description}")
+
+# Reports page
+@st.fragment
+def reports_page():
+    st.title("Financial Reports")
     
-    elif page == "Reports":
-        st.title("Financial Reports")
+    if st.session_state.user_profile is None:
+        st.warning("No financial data available. Please go to Data Input first.")
+    else:
+        st.subheader("Generate Custom Financial Report")
         
-        if st.session_state.user_profile is None:
-            st.warning("No financial data available. Please go to Data Input first.")
-        else:
-            st.subheader("Generate Custom Financial Report")
+        # Report options
+        include_investment = st.checkbox("Include Investment Analysis", value=True)
+        include_tax = st.checkbox("Include Tax Analysis", value=True)
+        include_recommendations = st.checkbox("Include Detailed Recommendations", value=True)
+        
+        if st.button("Generate PDF Report"):
+            # Generate PDF report
+            report_generator = initialize_report_generator()
             
-            # Report options
-            include_investment = st.checkbox("Include Investment Analysis", value=True)
-            include_tax = st.checkbox("Include Tax Analysis", value=True)
-            include_recommendations = st.checkbox("Include Detailed Recommendations", value=True)
+            # Check if we have all necessary data, reusing cached results for this profile
+            profile_key = tuple(sorted(st.session_state.user_profile.items()))
+            if st.session_state.analysis_results is None:
+                st.session_state.analysis_results = cached_analyze(profile_key)
+                st.session_state["_analysis_hash"] = _profile_hash(st.session_state.user_profile)
             
-            if st.button("Generate PDF Report"):
-                # Generate PDF report
-                report_generator = FinancialReportGenerator()
-                
-                # Check if we have all necessary data
-                if st.session_state.analysis_results is None:
-                    analyzer = FinancialAnalyzer()
-                    st.session_state.analysis_results = analyzer.analyze_profile(st.session_state.user_profile)
-                
-                if st.session_state.simulation_results is None:
-                    simulator = FinancialSimulator(st.session_state.user_profile)
-                    current, improved, comparison = simulator.compare_scenarios()
-                    st.session_state.simulation_results = {
-                        "current": current,
-                        "improved": improved,
-                        "comparison": comparison
+            if st.session_state.simulation_results is None:
+                current, improved, comparison = _run_scenarios(profile_key, datetime.now().strftime("%Y-%m"))
+                st.session_state.simulation_results = {
+                    "current": current,
+                    "improved": improved,
+                    "comparison": comparison
+                }
+            
+            # Tax analysis
+            tax_analysis = None
+            if include_tax:
+                if st.session_state.tax_analysis is None:
+                    # Calculate tax impact
+                    tax_analysis = initialize_tax_calculator().calculate_monthly_take_home_pay(
+                        _profile_totals()["annual_income"])
+                else:
+                    tax_analysis = st.session_state.tax_analysis
+            
+            # Investment profile
+            investment_profile = None
+            if include_investment:
+                if st.session_state.investment_results is None:
+                    # Create basic investment profile
+                    investment_simulator = _investment_simulator(tuple(sorted(st.session_state.user_profile.items())))
+                    recommended_profile = investment_simulator.recommend_risk_profile(st.session_state.user_profile)
+                    
+                    investment_profile = {
+                        "recommended_profile": recommended_profile,
+                        "profile_description": "This investment profile is based on your age, risk tolerance, and financial situation."
                     }
-                
-                # Tax analysis
-                tax_analysis = None
-                if include_tax:
-                    if st.session_state.tax_analysis is None:
-                        # Calculate tax impact
-                        annual_income = st.session_state.user_profile.get('monthly_income', 0) * 12
-                        tax_calculator = TaxCalculator()
-                        tax_analysis = tax_calculator.calculate_monthly_take_home_pay(annual_income)
-                    else:
-                        tax_analysis = st.session_state.tax_analysis
-                
-                # Investment profile
-                investment_profile = None
-                if include_investment:
-                    if st.session_state.investment_results is None:
-                        # Create basic investment profile
-                        investment_simulator = InvestmentSimulator(st.session_state.user_profile)
-                        recommended_profile = investment_simulator.recommend_risk_profile(st.session_state.user_profile)
-                        
-                        investment_profile = {
-                            "recommended_profile": recommended_profile,
-                            "profile_description": "This investment profile is based on your age, risk tolerance, and financial situation."
-                        }
-                    else:
-                        investment_profile = st.session_state.investment_results
-                
-                # Generate the report
-                output_file = report_generator.generate_financial_report(
-                    st.session_state.user_profile,
-                    st.session_state.analysis_results,
-                    st.session_state.simulation_results,
-                    investment_profile if include_investment else None,
-                    tax_analysis if include_tax else None
-                )
-                
-                # Create download link
-                st.markdown(get_pdf_download_link(output_file), unsafe_allow_html=True)
-                
-                # Show success message
-                st.success("Report generated successfully! Click the link above to download.")
-                
-                # Preview
-                st.subheader("Report Preview")
-                st.write("Your report includes:")
-                
-                report_sections = [
-                    "Financial Health Overview",
-                    "Current Financial Metrics",
-                    "5-Year Financial Projections",
-                    "Recommended Action Plan"
-                ]
-                
-                if include_investment:
-                    report_sections.append("Investment Recommendations")
-                
-                if include_tax:
-                    report_sections.append("Tax Impact Analysis")
-                
-                for section in report_sections:
-                    st.write(f"✅ {section}")
+                else:
+                    investment_profile = st.session_state.investment_results
+            
+            # Generate the report in the background unless it's already on disk
+            st.session_state.report_pdf_future = submit_pdf_report(
+                report_generator,
+                st.session_state.user_profile,
+                st.session_state.analysis_results,
+                st.session_state.simulation_results,
+                investment_profile if include_investment else None,
+                tax_analysis if include_tax else None
+            )
+            
+            report_sections = REPORT_SECTIONS
+            
+            if include_investment:
+                report_sections += ("Investment Recommendations",)
+            
+            if include_tax:
+                report_sections += ("Tax Impact Analysis",)
+            
+            st.session_state.report_sections = report_sections
+        
+        # Create download button once the report is ready
+        if pdf_report_status("report_pdf_future"):
+            # Show success message
+            st.success("Report generated successfully! Click the button above to download.")
+            
+            # Preview
+            st.subheader("Report Preview")
+            st.write("Your report includes:")
+            
+            for section in st.session_state.report_sections:
+                st.write(f"✅ {section}")
+
+def main():
+    if 'user_id' not in st.session_state or st.session_state.user_id is None:
+        page = "Login"
+    else:
+        page = sidebar_navigation()
+    
+    # Page routing
+    if page == "Login":
+        login_page()
+    
+    elif page == "Home":
+        home_page()
+    
+    elif page == "Data Input":
+        data_input_page()
+    
+    elif page == "Analysis":
+        analysis_page()
+    
+    elif page == "Future Simulation":
+        future_simulation_page()
+    
+    elif page == "Investment Planner":
+        investment_planner_page()
+    
+    elif page == "Tax Analysis":
+        tax_analysis_page()
+    
+    elif page == "Achievements":
+        achievements_page()
+    
+    elif page == "Reports":
+        reports_page()
 
 # Run the main application
 if __name__ == "__main__":
@@ -1,8 +1,66 @@
 # Financial Analyzer Module
 
+import functools
+from collections import namedtuple
+
 import pandas as pd
 import numpy as np
 
+from src.utils import njit
+
+# Ratio bounds (percent of income) above which the batch checks report a
+# medium and then a high severity issue, and the labels for those levels
+DTI_THRESHOLDS = np.array([36.0, 50.0])
+EXPENSE_RATIO_THRESHOLDS = np.array([80.0, 90.0])
+SEVERITY_LEVELS = (None, "medium", "high")
+# The values of a profile the checks read, extracted once per profile;
+# monthly_savings is None when the profile doesn't state it
+ProfileRecord = namedtuple('ProfileRecord', [
+    'monthly_income', 'monthly_expenses', 'debt_payments', 'current_savings',
+    'monthly_savings', 'primary_debt_type', 'primary_debt_apr'
+])
+# Distinct profiles whose analysis each analyzer remembers
+ANALYSIS_CACHE_SIZE = 4096
+
+@njit(cache=True)
+def _evaluate_rules(monthly_income, monthly_expenses, debt_payments, monthly_savings,
+                    current_savings, primary_debt_apr, has_debt_type, severity):
+    """
+    Run the five profile checks for every row in one pass.
+    
+    Writes severity[i, k] for row i and check k (in issue_detectors order):
+    0 for no issue, 1 for medium and 2 for high.
+    """
+    for i in range(monthly_income.shape[0]):
+        income = monthly_income[i]
+        expenses = monthly_expenses[i]
+        
+        # Emergency fund; round(months, 1) < 1 exactly when months <= 0.95
+        if current_savings[i] < expenses * 3:
+            if expenses > 0 and current_savings[i] / expenses > 0.95:
+                severity[i, 0] = 1
+            else:
+                severity[i, 0] = 2
+        
+        # Debt-to-income ratio; the level is how many thresholds it exceeds
+        if income > 0:
+            severity[i, 1] = np.searchsorted(DTI_THRESHOLDS, (debt_payments[i] / income) * 100)
+        
+        # Expense ratio; missing income is reported here as high
+        if income == 0:
+            severity[i, 2] = 2
+        else:
+            severity[i, 2] = np.searchsorted(EXPENSE_RATIO_THRESHOLDS, (expenses / income) * 100)
+        
+        # Savings rate
+        savings_rate = (monthly_savings[i] / income) * 100 if income > 0 else 0.0
+        if savings_rate < 10:
+            severity[i, 3] = 1 if savings_rate > 0 else 2
+        
+        # High-interest debt
+        if has_debt_type[i] and primary_debt_apr[i] > 10:
+            severity[i, 4] = 2 if primary_debt_apr[i] > 20 else 1
+
 class FinancialAnalyzer:
     """A class to analyze financial profiles and provide insights."""
     
@@ -15,11 +73,33 @@ class FinancialAnalyzer:
             self._check_savings_rate,
             self._check_high_interest_debt
         ]
+        
+        # Expense keys of a bound schema; None means scan each profile for them
+        self._expense_cols = None
+        
+        # Memoized checks, keyed on the only values they depend on
+        self._analyze_frozen = functools.lru_cache(maxsize=ANALYSIS_CACHE_SIZE, typed=True)(self._analyze_fields)
     
-    def _check_emergency_fund(self, profile):
+    def bind(self, columns):
+        """
+        Fix the expense keys for profiles that all share one schema.
+        
+        Later profiles are summed over these keys directly instead of scanning
+        every key for the expense_ prefix, so each must contain all of them.
+        
+        Args:
+            columns (iterable): Profile keys, e.g. a DataFrame's columns
+        
+        Returns:
+            FinancialAnalyzer: self, for chaining
+        """
+        self._expense_cols = [c for c in columns if c.startswith('expense_')]
+        return self
+    
+    def _check_emergency_fund(self, rec):
         """Check if emergency fund is adequate (3-6 months of expenses)."""
-        monthly_expenses = sum([v for k, v in profile.items() if k.startswith('expense_')])
-        current_savings = profile.get('current_savings', 0)
+        monthly_expenses = rec.monthly_expenses
+        current_savings = rec.current_savings
         min_recommended = monthly_expenses * 3
         
         if current_savings < min_recommended:
@@ -32,10 +112,10 @@ class FinancialAnalyzer:
             }
         return None
     
-    def _check_debt_to_income(self, profile):
+    def _check_debt_to_income(self, rec):
         """Check if debt-to-income ratio is too high."""
-        monthly_income = profile.get("monthly_income", 0)
-        debt_payments = profile.get('expense_debt_payments', 0)
+        monthly_income = rec.monthly_income
+        debt_payments = rec.debt_payments
         
         # Calculate debt-to-income ratio
         if monthly_income > 0:
@@ -50,10 +130,10 @@ class FinancialAnalyzer:
                 }
         return None
     
-    def _check_expense_ratio(self, profile):
+    def _check_expense_ratio(self, rec):
         """Check if total expenses are too high relative to income."""
-        monthly_expenses = sum([v for k, v in profile.items() if k.startswith('expense_')])
-        monthly_income = profile.get("monthly_income", 0)
+        monthly_expenses = rec.monthly_expenses
+        monthly_income = rec.monthly_income
         
         if monthly_income == 0:
             return {
@@ -81,16 +161,15 @@ class FinancialAnalyzer:
             }
         return None
     
-    def _check_savings_rate(self, profile):
+    def _check_savings_rate(self, rec):
         """Check if savings rate is too low."""
-        monthly_income = profile['monthly_income']
+        monthly_income = rec.monthly_income
         
         # Calculate monthly_savings if not provided
-        if 'monthly_savings' in profile:
-            monthly_savings = profile['monthly_savings']
+        if rec.monthly_savings is not None:
+            monthly_savings = rec.monthly_savings
         else:
-            monthly_expenses = sum([v for k, v in profile.items() if k.startswith('expense_')])
-            monthly_savings = monthly_income - monthly_expenses
+            monthly_savings = monthly_income - rec.monthly_expenses
         
         savings_rate = (monthly_savings / monthly_income) * 100 if monthly_income > 0 else 0
         
@@ -103,10 +182,10 @@ class FinancialAnalyzer:
             }
         return None
     
-    def _check_high_interest_debt(self, profile):
+    def _check_high_interest_debt(self, rec):
         """Check for high-interest debt."""
-        primary_debt_type = profile.get('primary_debt_type', 'None')
-        primary_debt_apr = profile.get('primary_debt_apr', 0)
+        primary_debt_type = rec.primary_debt_type
+        primary_debt_apr = rec.primary_debt_apr
         
         if primary_debt_type != "None" and primary_debt_apr > 10:
             return {
@@ -118,7 +197,12 @@ class FinancialAnalyzer:
         return None
     
     def analyze_profile(self, profile):
-        """Analyze a user profile and return issues and recommendations."""
+        """
+        Analyze a user profile and return issues and recommendations.
+        
+        Args:
+            profile (dict): User's financial profile
+        """
         # Ensure profile is not None and is a dictionary
         if not profile or not isinstance(profile, dict):
             return {
@@ -132,13 +216,54 @@ class FinancialAnalyzer:
                 "action_plan": ["Re-enter financial data", "Verify all inputs are correct"]
             }
         
+        # The checks see nothing but the record, so its fields key the cache;
+        # they go in as separate arguments so the typed cache also tells e.g.
+        # an APR of 20 from 20.0, which read differently in details
+        rec = self._to_record(profile)
+        result = self._analyze_frozen(*rec)
+        
+        # Cached results are shared, so hand out a copy the caller may modify
+        return {
+            "financial_health": result["financial_health"],
+            "issues": [dict(issue) for issue in result["issues"]],
+            "action_plan": list(result["action_plan"])
+        }
+    
+    def _to_record(self, profile):
+        """Extract the values the checks read from a profile dict."""
+        if self._expense_cols is None:
+            monthly_expenses = sum(v for k, v in profile.items() if k.startswith('expense_'))
+        else:
+            monthly_expenses = sum(map(profile.__getitem__, self._expense_cols))
+        return ProfileRecord(
+            monthly_income=profile.get('monthly_income', 0),
+            monthly_expenses=monthly_expenses,
+            debt_payments=profile.get('expense_debt_payments', 0),
+            current_savings=profile.get('current_savings', 0),
+            monthly_savings=profile.get('monthly_savings'),
+            primary_debt_type=profile.get('primary_debt_type', 'None'),
+            primary_debt_apr=profile.get('primary_debt_apr', 0)
+        )
+    
+    def _analyze_fields(self, *fields):
+        """
+        Run the checks on a profile's record.
+        
+        Args:
+            *fields: The ProfileRecord fields, in order
+        """
+        rec = ProfileRecord._make(fields)
         issues = []
         
         for detector in self.issue_detectors:
-            issue = detector(profile)
+            issue = detector(rec)
             if issue:
                 issues.append(issue)
         
+        return self._summarize(issues)
+    
+    def _summarize(self, issues):
+        """Rate overall financial health from a profile's issues and order their recommendations."""
         # Determine overall financial health
         if len(issues) == 0:
             financial_health = "Excellent"
@@ -160,6 +285,126 @@ class FinancialAnalyzer:
             "issues": issues,
             "action_plan": action_plan
         }
+    
+    def analyze_dataframe(self, df):
+        """
+        Analyze every profile in a DataFrame at once.
+        
+        All five checks run in one compiled pass that records a severity per
+        row and check, and issue dicts are only built for the flagged rows. The
+        result for each row matches analyze_profile on that row as a dict.
+        
+        Args:
+            df (DataFrame): One profile per row, with the same keys as a profile dict
+        
+        Returns:
+            list: Analysis results, one per row in row order
+        """
+        n = len(df)
+        
+        def column(name, default):
+            if name in df.columns:
+                return df[name].to_numpy()
+            return np.full(n, default)
+        
+        # Add the expense columns one at a time, in column order, so the totals
+        # round exactly like sum() over a profile's items
+        monthly_expenses = np.zeros(n)
+        for col in df.columns[df.columns.str.startswith('expense_')]:
+            monthly_expenses = monthly_expenses + df[col].to_numpy(dtype=np.float64)
+        
+        monthly_income = df['monthly_income'].to_numpy(dtype=np.float64)
+        current_savings = column('current_savings', 0).astype(np.float64)
+        debt_payments = column('expense_debt_payments', 0).astype(np.float64)
+        if 'monthly_savings' in df.columns:
+            monthly_savings = df['monthly_savings'].to_numpy(dtype=np.float64)
+        else:
+            monthly_savings = monthly_income - monthly_expenses
+        primary_debt_type = column('primary_debt_type', 'None')
+        primary_debt_apr = column('primary_debt_apr', 0.0)
+        
+        severity = np.zeros((n, len(self.issue_detectors)), dtype=np.int8)
+        _evaluate_rules(monthly_income, monthly_expenses, debt_payments, monthly_savings, current_savings,
+                        primary_debt_apr.astype(np.float64), primary_debt_type != "None", severity)
+        
+        # Build issue dicts only for flagged rows, check by check so each
+        # row's issues keep the detector order
+        issues = [[] for _ in range(n)]
+        
+        # Emergency fund
+        for i in np.flatnonzero(severity[:, 0]):
+            months_saved = round(float(current_savings[i] / monthly_expenses[i]), 1) if monthly_expenses[i] > 0 else 0
+            issues[i].append({
+                "issue": "Insufficient emergency fund",
+                "severity": SEVERITY_LEVELS[severity[i, 0]],
+                "details": f"Current savings cover only {months_saved} months of expenses instead of recommended 3-6 months",
+                "recommendation": "Increase monthly savings allocation until emergency fund reaches 3-6 months of expenses"
+            })
+        
+        # Debt-to-income ratio
+        for i in np.flatnonzero(severity[:, 1]):
+            dti_ratio = (debt_payments[i] / monthly_income[i]) * 100
+            issues[i].append({
+                "issue": "High debt-to-income ratio",
+                "severity": SEVERITY_LEVELS[severity[i, 1]],
+                "details": f"Debt payments consume {dti_ratio:.1f}% of income (recommended: <36%)",
+                "recommendation": "Focus on paying down high-interest debt and avoid taking on new debt"
+            })
+        
+        # Expense ratio
+        for i in np.flatnonzero(severity[:, 2]):
+            if monthly_income[i] == 0:
+                issues[i].append({
+                    "issue": "Missing income information",
+                    "severity": "high",
+                    "details": "No monthly income data provided",
+                    "recommendation": "Ensure accurate monthly income is entered to assess financial health"
+                })
+                continue
+            
+            expense_ratio = (monthly_expenses[i] / monthly_income[i]) * 100
+            if severity[i, 2] == 2:
+                issues[i].append({
+                    "issue": "Excessive expenses",
+                    "severity": "high",
+                    "details": f"Expenses consume {expense_ratio:.1f}% of income, leaving little room for savings",
+                    "recommendation": "Review budget to identify areas for reduction, especially discretionary spending"
+                })
+            else:
+                issues[i].append({
+                    "issue": "High expenses",
+                    "severity": "medium",
+                    "details": f"Expenses consume {expense_ratio:.1f}% of income",
+                    "recommendation": "Consider the 50/30/20 rule: 50% needs, 30% wants, 20% savings/debt repayment"
+                })
+        
+        # Savings rate
+        for i in np.flatnonzero(severity[:, 3]):
+            savings_rate = (monthly_savings[i] / monthly_income[i]) * 100 if monthly_income[i] > 0 else 0
+            issues[i].append({
+                "issue": "Low savings rate",
+                "severity": SEVERITY_LEVELS[severity[i, 3]],
+                "details": f"Current savings rate is {savings_rate:.1f}% (recommended: at least 15-20%)",
+                "recommendation": "Aim to increase savings rate by reducing discretionary spending"
+            })
+        
+        # High-interest debt
+        for i in np.flatnonzero(severity[:, 4]):
+            issues[i].append({
+                "issue": "High-interest debt",
+                "severity": SEVERITY_LEVELS[severity[i, 4]],
+                "details": f"Your {primary_debt_type[i]} has a high APR of {primary_debt_apr[i]}%",
+                "recommendation": "Prioritize paying off high-interest debt before focusing on other financial goals"
+            })
+        
+        return [self._summarize(row_issues) for row_issues in issues]
+    
+# Low-cardinality string columns of the generated sample profiles
+SAMPLE_PROFILE_DTYPES = {
+    "risk_tolerance": "category",
+    "primary_debt_type": "category",
+    "occupation": "category"
+}
 
 # Ensure the class is directly importable
 __all__ = ['FinancialAnalyzer']
@@ -168,11 +413,12 @@ __all__ = ['FinancialAnalyzer']
 def main():
     """Example of how to use the FinancialAnalyzer."""
     try:
-        # Load sample profile data
-        df = pd.read_csv("data/sample_profiles.csv")
+        # Load sample profile data with PyArrow's multithreaded parser; the
+        # repetitive string columns load as categoricals
+        df = pd.read_csv("data/sample_profiles.csv", dtype=SAMPLE_PROFILE_DTYPES, engine="pyarrow")
         sample_profile = df.iloc[0].to_dict()
         
-        analyzer = FinancialAnalyzer()
+        analyzer = FinancialAnalyzer().bind(df.columns)
         results = analyzer.analyze_profile(sample_profile)
         
         print(f"Financial Health: {results['financial_health']}")
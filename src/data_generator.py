@@ -1,159 +1,332 @@
 import pandas as pd
 import numpy as np
 from faker import Faker
-import random
 from datetime import datetime, timedelta
+from src.utils import njit
+
+# PyArrow writes CSV much faster than pandas; without it save_to_csv uses to_csv
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 fake = Faker()
 
+# Debt types with their (amount, APR) sampling ranges
+DEBT_RANGES = {
+    "Credit Card": ((500, 15000), (14, 25)),
+    "Student Loan": ((5000, 80000), (3, 7)),
+    "Car Loan": ((5000, 50000), (3, 8)),
+    "Personal Loan": ((1000, 20000), (6, 15))
+}
+DEBT_TYPES = tuple(DEBT_RANGES)
+FINANCIAL_GOALS = (
+    "Build emergency fund", "Pay off debt", "Save for home",
+    "Save for vacation", "Save for retirement", "Save for education"
+)
+RISK_TOLERANCES = ("Low", "Medium", "High")
+# Largest number of distinct Faker names and jobs drawn for one batch of users
+FAKER_POOL_SIZE = 1024
+
+@njit(cache=True)
+def _build_debt_rows(debt_offsets, debt_type, debt_amount, debt_apr,
+                     total_debt, primary_code, primary_apr):
+    """
+    Reduce each user's slice of the flat debt arrays to one row.
+    
+    Fills total_debt with the sum of the user's debts, and primary_code /
+    primary_apr with the type code and APR of the largest one (the earliest
+    on ties). Users without debt get 0, code -1 and 0.0.
+    """
+    for i in range(total_debt.shape[0]):
+        total = 0.0
+        code = -1
+        apr = 0.0
+        largest = 0.0
+        for j in range(debt_offsets[i], debt_offsets[i + 1]):
+            total += debt_amount[j]
+            if code < 0 or debt_amount[j] > largest:
+                largest = debt_amount[j]
+                code = debt_type[j]
+                apr = debt_apr[j]
+        total_debt[i] = total
+        primary_code[i] = code
+        primary_apr[i] = apr
+
 class FinancialDataGenerator:
     def __init__(self, seed=None):
         """Initialize the data generator with optional seed for reproducibility."""
         if seed:
             Faker.seed(seed)
-            random.seed(seed)
-            np.random.seed(seed)
+        
+        # One generator for every draw instead of the global random/np.random state
+        self.rng = np.random.default_rng(seed)
         
         self.expense_categories = [
             "Rent/Mortgage", "Utilities", "Groceries", "Dining Out", 
             "Transportation", "Healthcare", "Entertainment", "Shopping",
             "Subscriptions", "Debt Payments", "Savings", "Miscellaneous"
         ]
+        # DataFrame column name for each expense category
+        self.expense_col_names = tuple(
+            f"expense_{category.lower().replace('/', '_')}" for category in self.expense_categories
+        )
     
     def generate_user(self):
         """Generate a single user profile with financial data."""
         # Basic demographics
-        age = random.randint(22, 65)
+        age = int(self.rng.integers(22, 66))
         
         # Income based on age and random factors
-        base_income = np.random.normal(
+        base_income = self.rng.normal(
             loc=3000 + (age * 100), 
             scale=1500
         )
         monthly_income = max(round(base_income, 2), 2000)
         
         # Expense model - distribute total expenses based on income
-        expense_ratio = np.random.uniform(0.6, 0.95)  # Spend 60-95% of income
+        expense_ratio = self.rng.uniform(0.6, 0.95)  # Spend 60-95% of income
         total_expenses = monthly_income * expense_ratio
         
-        # Distribute expenses across categories
-        expense_weights = np.random.dirichlet(np.ones(len(self.expense_categories)))
-        expenses = {cat: round(total_expenses * weight, 2) 
-                   for cat, weight in zip(self.expense_categories, expense_weights)}
+        # Distribute expenses across categories; normalized unit gammas are a
+        # flat Dirichlet draw without dirichlet()'s per-call setup
+        expense_weights = self.rng.standard_gamma(1.0, len(self.expense_categories))
+        expense_weights /= expense_weights.sum()
+        expenses = dict(zip(self.expense_categories, np.round(total_expenses * expense_weights, 2).tolist()))
         
         # Calculate savings
         savings = monthly_income - sum(expenses.values())
-        current_savings = round(savings * np.random.randint(1, 24), 2)  # 1-24 months of savings
+        current_savings = round(savings * self.rng.integers(1, 24), 2)  # 1-24 months of savings
         
         # Debt profile
-        has_debt = random.random() < 0.7  # 70% chance of having debt
+        has_debt = self.rng.random() < 0.7  # 70% chance of having debt
         debt_types = []
         debt_amounts = []
         debt_aprs = []
         
         if has_debt:
-            num_debts = np.random.randint(1, 4)
+            num_debts = self.rng.integers(1, 4)
             
             for _ in range(num_debts):
-                debt_type = random.choice(["Credit Card", "Student Loan", "Car Loan", "Personal Loan"])
-                
-                # Different debt amounts based on type
-                if debt_type == "Credit Card":
-                    amount = round(np.random.uniform(500, 15000), 2)
-                    apr = round(np.random.uniform(14, 25), 2)
-                elif debt_type == "Student Loan":
-                    amount = round(np.random.uniform(5000, 80000), 2)
-                    apr = round(np.random.uniform(3, 7), 2)
-                elif debt_type == "Car Loan":
-                    amount = round(np.random.uniform(5000, 50000), 2)
-                    apr = round(np.random.uniform(3, 8), 2)
-                else:  # Personal Loan
-                    amount = round(np.random.uniform(1000, 20000), 2)
-                    apr = round(np.random.uniform(6, 15), 2)
+                debt_type, amount, apr = self._generate_debt()
                 
                 debt_types.append(debt_type)
                 debt_amounts.append(amount)
                 debt_aprs.append(apr)
         
         # Financial goals - randomly assign 1-2 goals
-        possible_goals = [
-            "Build emergency fund", "Pay off debt", "Save for home", 
-            "Save for vacation", "Save for retirement", "Save for education"
-        ]
-        num_goals = np.random.randint(1, 3)
-        goals = random.sample(possible_goals, num_goals)
+        num_goals = self.rng.integers(1, 3)
+        goals = [FINANCIAL_GOALS[i] for i in self.rng.permutation(len(FINANCIAL_GOALS))[:num_goals]]
         
         # Assemble user profile
         user = {
-            "user_id": fake.uuid4(),
+            "user_id": self._user_id(),
             "name": fake.name(),
             "age": age,
             "occupation": fake.job(),
-            "monthly_income": round(monthly_income, 2),
+            "monthly_income": monthly_income,
             "expenses": expenses,
             "monthly_savings": round(savings, 2),
             "current_savings": current_savings,
             "debt_types": debt_types,
-            "debt_amounts": debt_amounts, 
-            "debt_aprs": debt_aprs,
+            "debt_amounts": np.round(debt_amounts, 2).tolist(),
+            "debt_aprs": np.round(debt_aprs, 2).tolist(),
             "financial_goals": goals,
-            "risk_tolerance": random.choice(["Low", "Medium", "High"]),
+            "risk_tolerance": RISK_TOLERANCES[self.rng.integers(len(RISK_TOLERANCES))],
         }
         
         return user
     
+    def _generate_batch(self, num_users):
+        """
+        Draw the numeric fields of many profiles at once, one array per field.
+        
+        Follows the same distributions as generate_user, with one row per user
+        (expenses are an (N, categories) array).
+        """
+        # Basic demographics and income
+        ages = self.rng.integers(22, 66, num_users)
+        base_income = self.rng.normal(loc=3000 + ages * 100, scale=1500)
+        monthly_income = np.maximum(np.round(base_income, 2), 2000)
+        
+        # Distribute a 60-95% share of income across expense categories
+        expense_ratio = self.rng.uniform(0.6, 0.95, num_users)
+        expense_weights = self.rng.dirichlet(np.ones(len(self.expense_categories)), size=num_users)
+        expenses = np.round((monthly_income * expense_ratio)[:, None] * expense_weights, 2)
+        
+        # Savings, and 1-24 months of them already put aside
+        savings = monthly_income - expenses.sum(axis=1)
+        current_savings = np.round(savings * self.rng.integers(1, 24, num_users), 2)
+        
+        # 70% of users carry 1-3 debts
+        has_debt = self.rng.random(num_users) < 0.7
+        num_debts = np.where(has_debt, self.rng.integers(1, 4, num_users), 0)
+        
+        # All debts in one flat array, grouped by owner; amounts and APRs are
+        # drawn with one call per debt type
+        debt_owner = np.repeat(np.arange(num_users), num_debts)
+        debt_type = self.rng.integers(0, len(DEBT_TYPES), debt_owner.size)
+        debt_amount = np.empty(debt_owner.size)
+        debt_apr = np.empty(debt_owner.size)
+        for t, name in enumerate(DEBT_TYPES):
+            of_type = debt_type == t
+            count = int(of_type.sum())
+            (min_amount, max_amount), (min_apr, max_apr) = DEBT_RANGES[name]
+            debt_amount[of_type] = self.rng.uniform(min_amount, max_amount, count)
+            debt_apr[of_type] = self.rng.uniform(min_apr, max_apr, count)
+        
+        # 1-2 goals per user, taken from a random ordering of the possible goals
+        num_goals = self.rng.integers(1, 3, num_users)
+        goal_order = np.argsort(self.rng.random((num_users, len(FINANCIAL_GOALS))), axis=1)
+        
+        return {
+            "age": ages,
+            "monthly_income": monthly_income,
+            "expenses": expenses,
+            "monthly_savings": np.round(savings, 2),
+            "current_savings": current_savings,
+            "debt_offsets": np.concatenate(([0], np.cumsum(num_debts))),
+            "debt_owner": debt_owner,
+            "debt_type": debt_type,
+            "debt_amount": np.round(debt_amount, 2),
+            "debt_apr": np.round(debt_apr, 2),
+            "num_goals": num_goals,
+            "goal_order": goal_order,
+            "risk_tolerance": self.rng.choice(RISK_TOLERANCES, num_users)
+        }
+    
+    def _user_ids(self, num_users):
+        """
+        Random version-4 UUID strings drawn from self.rng, so seeded runs repeat them.
+        
+        The bytes for every ID come from one draw; the version and variant bits are
+        set the way uuid.UUID(version=4) does, and only the hex text is sliced per ID.
+        """
+        raw = np.frombuffer(self.rng.bytes(16 * num_users), dtype=np.uint8).reshape(num_users, 16).copy()
+        raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+        raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+        text = raw.tobytes().hex()
+        return [
+            f"{text[i:i + 8]}-{text[i + 8:i + 12]}-{text[i + 12:i + 16]}-{text[i + 16:i + 20]}-{text[i + 20:i + 32]}"
+            for i in range(0, 32 * num_users, 32)
+        ]
+    
+    def _user_id(self):
+        """Random version-4 UUID string for a single user."""
+        return self._user_ids(1)[0]
+    
+    def _generate_debt(self):
+        """Draw one debt as (type, amount, APR), leaving the caller to round the numbers."""
+        debt_type = DEBT_TYPES[self.rng.integers(len(DEBT_TYPES))]
+        (min_amount, max_amount), (min_apr, max_apr) = DEBT_RANGES[debt_type]
+        amount = self.rng.uniform(min_amount, max_amount)
+        apr = self.rng.uniform(min_apr, max_apr)
+        return debt_type, amount, apr
+    
+    def _identities(self, num_users):
+        """User IDs, names and occupations for a batch of users."""
+        # Faker is slow per call, so batches larger than FAKER_POOL_SIZE sample
+        # names and jobs from bounded pools; smaller ones get a draw per user
+        if num_users <= FAKER_POOL_SIZE:
+            # Same per-user draw order as generate_user
+            people = [(fake.name(), fake.job()) for _ in range(num_users)]
+            names = [name for name, _ in people]
+            jobs = [job for _, job in people]
+        else:
+            name_pool = [fake.name() for _ in range(FAKER_POOL_SIZE)]
+            job_pool = [fake.job() for _ in range(FAKER_POOL_SIZE)]
+            names = [name_pool[i] for i in self.rng.integers(0, FAKER_POOL_SIZE, num_users)]
+            jobs = [job_pool[i] for i in self.rng.integers(0, FAKER_POOL_SIZE, num_users)]
+        user_ids = self._user_ids(num_users)
+        return user_ids, names, jobs
+    
+    def _summarize_debts(self, batch, num_users):
+        """
+        Total debt per user and the type and APR of each user's largest debt.
+        
+        Ties go to the earlier debt, as with np.argmax; users without debt get
+        0, "None" and 0.0.
+        """
+        total_debt = np.empty(num_users)
+        primary_code = np.empty(num_users, dtype=np.int64)
+        primary_debt_apr = np.empty(num_users)
+        _build_debt_rows(batch["debt_offsets"], batch["debt_type"].astype(np.int64, copy=False),
+                         batch["debt_amount"], batch["debt_apr"],
+                         total_debt, primary_code, primary_debt_apr)
+        
+        # Code -1 (no debt) picks the trailing "None"
+        primary_debt_type = np.array(DEBT_TYPES + ("None",), dtype=object)[primary_code]
+        return total_debt, primary_debt_type, primary_debt_apr
+    
     def generate_users(self, num_users=100):
         """Generate multiple user profiles."""
-        users = [self.generate_user() for _ in range(num_users)]
+        batch = self._generate_batch(num_users)
+        user_ids, names, jobs = self._identities(num_users)
+        
+        debt_offsets = batch["debt_offsets"]
+        debt_types = [DEBT_TYPES[t] for t in batch["debt_type"]]
+        debt_amounts = batch["debt_amount"].tolist()
+        debt_aprs = batch["debt_apr"].tolist()
+        
+        users = []
+        for i in range(num_users):
+            debts = slice(debt_offsets[i], debt_offsets[i + 1])
+            users.append({
+                "user_id": user_ids[i],
+                "name": names[i],
+                "age": int(batch["age"][i]),
+                "occupation": jobs[i],
+                "monthly_income": float(batch["monthly_income"][i]),
+                "expenses": dict(zip(self.expense_categories, batch["expenses"][i].tolist())),
+                "monthly_savings": float(batch["monthly_savings"][i]),
+                "current_savings": float(batch["current_savings"][i]),
+                "debt_types": debt_types[debts],
+                "debt_amounts": debt_amounts[debts],
+                "debt_aprs": debt_aprs[debts],
+                "financial_goals": [FINANCIAL_GOALS[j] for j in batch["goal_order"][i, :batch["num_goals"][i]]],
+                "risk_tolerance": str(batch["risk_tolerance"][i]),
+            })
         return users
     
     def generate_dataframe(self, num_users=100):
         """Generate user profiles and convert to pandas DataFrame."""
-        users = self.generate_users(num_users)
-        
-        # Flatten the nested dictionaries and lists for DataFrame representation
-        flat_users = []
-        for user in users:
-            flat_user = {
-                "user_id": user["user_id"],
-                "name": user["name"],
-                "age": user["age"],
-                "occupation": user["occupation"],
-                "monthly_income": user["monthly_income"],
-                "monthly_savings": user["monthly_savings"],
-                "current_savings": user["current_savings"],
-                "risk_tolerance": user["risk_tolerance"],
-            }
-            
-            # Add expense categories
-            for category, amount in user["expenses"].items():
-                flat_user[f"expense_{category.lower().replace('/', '_')}"] = amount
-            
-            # Add debt information
-            total_debt = sum(user["debt_amounts"]) if user["debt_amounts"] else 0
-            flat_user["total_debt"] = total_debt
-            
-            # Add primary debt type and its APR (if any)
-            if user["debt_types"]:
-                max_debt_idx = np.argmax(user["debt_amounts"])
-                flat_user["primary_debt_type"] = user["debt_types"][max_debt_idx]
-                flat_user["primary_debt_apr"] = user["debt_aprs"][max_debt_idx]
-            else:
-                flat_user["primary_debt_type"] = "None"
-                flat_user["primary_debt_apr"] = 0.0
-            
-            # Add goals as comma-separated string
-            flat_user["financial_goals"] = ", ".join(user["financial_goals"])
-            
-            flat_users.append(flat_user)
+        batch = self._generate_batch(num_users)
+        user_ids, names, jobs = self._identities(num_users)
         
-        df = pd.DataFrame(flat_users)
+        # Reduce the debts straight to the columns the frame keeps
+        total_debt, primary_debt_type, primary_debt_apr = self._summarize_debts(batch, num_users)
+        
+        # Assemble the frame column by column from the batch arrays
+        goals = [
+            ", ".join(FINANCIAL_GOALS[j] for j in order[:count])
+            for order, count in zip(batch["goal_order"], batch["num_goals"])
+        ]
+        df = pd.DataFrame({
+            "user_id": user_ids,
+            "name": names,
+            "age": batch["age"],
+            "occupation": jobs,
+            "monthly_income": batch["monthly_income"],
+            "monthly_savings": batch["monthly_savings"],
+            "current_savings": batch["current_savings"],
+            "risk_tolerance": batch["risk_tolerance"].astype(object),
+            **dict(zip(self.expense_col_names, batch["expenses"].T)),
+            "total_debt": total_debt,
+            "primary_debt_type": primary_debt_type,
+            "primary_debt_apr": primary_debt_apr,
+            "financial_goals": goals
+        })
         return df
     
     def save_to_csv(self, num_users=100, filename="sample_profiles.csv"):
         """Generate user profiles and save to CSV."""
         df = self.generate_dataframe(num_users)
-        df.to_csv(f"data/{filename}", index=False)
+        if PYARROW_AVAILABLE:
+            pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), f"data/{filename}")
+        else:
+            df.to_csv(f"data/{filename}", index=False)
         return df
 
 # Example usage
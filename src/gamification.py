@@ -1,6 +1,184 @@
 import os
 import json
+import numpy as np
+from bisect import bisect_left, bisect_right
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
+from types import MappingProxyType
+
+from src.utils import njit
+
+# Compiled eagerly for their fixed signatures; nogil lets batch callers run them from threads
+@njit("UniTuple(boolean, 3)(float64[::1], float64[::1])", cache=True, nogil=True)
+def _savings_kernel(income, expenses):
+    """
+    Savings streak flags over monthly income and expense totals, most recent first.
+    
+    Returns (saved in each of the last 3 months, rate >= 10% for 6 months,
+    rate >= 20% for 12 months); a rate is 0 for months without income.
+    """
+    n = income.shape[0]
+    consistent = n >= 3
+    high = n >= 6
+    super_saving = n >= 12
+    for i in range(min(n, 12)):
+        savings = income[i] - expenses[i]
+        rate = savings / income[i] * 100 if income[i] > 0 else 0.0
+        if i < 3 and not savings > 0:
+            consistent = False
+        if i < 6 and not rate >= 10:
+            high = False
+        if not rate >= 20:
+            super_saving = False
+    return consistent, high, super_saving
+
+@njit("UniTuple(boolean, 2)(float64, float64)", cache=True, nogil=True)
+def _debt_kernel(initial_debt, current_debt):
+    """Whether a positive initial debt is 50-99% paid off, and whether it is fully paid off."""
+    reduction_percentage = (initial_debt - current_debt) / initial_debt * 100
+    crushed = reduction_percentage >= 50 and reduction_percentage < 100
+    eliminated = reduction_percentage >= 100 or current_debt == 0
+    return crushed, eliminated
+
+@dataclass(frozen=True, slots=True)
+class AchievementDef:
+    """Static description of one achievement."""
+    title: str
+    description: str
+    badge: str
+    level: str
+
+# Achievement categories and their criteria, shared by every AchievementSystem
+ACHIEVEMENT_DEFINITIONS = MappingProxyType({
+    # Savings achievements
+    "savings_starter": AchievementDef(
+        "Savings Starter",
+        "Started saving regularly (saved for 3 consecutive months)",
+        "savings_starter.png", "bronze"
+    ),
+    "savings_builder": AchievementDef(
+        "Savings Builder",
+        "Built a solid savings habit (saved >10% of income for 6 months)",
+        "savings_builder.png", "silver"
+    ),
+    "super_saver": AchievementDef(
+        "Super Saver",
+        "Saved more than 20% of income for a full year",
+        "super_saver.png", "gold"
+    ),
+    
+    # Emergency fund achievements
+    "emergency_starter": AchievementDef(
+        "Safety Net Starter",
+        "Saved one month of expenses in emergency fund",
+        "emergency_starter.png", "bronze"
+    ),
+    "emergency_builder": AchievementDef(
+        "Safety Net Builder",
+        "Saved three months of expenses in emergency fund",
+        "emergency_builder.png", "silver"
+    ),
+    "emergency_master": AchievementDef(
+        "Safety Net Master",
+        "Saved six months of expenses in emergency fund",
+        "emergency_master.png", "gold"
+    ),
+    
+    # Debt reduction achievements
+    "debt_tackler": AchievementDef(
+        "Debt Tackler",
+        "Made a plan to tackle high-interest debt",
+        "debt_tackler.png", "bronze"
+    ),
+    "debt_crusher": AchievementDef(
+        "Debt Crusher",
+        "Paid off 50% of high-interest debt",
+        "debt_crusher.png", "silver"
+    ),
+    "debt_eliminator": AchievementDef(
+        "Debt Eliminator",
+        "Became completely free of high-interest debt",
+        "debt_eliminator.png", "gold"
+    ),
+    
+    # Financial planning achievements
+    "planner_novice": AchievementDef(
+        "Planning Novice",
+        "Created your first financial projection",
+        "planner_novice.png", "bronze"
+    ),
+    "planner_adept": AchievementDef(
+        "Planning Adept",
+        "Revisited and revised your financial plan 3 times",
+        "planner_adept.png", "silver"
+    ),
+    "master_planner": AchievementDef(
+        "Master Planner",
+        "Maintained and followed a financial plan for a full year",
+        "master_planner.png", "gold"
+    ),
+    
+    # Investment achievements
+    "investor_starter": AchievementDef(
+        "Investor Starter",
+        "Made your first investment",
+        "investor_starter.png", "bronze"
+    ),
+    "investor_builder": AchievementDef(
+        "Investor Builder",
+        "Built a diversified portfolio across multiple asset classes",
+        "investor_builder.png", "silver"
+    ),
+    "investor_master": AchievementDef(
+        "Investor Master",
+        "Consistently invested for retirement for over 2 years",
+        "investor_master.png", "gold"
+    ),
+    
+    # Tax optimization achievements
+    "tax_aware": AchievementDef(
+        "Tax Aware",
+        "Started using tax-advantaged accounts",
+        "tax_aware.png", "bronze"
+    ),
+    "tax_optimizer": AchievementDef(
+        "Tax Optimizer",
+        "Maximized contributions to retirement accounts",
+        "tax_optimizer.png", "silver"
+    ),
+    "tax_master": AchievementDef(
+        "Tax Master",
+        "Implemented advanced tax optimization strategies",
+        "tax_master.png", "gold"
+    ),
+    
+    # App usage achievements
+    "first_simulation": AchievementDef(
+        "Future Explorer",
+        "Ran your first financial future simulation",
+        "future_explorer.png", "bronze"
+    ),
+    "profile_creator": AchievementDef(
+        "Profile Creator",
+        "Created and saved your financial profile",
+        "profile_creator.png", "bronze"
+    ),
+    "consistent_user": AchievementDef(
+        "Consistent User",
+        "Used the app at least once a week for a month",
+        "consistent_user.png", "silver"
+    ),
+    "financial_master": AchievementDef(
+        "Financial Master",
+        "Earned all gold-level achievements",
+        "financial_master.png", "platinum"
+    )
+})
+# Gold achievements, all of which together earn financial_master
+GOLD_ACHIEVEMENTS = frozenset(
+    achievement_id for achievement_id, definition in ACHIEVEMENT_DEFINITIONS.items()
+    if definition.level == "gold"
+)
 
 class AchievementSystem:
     """
@@ -16,154 +194,11 @@ class AchievementSystem:
         """
         self.user_database = user_database
         
-        # Define achievement categories and their criteria
-        self.achievement_definitions = {
-            # Savings achievements
-            "savings_starter": {
-                "title": "Savings Starter",
-                "description": "Started saving regularly (saved for 3 consecutive months)",
-                "badge": "savings_starter.png",
-                "level": "bronze"
-            },
-            "savings_builder": {
-                "title": "Savings Builder",
-                "description": "Built a solid savings habit (saved >10% of income for 6 months)",
-                "badge": "savings_builder.png",
-                "level": "silver"
-            },
-            "super_saver": {
-                "title": "Super Saver",
-                "description": "Saved more than 20% of income for a full year",
-                "badge": "super_saver.png",
-                "level": "gold"
-            },
-            
-            # Emergency fund achievements
-            "emergency_starter": {
-                "title": "Safety Net Starter",
-                "description": "Saved one month of expenses in emergency fund",
-                "badge": "emergency_starter.png",
-                "level": "bronze"
-            },
-            "emergency_builder": {
-                "title": "Safety Net Builder",
-                "description": "Saved three months of expenses in emergency fund",
-                "badge": "emergency_builder.png",
-                "level": "silver"
-            },
-            "emergency_master": {
-                "title": "Safety Net Master",
-                "description": "Saved six months of expenses in emergency fund",
-                "badge": "emergency_master.png",
-                "level": "gold"
-            },
-            
-            # Debt reduction achievements
-            "debt_tackler": {
-                "title": "Debt Tackler",
-                "description": "Made a plan to tackle high-interest debt",
-                "badge": "debt_tackler.png",
-                "level": "bronze"
-            },
-            "debt_crusher": {
-                "title": "Debt Crusher",
-                "description": "Paid off 50% of high-interest debt",
-                "badge": "debt_crusher.png",
-                "level": "silver"
-            },
-            "debt_eliminator": {
-                "title": "Debt Eliminator",
-                "description": "Became completely free of high-interest debt",
-                "badge": "debt_eliminator.png",
-                "level": "gold"
-            },
-            
-            # Financial planning achievements
-            "planner_novice": {
-                "title": "Planning Novice",
-                "description": "Created your first financial projection",
-                "badge": "planner_novice.png",
-                "level": "bronze"
-            },
-            "planner_adept": {
-                "title": "Planning Adept",
-                "description": "Revisited and revised your financial plan 3 times",
-                "badge": "planner_adept.png",
-                "level": "silver"
-            },
-            "master_planner": {
-                "title": "Master Planner",
-                "description": "Maintained and followed a financial plan for a full year",
-                "badge": "master_planner.png",
-                "level": "gold"
-            },
-            
-            # Investment achievements
-            "investor_starter": {
-                "title": "Investor Starter",
-                "description": "Made your first investment",
-                "badge": "investor_starter.png",
-                "level": "bronze"
-            },
-            "investor_builder": {
-                "title": "Investor Builder",
-                "description": "Built a diversified portfolio across multiple asset classes",
-                "badge": "investor_builder.png",
-                "level": "silver"
-            },
-            "investor_master": {
-                "title": "Investor Master",
-                "description": "Consistently invested for retirement for over 2 years",
-                "badge": "investor_master.png",
-                "level": "gold"
-            },
-            
-            # Tax optimization achievements
-            "tax_aware": {
-                "title": "Tax Aware",
-                "description": "Started using tax-advantaged accounts",
-                "badge": "tax_aware.png",
-                "level": "bronze"
-            },
-            "tax_optimizer": {
-                "title": "Tax Optimizer",
-                "description": "Maximized contributions to retirement accounts",
-                "badge": "tax_optimizer.png",
-                "level": "silver"
-            },
-            "tax_master": {
-                "title": "Tax Master",
-                "description": "Implemented advanced tax optimization strategies",
-                "badge": "tax_master.png",
-                "level": "gold"
-            },
-            
-            # App usage achievements
-            "first_simulation": {
-                "title": "Future Explorer",
-                "description": "Ran your first financial future simulation",
-                "badge": "future_explorer.png",
-                "level": "bronze"
-            },
-            "profile_creator": {
-                "title": "Profile Creator",
-                "description": "Created and saved your financial profile",
-                "badge": "profile_creator.png",
-                "level": "bronze"
-            },
-            "consistent_user": {
-                "title": "Consistent User",
-                "description": "Used the app at least once a week for a month",
-                "badge": "consistent_user.png",
-                "level": "silver"
-            },
-            "financial_master": {
-                "title": "Financial Master",
-                "description": "Earned all gold-level achievements",
-                "badge": "financial_master.png",
-                "level": "platinum"
-            }
-        }
+        # Expense keys of each profile key layout seen so far
+        self._expense_keys_cache = {}
+        
+        # Achievement categories and their criteria
+        self.achievement_definitions = ACHIEVEMENT_DEFINITIONS
     
     def get_achievement_definition(self, achievement_id):
         """
@@ -173,7 +208,7 @@ class AchievementSystem:
             achievement_id (str): ID of the achievement
             
         Returns:
-            dict: Achievement definition or None if not found
+            AchievementDef: Achievement definition or None if not found
         """
         return self.achievement_definitions.get(achievement_id)
     
@@ -182,10 +217,28 @@ class AchievementSystem:
         Get all available achievement definitions.
         
         Returns:
-            dict: All achievement definitions
+            Mapping: Read-only AchievementDef records keyed by achievement ID
         """
         return self.achievement_definitions
     
+    def _expense_total(self, profile):
+        """Sum a profile's expense_ values, scanning for the expense keys once per key layout."""
+        layout = tuple(profile)
+        expense_keys = self._expense_keys_cache.get(layout)
+        if expense_keys is None:
+            expense_keys = tuple(k for k in layout if k.startswith('expense_'))
+            self._expense_keys_cache[layout] = expense_keys
+        return sum(profile[k] for k in expense_keys)
+    
+    def _save_earned(self, user_id, achievement_ids):
+        """Save earned achievements for a user in one database transaction, if both are available."""
+        if user_id and self.user_database:
+            self.user_database.save_achievements(user_id, {
+                achievement_id: asdict(self.achievement_definitions[achievement_id])
+                for achievement_id in achievement_ids
+                if achievement_id in self.achievement_definitions
+            })
+    
     def check_emergency_fund_achievements(self, profile, user_id=None):
         """
         Check if the user has earned any emergency fund achievements.
@@ -200,7 +253,7 @@ class AchievementSystem:
         earned_achievements = []
         
         # Calculate how many months of expenses are in savings
-        monthly_expenses = sum([v for k, v in profile.items() if k.startswith('expense_')])
+        monthly_expenses = self._expense_total(profile)
         current_savings = profile.get('current_savings', 0)
         
         if monthly_expenses > 0:
@@ -216,11 +269,7 @@ class AchievementSystem:
                 earned_achievements.append("emergency_master")
         
         # Save achievements to database if provided
-        if user_id and self.user_database:
-            for achievement_id in earned_achievements:
-                achievement_def = self.achievement_definitions.get(achievement_id)
-                if achievement_def:
-                    self.user_database.save_achievement(user_id, achievement_id, achievement_def)
+        self._save_earned(user_id, earned_achievements)
         
         return earned_achievements
     
@@ -263,20 +312,16 @@ class AchievementSystem:
             current_debt = profile.get('total_debt', 0)
             
             if initial_debt > 0:
-                reduction_percentage = (initial_debt - current_debt) / initial_debt * 100
+                crushed, eliminated = _debt_kernel(float(initial_debt), float(current_debt))
                 
-                if reduction_percentage >= 50 and reduction_percentage < 100:
+                if crushed:
                     earned_achievements.append("debt_crusher")
                 
-                if reduction_percentage >= 100 or current_debt == 0:
+                if eliminated:
                     earned_achievements.append("debt_eliminator")
         
         # Save achievements to database if provided
-        if user_id and self.user_database:
-            for achievement_id in earned_achievements:
-                achievement_def = self.achievement_definitions.get(achievement_id)
-                if achievement_def:
-                    self.user_database.save_achievement(user_id, achievement_id, achievement_def)
+        self._save_earned(user_id, earned_achievements)
         
         return earned_achievements
     
@@ -296,7 +341,7 @@ class AchievementSystem:
         
         # Calculate savings rate
         monthly_income = profile.get('monthly_income', 0)
-        monthly_expenses = sum([v for k, v in profile.items() if k.startswith('expense_')])
+        monthly_expenses = self._expense_total(profile)
         monthly_savings = monthly_income - monthly_expenses
         savings_rate = (monthly_savings / monthly_income * 100) if monthly_income > 0 else 0
         
@@ -306,57 +351,11 @@ class AchievementSystem:
         super_saving = False
         
         if history and len(history) >= 3:
-            # Check last 3 months for consistent saving
-            consistent_months = 0
-            high_saving_months = 0
-            super_saving_months = 0
-            
-            for past_profile in history[:3]:  # Most recent 3 profiles
-                past_income = past_profile.get('monthly_income', 0)
-                past_expenses = sum([v for k, v in past_profile.items() if k.startswith('expense_')])
-                past_savings = past_income - past_expenses
-                past_rate = (past_savings / past_income * 100) if past_income > 0 else 0
-                
-                if past_savings > 0:
-                    consistent_months += 1
-                
-                if past_rate >= 10:
-                    high_saving_months += 1
-                
-                if past_rate >= 20:
-                    super_saving_months += 1
-            
-            consistent_saving = consistent_months >= 3
-            
-            # For silver achievement, need 6 months of >10% savings rate
-            if len(history) >= 6 and high_saving_months >= 3:
-                # Check the next 3 months
-                additional_high_months = 0
-                for past_profile in history[3:6]:
-                    past_income = past_profile.get('monthly_income', 0)
-                    past_expenses = sum([v for k, v in past_profile.items() if k.startswith('expense_')])
-                    past_savings = past_income - past_expenses
-                    past_rate = (past_savings / past_income * 100) if past_income > 0 else 0
-                    
-                    if past_rate >= 10:
-                        additional_high_months += 1
-                
-                high_saving_rate = additional_high_months + high_saving_months >= 6
-            
-            # For gold achievement, need 12 months of >20% savings rate
-            if len(history) >= 12 and super_saving_months >= 3:
-                # Check the next 9 months
-                additional_super_months = 0
-                for past_profile in history[3:12]:
-                    past_income = past_profile.get('monthly_income', 0)
-                    past_expenses = sum([v for k, v in past_profile.items() if k.startswith('expense_')])
-                    past_savings = past_income - past_expenses
-                    past_rate = (past_savings / past_income * 100) if past_income > 0 else 0
-                    
-                    if past_rate >= 20:
-                        additional_super_months += 1
-                
-                super_saving = additional_super_months + super_saving_months >= 12
+            # Income and expense totals of the most recent 12 profiles
+            recent = history[:12]
+            past_income = np.fromiter((p.get('monthly_income', 0) for p in recent), dtype=np.float64, count=len(recent))
+            past_expenses = np.fromiter((self._expense_total(p) for p in recent), dtype=np.float64, count=len(recent))
+            consistent_saving, high_saving_rate, super_saving = _savings_kernel(past_income, past_expenses)
         
         # Award achievements
         if consistent_saving:
@@ -380,11 +379,7 @@ class AchievementSystem:
                 earned_achievements.append("super_saver")
         
         # Save achievements to database if provided
-        if user_id and self.user_database:
-            for achievement_id in earned_achievements:
-                achievement_def = self.achievement_definitions.get(achievement_id)
-                if achievement_def:
-                    self.user_database.save_achievement(user_id, achievement_id, achievement_def)
+        self._save_earned(user_id, earned_achievements)
         
         return earned_achievements
     
@@ -416,11 +411,7 @@ class AchievementSystem:
             earned_achievements.append("master_planner")
         
         # Save achievements to database if provided
-        if user_id and self.user_database:
-            for achievement_id in earned_achievements:
-                achievement_def = self.achievement_definitions.get(achievement_id)
-                if achievement_def:
-                    self.user_database.save_achievement(user_id, achievement_id, achievement_def)
+        self._save_earned(user_id, earned_achievements)
         
         return earned_achievements
     
@@ -461,8 +452,8 @@ class AchievementSystem:
             
             # Check if there's at least one login per week for 4 weeks
             if login_dates:
-                login_dates.sort(reverse=True)  # Most recent first
-                most_recent = login_dates[0]
+                login_dates.sort()
+                most_recent = login_dates[-1]
                 
                 # Check each of the past 4 weeks
                 consistent_weeks = 0
@@ -471,19 +462,14 @@ class AchievementSystem:
                     week_end = most_recent - timedelta(days=week*7)
                     
                     # Check if there's at least one login in this week
-                    week_logins = [date for date in login_dates if week_start <= date <= week_end]
-                    if week_logins:
+                    if bisect_right(login_dates, week_end) > bisect_left(login_dates, week_start):
                         consistent_weeks += 1
                 
                 if consistent_weeks >= 4:
                     earned_achievements.append("consistent_user")
         
         # Save achievements to database if provided
-        if user_id and self.user_database:
-            for achievement_id in earned_achievements:
-                achievement_def = self.achievement_definitions.get(achievement_id)
-                if achievement_def:
-                    self.user_database.save_achievement(user_id, achievement_id, achievement_def)
+        self._save_earned(user_id, earned_achievements)
         
         return earned_achievements
     
@@ -522,11 +508,7 @@ class AchievementSystem:
             earned_achievements.append("investor_master")
         
         # Save achievements to database if provided
-        if user_id and self.user_database:
-            for achievement_id in earned_achievements:
-                achievement_def = self.achievement_definitions.get(achievement_id)
-                if achievement_def:
-                    self.user_database.save_achievement(user_id, achievement_id, achievement_def)
+        self._save_earned(user_id, earned_achievements)
         
         return earned_achievements
     
@@ -571,11 +553,7 @@ class AchievementSystem:
             earned_achievements.append("tax_master")
         
         # Save achievements to database if provided
-        if user_id and self.user_database:
-            for achievement_id in earned_achievements:
-                achievement_def = self.achievement_definitions.get(achievement_id)
-                if achievement_def:
-                    self.user_database.save_achievement(user_id, achievement_id, achievement_def)
+        self._save_earned(user_id, earned_achievements)
         
         return earned_achievements
     
@@ -604,42 +582,27 @@ class AchievementSystem:
         simulation_run = kwargs.get('simulation_run', False)
         login_history = kwargs.get('login_history', None)
         
-        # Check for each type of achievement
-        emergency_achievements = self.check_emergency_fund_achievements(profile, user_id)
-        debt_achievements = self.check_debt_achievements(profile, history, user_id)
-        savings_achievements = self.check_savings_rate_achievements(profile, history, user_id)
-        planning_achievements = self.check_planning_achievements(simulations_run, plan_revisions, plan_age_days, user_id)
-        app_achievements = self.check_app_usage_achievements(user_id, profile_saved, simulation_run, login_history)
-        investment_achievements = self.check_investment_achievements(profile, investment_data, user_id)
-        tax_achievements = self.check_tax_achievements(profile, tax_data, user_id)
-        
-        # Combine all achievements
-        all_achievements.extend(emergency_achievements)
-        all_achievements.extend(debt_achievements)
-        all_achievements.extend(savings_achievements)
-        all_achievements.extend(planning_achievements)
-        all_achievements.extend(app_achievements)
-        all_achievements.extend(investment_achievements)
-        all_achievements.extend(tax_achievements)
+        # Check for each type of achievement; results are saved in one batch below.
+        # The profile-based checks always run, the others only when given
+        # inputs that could earn something
+        all_achievements.extend(self.check_emergency_fund_achievements(profile))
+        all_achievements.extend(self.check_debt_achievements(profile, history))
+        all_achievements.extend(self.check_savings_rate_achievements(profile, history))
+        if simulations_run or plan_revisions or plan_age_days:
+            all_achievements.extend(self.check_planning_achievements(simulations_run, plan_revisions, plan_age_days))
+        if profile_saved or simulation_run or login_history:
+            all_achievements.extend(self.check_app_usage_achievements(None, profile_saved, simulation_run, login_history))
+        if investment_data:
+            all_achievements.extend(self.check_investment_achievements(profile, investment_data))
+        if tax_data:
+            all_achievements.extend(self.check_tax_achievements(profile, tax_data))
         
         # Check for master achievement (all gold level)
-        gold_achievements = [
-            "emergency_master",
-            "debt_eliminator",
-            "super_saver",
-            "master_planner",
-            "investor_master",
-            "tax_master"
-        ]
-        
-        if all(achievement in all_achievements for achievement in gold_achievements):
+        if GOLD_ACHIEVEMENTS.issubset(all_achievements):
             all_achievements.append("financial_master")
-            
-            # Save master achievement to database if provided
-            if user_id and self.user_database:
-                achievement_def = self.achievement_definitions.get("financial_master")
-                if achievement_def:
-                    self.user_database.save_achievement(user_id, "financial_master", achievement_def)
+        
+        # Save achievements to database if provided
+        self._save_earned(user_id, all_achievements)
         
         return all_achievements
 
@@ -676,7 +639,7 @@ if __name__ == "__main__":
     print(f"\nTotal available achievements: {len(all_definitions)}")
     
     # Print bronze level achievements
-    bronze_achievements = {k: v for k, v in all_definitions.items() if v.get('level') == 'bronze'}
+    bronze_achievements = {k: v for k, v in all_definitions.items() if v.level == 'bronze'}
     print(f"Bronze level achievements: {len(bronze_achievements)}")
     for achievement_id, achievement in bronze_achievements.items():
-        print(f"- {achievement['title']}: {achievement['description']}")
\ No newline at end of file
+        print(f"- {achievement.title}: {achievement.description}")
\ No newline at end of file
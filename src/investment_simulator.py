@@ -1,6 +1,38 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
+
+from src.simulator import _month_dates
+from src.utils import njit
+
+@njit(cache=True)
+def _grow_portfolios(returns, allocations, monthly_contribution, initial_investment):
+    """
+    Compound each asset's holdings month by month for several risk profiles.
+    
+    Args:
+        returns (ndarray): Monthly returns shaped (profiles, assets, months)
+        allocations (ndarray): Allocation fractions shaped (profiles, assets)
+        monthly_contribution (float): The amount invested each month
+        initial_investment (float): Starting investment amount
+    
+    Returns:
+        ndarray: Asset values shaped (profiles, assets, months)
+    """
+    n_profiles, n_assets, months = returns.shape
+    values = np.zeros((n_profiles, n_assets, months))
+    
+    for p in range(n_profiles):
+        for a in range(n_assets):
+            alloc_pct = allocations[p, a]
+            if alloc_pct > 0:
+                value = initial_investment * alloc_pct
+                contribution = monthly_contribution * alloc_pct
+                for i in range(months):
+                    value = value * (1 + returns[p, a, i]) + contribution
+                    values[p, a, i] = value
+    
+    return values
 
 class InvestmentSimulator:
     """
@@ -97,6 +129,41 @@ class InvestmentSimulator:
         returns = np.random.normal(monthly_return, monthly_volatility, months)
         return returns
     
+    def _simulate_paths(self, risk_profiles, monthly_contribution, initial_investment):
+        """Simulate several risk profiles at once and return one DataFrame per profile."""
+        assets = list(self.asset_classes.keys())
+        allocations = np.array(
+            [[self.risk_profiles[profile].get(asset, 0.0) for asset in assets] for profile in risk_profiles],
+            dtype=np.float64
+        )
+        
+        # Draw returns in the same order as a profile-by-profile, asset-by-asset simulation
+        returns = np.zeros((len(risk_profiles), len(assets), self.months))
+        for p, profile in enumerate(risk_profiles):
+            for asset, alloc_pct in self.risk_profiles[profile].items():
+                if alloc_pct > 0:
+                    returns[p, assets.index(asset)] = self._generate_monthly_returns(asset, self.months)
+        
+        values = _grow_portfolios(returns, allocations, float(monthly_contribution), float(initial_investment))
+        
+        dates = _month_dates(self.current_month, self.months)
+        paths = {}
+        for p, profile in enumerate(risk_profiles):
+            results = {
+                'date': dates,
+                'total_value': values[p].sum(axis=0),
+            }
+            
+            # Add columns for each asset class
+            for asset, alloc_pct in self.risk_profiles[profile].items():
+                if alloc_pct > 0:
+                    results[asset] = values[p, assets.index(asset)]
+            
+            # Wrap the arrays without copying; the columns stay views of values
+            paths[profile] = pd.DataFrame(results, copy=False)
+        
+        return paths
+    
     def simulate_investment_path(self, risk_profile, monthly_contribution, initial_investment=0):
         """
         Simulate investment growth based on risk profile and contribution amount.
@@ -112,60 +179,7 @@ class InvestmentSimulator:
         if risk_profile not in self.risk_profiles:
             raise ValueError(f"Risk profile '{risk_profile}' not recognized")
         
-        # Get asset allocation for the chosen risk profile
-        allocation = self.risk_profiles[risk_profile]
-        
-        # Initialize results structure
-        results = {
-            'date': [],
-            'total_value': [],
-        }
-        
-        # Add columns for each asset class
-        for asset in allocation.keys():
-            if allocation[asset] > 0:
-                results[asset] = []
-        
-        # Generate return series for each asset class
-        asset_returns = {}
-        for asset in allocation.keys():
-            if allocation[asset] > 0:
-                asset_returns[asset] = self._generate_monthly_returns(asset, self.months)
-        
-        # Initialize investment values
-        current_values = {}
-        for asset, alloc_pct in allocation.items():
-            if alloc_pct > 0:
-                current_values[asset] = initial_investment * alloc_pct
-        
-        # Run simulation month by month
-        for i in range(self.months):
-            current_date = self.current_month + timedelta(days=30*i)
-            results['date'].append(current_date)
-            
-            # Distribute monthly contribution according to allocation
-            for asset, alloc_pct in allocation.items():
-                if alloc_pct > 0:
-                    # Add contribution
-                    contribution = monthly_contribution * alloc_pct
-                    
-                    # Apply return for this month
-                    if i < len(asset_returns[asset]):
-                        monthly_roi = asset_returns[asset][i]
-                        current_values[asset] = current_values[asset] * (1 + monthly_roi) + contribution
-                    else:
-                        # Fallback if we run out of simulated returns
-                        monthly_roi = (1 + self.asset_classes[asset]["avg_return"]) ** (1/12) - 1
-                        current_values[asset] = current_values[asset] * (1 + monthly_roi) + contribution
-                    
-                    # Record asset value
-                    results[asset].append(current_values[asset])
-            
-            # Calculate total portfolio value
-            total_value = sum(current_values.values())
-            results['total_value'].append(total_value)
-        
-        return pd.DataFrame(results)
+        return self._simulate_paths([risk_profile], monthly_contribution, initial_investment)[risk_profile]
     
     def compare_risk_profiles(self, monthly_contribution, initial_investment=0):
         """
@@ -174,13 +188,10 @@ class InvestmentSimulator:
         Returns:
             tuple: (DataFrames for each risk profile, comparison summary)
         """
-        profile_results = {}
+        profile_results = self._simulate_paths(list(self.risk_profiles.keys()), monthly_contribution, initial_investment)
         summary = {}
         
-        for profile in self.risk_profiles.keys():
-            results = self.simulate_investment_path(profile, monthly_contribution, initial_investment)
-            profile_results[profile] = results
-            
+        for profile, results in profile_results.items():
             # Calculate summary statistics
             final_value = results['total_value'].iloc[-1]
             total_contributions = monthly_contribution * self.months
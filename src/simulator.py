@@ -1,7 +1,61 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
+from datetime import datetime
+
+from src.utils import njit
+
+@njit(cache=True)
+def _debt_step(debt, monthly_interest_rate, extra_payment):
+    """Apply one month of interest and payment to a debt balance; returns (debt, payment)."""
+    interest_amount = debt * monthly_interest_rate
+    
+    # Determine debt payment (minimum + extra)
+    min_payment = max(debt * 0.02, 25.0)  # 2% of balance or $25 minimum
+    total_payment = min(min_payment + extra_payment, debt + interest_amount)
+    
+    return debt + interest_amount - total_payment, total_payment
+
+@njit(cache=True)
+def _project_months(months, monthly_income, monthly_expenses, savings, debt,
+                    income_growth, extra_debt_payment, monthly_interest_rate):
+    """Month-by-month income, savings, debt and net worth projection."""
+    income = np.empty(months, dtype=np.float64)
+    savings_out = np.empty(months, dtype=np.float64)
+    debt_out = np.empty(months, dtype=np.float64)
+    net_worth = np.empty(months, dtype=np.float64)
+    
+    savings_interest_rate = 0.02 / 12  # 2% APY
+    
+    for i in range(months):
+        # Apply income growth (annually)
+        if i > 0 and i % 12 == 0:
+            monthly_income *= (1 + income_growth)
+        income[i] = monthly_income
+        
+        # Calculate this month's savings
+        this_month_savings = monthly_income - monthly_expenses
+        
+        # Apply debt payments and interest
+        if debt > 0:
+            debt, payment = _debt_step(debt, monthly_interest_rate, extra_debt_payment)
+            this_month_savings -= payment
+        
+        # Apply savings interest (simple monthly interest)
+        interest_earned = savings * savings_interest_rate
+        savings += this_month_savings + interest_earned
+        
+        # Record savings, debt and net worth
+        remaining_debt = max(0.0, debt)
+        savings_out[i] = savings
+        debt_out[i] = remaining_debt
+        net_worth[i] = savings - remaining_debt
+    
+    return income, savings_out, debt_out, net_worth
+
+def _month_dates(start, months):
+    """Dates 30 days apart starting at ``start``, as a datetime64 array."""
+    steps = np.arange(months) * np.timedelta64(30, 'D')
+    return (np.datetime64(start) + steps).astype('datetime64[ns]')
 
 class FinancialSimulator:
     def __init__(self, profile, simulation_years=5):
@@ -13,15 +67,6 @@ class FinancialSimulator:
     
     def _calculate_monthly_results(self, scenario, params):
         """Calculate financial metrics for each month in the simulation."""
-        results = {
-            'date': [],
-            'income': [],
-            'expenses': [],
-            'savings': [],
-            'debt': [],
-            'net_worth': []
-        }
-        
         monthly_income = self.profile['monthly_income']
         monthly_expenses = sum([v for k, v in self.profile.items() if k.startswith('expense_')])
         
@@ -49,62 +94,29 @@ class FinancialSimulator:
             income_growth = 0.02  # 2% annual income growth
             extra_debt_payment = 0
         
-        # Initialize running totals
-        total_savings = current_savings
-        total_debt = current_debt
+        # Weighted average APR only matters while there is debt to service
+        if current_debt > 0:
+            avg_apr = self.profile.get('primary_debt_apr', 15) / 100
+            monthly_interest_rate = avg_apr / 12
+        else:
+            monthly_interest_rate = 0.0
         
         # Run simulation month by month
-        for i in range(self.months):
-            # Apply income growth (annually)
-            if i > 0 and i % 12 == 0:
-                monthly_income *= (1 + income_growth)
-            
-            # Calculate date
-            current_date = self.current_month + timedelta(days=30*i)
-            results['date'].append(current_date)
-            
-            # Record income
-            results['income'].append(monthly_income)
-            
-            # Record expenses
-            results['expenses'].append(monthly_expenses)
-            
-            # Calculate this month's savings
-            this_month_savings = monthly_income - monthly_expenses
-            
-            # Apply debt payments and interest
-            if total_debt > 0:
-                # Get weighted average APR
-                avg_apr = self.profile.get('primary_debt_apr', 15) / 100
-                monthly_interest_rate = avg_apr / 12
-                
-                # Calculate interest for this month
-                interest_amount = total_debt * monthly_interest_rate
-                
-                # Determine debt payment (minimum + extra)
-                min_payment = max(total_debt * 0.02, 25)  # 2% of balance or $25 minimum
-                total_payment = min(min_payment + extra_debt_payment, total_debt + interest_amount)
-                
-                # Apply payment and interest
-                total_debt = total_debt + interest_amount - total_payment
-                
-                # Adjust savings by payment amount
-                this_month_savings -= total_payment
-            
-            # Apply savings interest (simple monthly interest)
-            savings_interest_rate = 0.02 / 12  # 2% APY
-            interest_earned = total_savings * savings_interest_rate
-            total_savings += this_month_savings + interest_earned
-            
-            # Record savings and debt
-            results['savings'].append(total_savings)
-            results['debt'].append(max(0, total_debt))
-            
-            # Calculate net worth
-            net_worth = total_savings - max(0, total_debt)
-            results['net_worth'].append(net_worth)
-    
-        return pd.DataFrame(results)
+        income, savings, debt, net_worth = _project_months(
+            self.months, float(monthly_income), float(monthly_expenses),
+            float(current_savings), float(current_debt),
+            float(income_growth), float(extra_debt_payment), float(monthly_interest_rate)
+        )
+        
+        # Wrap the projection arrays as columns without copying them
+        return pd.DataFrame({
+            'date': _month_dates(self.current_month, self.months),
+            'income': income,
+            'expenses': np.full(self.months, monthly_expenses, dtype=np.float64),
+            'savings': savings,
+            'debt': debt,
+            'net_worth': net_worth
+        }, copy=False)
     
     def simulate_current_path(self):
         """Simulate financial future with current behavior."""
@@ -126,34 +138,38 @@ class FinancialSimulator:
         current = self.simulate_current_path()
         improved = self.simulate_improved_path()
         
+        # Read the contiguous float64 columns once as numpy views
+        current_savings, current_debt, current_net_worth = (
+            current[column].to_numpy() for column in ('savings', 'debt', 'net_worth'))
+        improved_savings, improved_debt, improved_net_worth = (
+            improved[column].to_numpy() for column in ('savings', 'debt', 'net_worth'))
+        
         comparison = {
             'end_date': current['date'].iloc[-1],
             'current_path': {
-                'final_savings': current['savings'].iloc[-1],
-                'final_debt': current['debt'].iloc[-1],
-                'final_net_worth': current['net_worth'].iloc[-1]
+                'final_savings': current_savings[-1],
+                'final_debt': current_debt[-1],
+                'final_net_worth': current_net_worth[-1]
             },
             'improved_path': {
-                'final_savings': improved['savings'].iloc[-1],
-                'final_debt': improved['debt'].iloc[-1],
-                'final_net_worth': improved['net_worth'].iloc[-1]
+                'final_savings': improved_savings[-1],
+                'final_debt': improved_debt[-1],
+                'final_net_worth': improved_net_worth[-1]
             },
             'difference': {
-                'savings_diff': improved['savings'].iloc[-1] - current['savings'].iloc[-1],
-                'debt_diff': current['debt'].iloc[-1] - improved['debt'].iloc[-1],
-                'net_worth_diff': improved['net_worth'].iloc[-1] - current['net_worth'].iloc[-1]
+                'savings_diff': improved_savings[-1] - current_savings[-1],
+                'debt_diff': current_debt[-1] - improved_debt[-1],
+                'net_worth_diff': improved_net_worth[-1] - current_net_worth[-1]
             }
         }
         
-        # Calculate potential financial milestones
-        debt_free_month_current = current[current['debt'] <= 0]['date'].min() if (current['debt'] <= 0).any() else None
-        debt_free_month_improved = improved[improved['debt'] <= 0]['date'].min() if (improved['debt'] <= 0).any() else None
-        
-        if debt_free_month_current is not None:
-            comparison['current_path']['debt_free_date'] = debt_free_month_current
-        
-        if debt_free_month_improved is not None:
-            comparison['improved_path']['debt_free_date'] = debt_free_month_improved
+        # Calculate potential financial milestones (dates are ascending, so
+        # the first month without debt is the earliest)
+        for path, dates, debt in (('current_path', current['date'], current_debt),
+                                  ('improved_path', improved['date'], improved_debt)):
+            debt_free = np.flatnonzero(debt <= 0)
+            if debt_free.size:
+                comparison[path]['debt_free_date'] = dates.iloc[debt_free[0]]
         
         return current, improved, comparison
 
@@ -1,6 +1,57 @@
 import pandas as pd
 import numpy as np
 
+from src.utils import njit
+
+@njit(cache=True)
+def _grow_investments(taxable_contributions, retirement_contributions, capital_gains_rates,
+                      niit_rates, initial_investment, investment_return_rate):
+    """Year-by-year taxable and tax-advantaged balances and the tax paid on investment income."""
+    years = taxable_contributions.shape[0]
+    taxable_values = np.empty(years, dtype=np.float64)
+    tax_advantaged_values = np.empty(years, dtype=np.float64)
+    investment_taxes = np.empty(years, dtype=np.float64)
+    
+    taxable_investment = initial_investment
+    tax_advantaged = 0.0
+    
+    for i in range(years):
+        # Taxable investment growth; gains and dividends are taxed at the capital gains rate plus NIIT
+        taxable_investment_growth = taxable_investment * investment_return_rate
+        dividend_income = taxable_investment * 0.02  # Assume 2% dividend yield
+        unrealized_gains = taxable_investment_growth - dividend_income
+        tax_due = ((unrealized_gains * capital_gains_rates[i] + unrealized_gains * niit_rates[i]) +
+                   (dividend_income * capital_gains_rates[i] + dividend_income * niit_rates[i]))
+        
+        taxable_investment = (
+            taxable_investment +
+            taxable_investment_growth +
+            taxable_contributions[i] -
+            tax_due
+        )
+        
+        # Tax-advantaged investment growth
+        tax_advantaged_growth = tax_advantaged * investment_return_rate
+        tax_advantaged = tax_advantaged + tax_advantaged_growth + retirement_contributions[i]
+        
+        taxable_values[i] = taxable_investment
+        tax_advantaged_values[i] = tax_advantaged
+        investment_taxes[i] = tax_due
+    
+    return taxable_values, tax_advantaged_values, investment_taxes
+
+# Compiled eagerly for its fixed signature, so the first tax calculation doesn't pay for the JIT
+@njit("float64(float64, float64[::1], float64[::1])", cache=True)
+def _bracket_tax(income, edges, rates):
+    """Progressive tax on income given bracket edges (one more than rates) and their rates."""
+    tax = 0.0
+    for i in range(rates.shape[0]):
+        lower = edges[i]
+        if income <= lower:
+            break
+        tax += (min(income, edges[i + 1]) - lower) * rates[i]
+    return tax
+
 class TaxCalculator:
     """
     Calculates tax implications on income, savings, and investments 
@@ -19,6 +70,10 @@ class TaxCalculator:
             (231250, 578125, 0.35),  # 35% on income from $231,250 to $578,125
             (578125, float('inf'), 0.37)  # 37% on income above $578,125
         ]
+        self._federal_edges = np.ascontiguousarray(
+            [lower for lower, _, _ in self.federal_brackets] + [self.federal_brackets[-1][1]], dtype=np.float64)
+        self._federal_rates = np.ascontiguousarray(
+            [rate for _, _, rate in self.federal_brackets], dtype=np.float64)
         
         # Standard deduction (2023, single filer)
         self.standard_deduction = 13850
@@ -82,15 +137,19 @@ class TaxCalculator:
         taxable_income = max(0, annual_income - deductions)
         
         # Calculate tax based on brackets
-        tax = 0
-        for lower, upper, rate in self.federal_brackets:
-            if taxable_income > lower:
-                bracket_income = min(taxable_income - lower, upper - lower)
-                tax += bracket_income * rate
-            else:
-                break
+        return _bracket_tax(float(taxable_income), self._federal_edges, self._federal_rates)
+    
+    def _federal_income_tax_array(self, annual_incomes, deductions=None):
+        """Federal income tax for an array of incomes, one bracket column at a time."""
+        if deductions is None:
+            deductions = self.standard_deduction
+        
+        taxable_incomes = np.maximum(annual_incomes - deductions, 0)
+        lowers = self._federal_edges[:-1]
+        widths = np.diff(self._federal_edges)
         
-        return tax
+        bracket_incomes = np.clip(taxable_incomes[:, None] - lowers, 0, widths)
+        return (bracket_incomes * self._federal_rates).sum(axis=1)
     
     def calculate_fica_taxes(self, annual_income):
         """
@@ -323,78 +382,52 @@ class TaxCalculator:
         Returns:
             DataFrame: Year-by-year tax and investment impacts
         """
-        results = {
-            'year': [],
-            'annual_income': [],
-            'retirement_contribution': [],
-            'federal_tax': [],
-            'fica_tax': [],
-            'state_tax': [],
-            'take_home_pay': [],
-            'taxable_investment_value': [],
-            'tax_advantaged_value': [],
-            'taxes_on_investments': [],
-            'total_net_worth': []
-        }
-        
-        current_income = annual_income
-        taxable_investment = initial_investment
-        tax_advantaged = 0
-        
-        for year in range(1, years + 1):
-            results['year'].append(year)
-            results['annual_income'].append(current_income)
-            
-            # Calculate retirement contribution
-            retirement_contribution = current_income * retirement_contribution_percent
-            results['retirement_contribution'].append(retirement_contribution)
-            
-            # Calculate taxes and take-home pay
-            take_home_details = self.calculate_monthly_take_home_pay(
-                current_income, 
-                retirement_contribution=retirement_contribution
-            )
-            
-            results['federal_tax'].append(take_home_details['federal_income_tax'])
-            results['fica_tax'].append(take_home_details['social_security_tax'] + take_home_details['medicare_tax'])
-            results['state_tax'].append(take_home_details['state_income_tax'])
-            results['take_home_pay'].append(take_home_details['annual_take_home'])
-            
-            # Simulate investment growth
-            # Assume 50% of savings (take_home - expenses) goes to taxable investments
-            annual_savings = take_home_details['annual_take_home'] * 0.2  # Assume 20% savings rate
-            taxable_investment_contribution = annual_savings * 0.5
-            
-            # Taxable investment growth
-            taxable_investment_growth = taxable_investment * investment_return_rate
-            dividend_income = taxable_investment * 0.02  # Assume 2% dividend yield
-            
-            tax_impact = self.calculate_tax_impact_on_investments(
-                taxable_investment_growth - dividend_income,  # Unrealized gains
-                dividend_income,
-                current_income
-            )
-            
-            taxable_investment = (
-                taxable_investment + 
-                taxable_investment_growth + 
-                taxable_investment_contribution - 
-                tax_impact['tax_due']
-            )
-            
-            # Tax-advantaged investment growth
-            tax_advantaged_growth = tax_advantaged * investment_return_rate
-            tax_advantaged = tax_advantaged + tax_advantaged_growth + retirement_contribution
-            
-            results['taxable_investment_value'].append(taxable_investment)
-            results['tax_advantaged_value'].append(tax_advantaged)
-            results['taxes_on_investments'].append(tax_impact['tax_due'])
-            results['total_net_worth'].append(taxable_investment + tax_advantaged)
-            
-            # Increase income for next year
-            current_income *= (1 + yearly_income_growth)
-        
-        return pd.DataFrame(results)
+        year = np.arange(1, years + 1)
+        
+        # Income grows by the same factor each year, compounded in order
+        growth_factors = np.full(years, 1 + yearly_income_growth, dtype=np.float64)
+        growth_factors[:1] = annual_income
+        annual_incomes = np.cumprod(growth_factors)
+        
+        # Calculate retirement contributions, taxes and take-home pay for every year at once
+        retirement_contributions = annual_incomes * retirement_contribution_percent
+        taxable_incomes = annual_incomes - retirement_contributions
+        
+        federal_tax = self._federal_income_tax_array(taxable_incomes)
+        social_security_tax = np.minimum(annual_incomes, self.social_security_cap) * self.social_security_rate
+        medicare_tax = (annual_incomes * self.medicare_rate +
+                        np.maximum(annual_incomes - self.additional_medicare_threshold, 0) * self.additional_medicare_rate)
+        fica_tax = social_security_tax + medicare_tax
+        state_tax = np.maximum(taxable_incomes, 0) * self.state_tax_rate
+        take_home_pay = annual_incomes - federal_tax - fica_tax - state_tax - retirement_contributions
+        
+        # Assume a 20% savings rate, half of which goes to taxable investments
+        taxable_contributions = take_home_pay * 0.2 * 0.5
+        
+        # Investment income is taxed at the capital gains rate for the year's income
+        lowers = np.array([lower for lower, _, _ in self.capital_gains_brackets], dtype=np.float64)
+        rates = np.array([0.0] + [rate for _, _, rate in self.capital_gains_brackets], dtype=np.float64)
+        capital_gains_rates = rates[np.searchsorted(lowers, annual_incomes, side='left')]
+        niit_rates = np.where(annual_incomes > self.niit_threshold, self.niit_rate, 0.0)
+        
+        taxable_investment_value, tax_advantaged_value, taxes_on_investments = _grow_investments(
+            taxable_contributions, retirement_contributions, capital_gains_rates, niit_rates,
+            float(initial_investment), float(investment_return_rate)
+        )
+        
+        return pd.DataFrame({
+            'year': year,
+            'annual_income': annual_incomes,
+            'retirement_contribution': retirement_contributions,
+            'federal_tax': federal_tax,
+            'fica_tax': fica_tax,
+            'state_tax': state_tax,
+            'take_home_pay': take_home_pay,
+            'taxable_investment_value': taxable_investment_value,
+            'tax_advantaged_value': tax_advantaged_value,
+            'taxes_on_investments': taxes_on_investments,
+            'total_net_worth': taxable_investment_value + tax_advantaged_value
+        })
 
 # Example usage
 if __name__ == "__main__":
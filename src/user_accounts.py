@@ -3,6 +3,7 @@ import sqlite3
 import hashlib
 import uuid
 import json
+import threading
 from datetime import datetime
 
 class UserDatabase:
@@ -16,12 +17,18 @@ class UserDatabase:
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
         self.db_path = db_path
-        # Don't maintain a persistent connection - will create new ones per method
+        # Pool one persistent connection per thread instead of reconnecting per method
+        self._local = threading.local()
         self.create_tables()
     
     def _get_connection(self):
-        """Get a new database connection."""
-        return sqlite3.connect(self.db_path)
+        """Get the pooled database connection for the current thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
     
     def create_tables(self):
         """Create the necessary database tables if they don't exist."""
@@ -90,7 +97,6 @@ class UserDatabase:
         ''')
         
         conn.commit()
-        conn.close()
     
     def _hash_password(self, password, salt=None):
         """
@@ -130,7 +136,6 @@ class UserDatabase:
         # Check if username or email already exists
         cursor.execute("SELECT id FROM users WHERE username = ? OR email = ?", (username, email))
         if cursor.fetchone():
-            conn.close()
             return False, "Username or email already exists", None
         
         # Hash the password
@@ -147,10 +152,9 @@ class UserDatabase:
                 (user_id, username, email, password_hash, salt, current_time)
             )
             conn.commit()
-            conn.close()
             return True, "User created successfully", user_id
         except sqlite3.Error as e:
-            conn.close()
+            conn.rollback()
             return False, f"Database error: {e}", None
     
     def authenticate_user(self, username_or_email, password):
@@ -175,7 +179,6 @@ class UserDatabase:
         result = cursor.fetchone()
         
         if not result:
-            conn.close()
             return False, "Invalid username or email", None
         
         user_id, stored_hash, salt = result
@@ -191,10 +194,8 @@ class UserDatabase:
                 (current_time, user_id)
             )
             conn.commit()
-            conn.close()
             return True, "Authentication successful", user_id
         else:
-            conn.close()
             return False, "Invalid password", None
     
     def save_financial_profile(self, user_id, profile_name, profile_data):
@@ -215,7 +216,6 @@ class UserDatabase:
         # Check if the user exists
         cursor.execute("SELECT id FROM users WHERE id = ?", (user_id,))
         if not cursor.fetchone():
-            conn.close()
             return False, "User not found", None
         
         # Convert profile data to JSON
@@ -250,10 +250,9 @@ class UserDatabase:
                 message = "Profile created successfully"
             
             conn.commit()
-            conn.close()
             return True, message, profile_id
         except sqlite3.Error as e:
-            conn.close()
+            conn.rollback()
             return False, f"Database error: {e}", None
     
     def get_financial_profiles(self, user_id):
@@ -286,9 +285,29 @@ class UserDatabase:
             }
             profiles.append(profile)
         
-        conn.close()
         return profiles
     
+    def get_latest_profile_id(self, user_id):
+        """
+        Get the ID of the user's most recently updated financial profile.
+        
+        Args:
+            user_id (str): ID of the user
+        
+        Returns:
+            str: Profile ID, or None if the user has no profiles
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            "SELECT id FROM financial_profiles WHERE user_id = ? ORDER BY updated_at DESC LIMIT 1",
+            (user_id,)
+        )
+        
+        row = cursor.fetchone()
+        return row[0] if row else None
+    
     def get_financial_profile(self, profile_id):
         """
         Get a specific financial profile.
@@ -309,7 +328,6 @@ class UserDatabase:
         
         row = cursor.fetchone()
         if not row:
-            conn.close()
             return None
         
         profile_id, user_id, name, data_json, created, updated = row
@@ -322,7 +340,6 @@ class UserDatabase:
             "updated_at": updated
         }
         
-        conn.close()
         return profile
     
     def delete_financial_profile(self, profile_id, user_id):
@@ -346,7 +363,6 @@ class UserDatabase:
         )
         
         if not cursor.fetchone():
-            conn.close()
             return False, "Profile not found or access denied"
         
         try:
@@ -358,10 +374,9 @@ class UserDatabase:
             cursor.execute("DELETE FROM financial_profiles WHERE id = ?", (profile_id,))
             conn.commit()
             
-            conn.close()
             return True, "Profile deleted successfully"
         except sqlite3.Error as e:
-            conn.close()
+            conn.rollback()
             return False, f"Database error: {e}"
     
     def save_analysis_results(self, profile_id, analysis_data):
@@ -381,7 +396,6 @@ class UserDatabase:
         # Check if the profile exists
         cursor.execute("SELECT id FROM financial_profiles WHERE id = ?", (profile_id,))
         if not cursor.fetchone():
-            conn.close()
             return False, "Profile not found", None
         
         # Convert analysis data to JSON
@@ -402,10 +416,55 @@ class UserDatabase:
             )
             
             conn.commit()
-            conn.close()
             return True, "Analysis saved successfully", analysis_id
         except sqlite3.Error as e:
-            conn.close()
+            conn.rollback()
+            return False, f"Database error: {e}", None
+    
+    def save_analysis_for_current_profile(self, user_id, analysis_data):
+        """
+        Save analysis results for the user's most recently updated profile.
+        
+        Args:
+            user_id (str): ID of the user
+            analysis_data (dict): Analysis results
+        
+        Returns:
+            tuple: (success, message, profile_id)
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        # Convert analysis data to JSON
+        analysis_json = json.dumps(analysis_data)
+        
+        # Generate a unique ID
+        analysis_id = str(uuid.uuid4())
+        current_time = datetime.now().isoformat()
+        
+        try:
+            # Find the current profile inside the same transaction as the save
+            cursor.execute(
+                "SELECT id FROM financial_profiles WHERE user_id = ? ORDER BY updated_at DESC LIMIT 1",
+                (user_id,)
+            )
+            row = cursor.fetchone()
+            if not row:
+                return False, "Profile not found", None
+            
+            profile_id = row[0]
+            
+            # Replace any existing analysis for this profile
+            cursor.execute("DELETE FROM analysis_results WHERE profile_id = ?", (profile_id,))
+            cursor.execute(
+                "INSERT INTO analysis_results (id, profile_id, analysis_data, created_at) VALUES (?, ?, ?, ?)",
+                (analysis_id, profile_id, analysis_json, current_time)
+            )
+            
+            conn.commit()
+            return True, "Analysis saved successfully", profile_id
+        except sqlite3.Error as e:
+            conn.rollback()
             return False, f"Database error: {e}", None
     
     def get_analysis_results(self, profile_id):
@@ -428,7 +487,6 @@ class UserDatabase:
         
         row = cursor.fetchone()
         if not row:
-            conn.close()
             return None
         
         analysis_id, data_json, created = row
@@ -438,7 +496,6 @@ class UserDatabase:
             "created_at": created
         }
         
-        conn.close()
         return analysis
     
     def save_simulation_results(self, profile_id, simulation_data):
@@ -447,7 +504,7 @@ class UserDatabase:
         
         Args:
             profile_id (str): ID of the profile
-            simulation_data (dict): Simulation results
+            simulation_data (dict): Simulation results; dates are stored as strings
             
         Returns:
             tuple: (success, message, simulation_id)
@@ -458,11 +515,10 @@ class UserDatabase:
         # Check if the profile exists
         cursor.execute("SELECT id FROM financial_profiles WHERE id = ?", (profile_id,))
         if not cursor.fetchone():
-            conn.close()
             return False, "Profile not found", None
         
         # Convert simulation data to JSON
-        simulation_json = json.dumps(simulation_data)
+        simulation_json = json.dumps(simulation_data, default=str)
         
         # Generate a unique ID
         simulation_id = str(uuid.uuid4())
@@ -479,10 +535,9 @@ class UserDatabase:
             )
             
             conn.commit()
-            conn.close()
             return True, "Simulation saved successfully", simulation_id
         except sqlite3.Error as e:
-            conn.close()
+            conn.rollback()
             return False, f"Database error: {e}", None
     
     def get_simulation_results(self, profile_id):
@@ -505,7 +560,6 @@ class UserDatabase:
         
         row = cursor.fetchone()
         if not row:
-            conn.close()
             return None
         
         simulation_id, data_json, created = row
@@ -515,7 +569,6 @@ class UserDatabase:
             "created_at": created
         }
         
-        conn.close()
         return simulation
     
     def save_achievement(self, user_id, achievement_type, achievement_data):
@@ -536,7 +589,6 @@ class UserDatabase:
         # Check if the user exists
         cursor.execute("SELECT id FROM users WHERE id = ?", (user_id,))
         if not cursor.fetchone():
-            conn.close()
             return False, "User not found", None
         
         # Check if the achievement already exists
@@ -545,7 +597,6 @@ class UserDatabase:
             (user_id, achievement_type)
         )
         if cursor.fetchone():
-            conn.close()
             return False, "Achievement already exists", None
         
         # Convert achievement data to JSON
@@ -563,12 +614,54 @@ class UserDatabase:
             )
             
             conn.commit()
-            conn.close()
             return True, "Achievement saved successfully", achievement_id
         except sqlite3.Error as e:
-            conn.close()
+            conn.rollback()
             return False, f"Database error: {e}", None
     
+    def save_achievements(self, user_id, achievements):
+        """
+        Save several user achievements in a single transaction.
+        
+        Args:
+            user_id (str): ID of the user
+            achievements (dict): Achievement details keyed by achievement type
+        
+        Returns:
+            list: Achievement types that were newly saved
+        """
+        if not achievements:
+            return []
+        
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        # Check if the user exists
+        cursor.execute("SELECT id FROM users WHERE id = ?", (user_id,))
+        if not cursor.fetchone():
+            return []
+        
+        try:
+            # Load the user's existing achievements once and skip those
+            cursor.execute("SELECT achievement_type FROM achievements WHERE user_id = ?", (user_id,))
+            existing = {row[0] for row in cursor.fetchall()}
+            
+            current_time = datetime.now().isoformat()
+            new_types = [t for t in achievements if t not in existing]
+            cursor.executemany(
+                "INSERT INTO achievements (id, user_id, achievement_type, achievement_data, achieved_at) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (str(uuid.uuid4()), user_id, t, json.dumps(achievements[t]), current_time)
+                    for t in new_types
+                ]
+            )
+            
+            conn.commit()
+            return new_types
+        except sqlite3.Error:
+            conn.rollback()
+            return []
+    
     def get_user_achievements(self, user_id):
         """
         Get all achievements for a user.
@@ -598,5 +691,4 @@ class UserDatabase:
             }
             achievements.append(achievement)
         
-        conn.close()
         return achievements
\ No newline at end of file
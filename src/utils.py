@@ -0,0 +1,27 @@
+"""
+Shared helpers for the simulation modules.
+"""
+
+import os
+
+# Keep compiled kernels with the app's other on-disk caches (.cache next to
+# app.py, whatever the working directory) so they survive restarts even where
+# the source tree isn't writable; must be set before numba loads
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("NUMBA_CACHE_DIR", os.path.join(APP_DIR, ".cache", "numba"))
+
+# Numba is optional at runtime: without it the kernels run as plain Python
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit, usable with or without arguments."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        
+        def decorator(func):
+            return func
+        return decorator